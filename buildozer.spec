@@ -12,6 +12,9 @@ source.dir = .
 # 包含的文件扩展名
 source.include_exts = py,png,jpg,kv,atlas,json,ttf,otf,ttc,txt
 
+# 不打包的目录（开发工具、基准测试）
+source.exclude_dirs = tools, bin, tests
+
 # 版本号
 version = 1.0
 
@@ -23,17 +26,36 @@ fullscreen = 0
 
 # ============ 依赖项 ============
 # 核心依赖（不要删除 android 和 pyjnius）
-requirements = python3,kivy==2.3.0,android,pyjnius
+requirements = python3,kivy==2.3.0,android,pyjnius,sqlite3
 
 # ============ 字体文件包含配置 ============
 # 关键：确保字体文件被打包到APK中
 source.include_patterns = 
     main.py,
+    popups.py,
+    export_io.py,
+    field_registry.py,
     font_utils.py,
+    ingredient_table.py,
+    ingredient_view.py,
+    json_backend.py,
+    log_utils.py,
+    perf_utils.py,
+    save_core.py,
+    save_diff.py,
+    string_pool.py,
+    workspace.py,
+    save_index.py,
+    save_sql.py,
+    save_watcher.py,
+    trigger_engine.py,
+    item_catalog.py,
     fonts/*.otf,
     fonts/*.ttf,
     fonts/*.ttc,
-    items_id_map.json
+    items_id_map.json,
+    items_id_map.*.json,
+    triggers.json
 
 # 额外的包含目录（确保fonts目录被打包）
 # 使用 ; 分隔多个目录（Windows）或 : 分隔（Linux/Mac）
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dave the Diver save editor - headless command line
+
+Batch decode/edit/encode many saves in parallel without Kivy:
+
+    python cli.py decode saves/*.sav -o out/
+    python cli.py encode out/*.json -o saves/
+    python cli.py set saves/*.sav PlayerInfo.m_Gold=999999
+    python cli.py bulk-edit saves/*.sav --gold 999999 --all-ingredients 99 --item 1010001=50
+    python cli.py verify saves/*.sav
+    python cli.py export saves/*.sav -o exports/ --compress gzip
+    python cli.py import exports/*_exported.json.gz -o saves/
+    python cli.py diff --base old.sav new1.sav new2.sav -o patches/
+    python cli.py patch saves/*.sav --patch patches/new1.patch.json
+    python cli.py sql saves/*.sav -q "SELECT ..." [--db saves.sqlite] [--write]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from json_backend import serializer
+from export_io import COMPRESSIONS, stream_export, import_json_to_sav, validate_export
+from save_diff import load_patch, save_patch
+from save_sql import SaveDatabase, SQL_ERRORS
+from log_utils import set_log_level
+from save_core import (
+    SAVE_MAX_INGREDIENT,
+    decode_sav_to_json, encode_json_to_sav, clean_json_string,
+    BypassTable, DaveSaveEditor, ItemDatabase, FIELDS,
+)
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'items_id_map.json')
+
+
+def _output_path(path, output_dir, suffix):
+    base = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(path)), base + suffix)
+
+
+def _parse_value(text):
+    """Interpret a command-line value as JSON, falling back to a plain string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def set_path(data, path, value):
+    """Set a dotted path such as PlayerInfo.m_Gold, creating missing objects"""
+    keys = path.split('.')
+    node = data
+    for key in keys[:-1]:
+        if isinstance(node, list):
+            node = node[int(key)]
+        else:
+            if key not in node:
+                # Read back after assigning: an IngredientTable stores a copy and returns a row view
+                node[key] = {}
+            node = node[key]
+    if isinstance(node, list):
+        node[int(keys[-1])] = value
+    else:
+        node[keys[-1]] = value
+
+
+def _load_editor(path):
+    editor = DaveSaveEditor()
+    if not editor.load_save_file(path):
+        raise RuntimeError(editor.last_error or 'load failed')
+    return editor
+
+
+def _save_editor(editor, options):
+    # Writing to another directory leaves the source untouched, so no backup is needed
+    backup = options.get('backup', True)
+    if options.get('output_dir'):
+        editor.file_path = _output_path(editor.file_path, options['output_dir'], '.sav')
+        backup = False
+    if not editor.save_save_file(backup=backup):
+        raise RuntimeError('save failed')
+    return editor.file_path
+
+
+# ============ Commands (run inside worker processes) ============
+
+def cmd_decode(path, options):
+    with open(path, 'rb') as f:
+        json_str = clean_json_string(decode_sav_to_json(f.read()))
+    out = _output_path(path, options.get('output_dir'), '.json')
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write(json_str)
+    return out
+
+
+def cmd_encode(path, options):
+    with open(path, 'r', encoding='utf-8') as f:
+        json_str = f.read()
+    # Re-serialize compactly so pretty-printed exports encode to what the game expects
+    json_str = serializer.dumps(serializer.loads(json_str))
+    out = _output_path(path, options.get('output_dir'), '.sav')
+    with open(out, 'wb') as f:
+        f.write(encode_json_to_sav(json_str))
+    return out
+
+
+def cmd_set(path, options):
+    editor = _load_editor(path)
+    for assignment in options['assignments']:
+        field, sep, value = assignment.partition('=')
+        if not sep:
+            raise ValueError(f"Expected PATH=VALUE, got {assignment!r}")
+        set_path(editor.save_data, field, _parse_value(value))
+    return _save_editor(editor, options)
+
+
+def cmd_bulk_edit(path, options):
+    editor = _load_editor(path)
+    changes = {field.key: options[field.key] for field in FIELDS if options.get(field.key) is not None}
+    if changes and editor.apply_fields(changes) is None:
+        raise RuntimeError(editor.last_error)
+    if options.get('all_ingredients') is not None:
+        editor.set_all_ingredients(options['all_ingredients'])
+    for spec in options.get('items') or []:
+        item_id, sep, count = spec.partition('=')
+        if not sep:
+            raise ValueError(f"Expected ID=COUNT, got {spec!r}")
+        item_id = int(item_id)
+        editor._modify_item_by_id(item_id, str(item_id), min(int(count), SAVE_MAX_INGREDIENT))
+    return _save_editor(editor, options)
+
+
+def cmd_verify(path, options):
+    with open(path, 'rb') as f:
+        encrypted_bytes = f.read()
+    bypass_table = BypassTable()
+    json_str = decode_sav_to_json(encrypted_bytes, bypass_table)
+    if encode_json_to_sav(json_str, bypass_table) != encrypted_bytes:
+        raise RuntimeError('codec round trip differs from file')
+    serializer.loads(clean_json_string(json_str))
+    return 'ok'
+
+
+def cmd_export(path, options):
+    editor = _load_editor(path)
+    compression = options.get('compress') or 'none'
+    out = _output_path(path, options.get('output_dir'), '_exported' + COMPRESSIONS[compression])
+    stream_export(editor.document(), out, compression, editor.bypass_table)
+    return out
+
+
+def cmd_import(path, options):
+    name = os.path.basename(path)
+    for suffix in sorted(COMPRESSIONS.values(), key=len, reverse=True):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    if name.endswith('_exported'):
+        name = name[:-len('_exported')]
+    out = os.path.join(options.get('output_dir') or os.path.dirname(os.path.abspath(path)), name + '.sav')
+    if options.get('check', True):
+        validate_export(path)
+    import_json_to_sav(path, out)
+    return out
+
+
+def cmd_diff(path, options):
+    base = _load_editor(options['base'])
+    patch = base.diff(_load_editor(path))
+    out = _output_path(path, options.get('output_dir'), '.patch.json')
+    save_patch(patch, out)
+    return f'{out} ({len(patch)} ops)'
+
+
+def cmd_patch(path, options):
+    editor = _load_editor(path)
+    if editor.apply_patch(load_patch(options['patch'])) is None:
+        raise RuntimeError(editor.last_error)
+    return _save_editor(editor, options)
+
+
+COMMANDS = {
+    'decode': cmd_decode,
+    'encode': cmd_encode,
+    'set': cmd_set,
+    'bulk-edit': cmd_bulk_edit,
+    'verify': cmd_verify,
+    'export': cmd_export,
+    'import': cmd_import,
+    'diff': cmd_diff,
+    'patch': cmd_patch,
+}
+
+
+def run_task(command, path, options):
+    """Run one command on one file and return a result row"""
+    set_log_level(options.get('log_level', 'WARNING'))
+    start = time.perf_counter()
+    try:
+        output = COMMANDS[command](path, options)
+        ok, message = True, output
+    except Exception as e:
+        ok, message = False, f'{type(e).__name__}: {e}'
+    return {
+        'file': path,
+        'ok': ok,
+        'ms': round((time.perf_counter() - start) * 1000, 1),
+        'result': message,
+    }
+
+
+def run_batch(command, paths, options, jobs=None):
+    """Fan a command out over files with a process pool"""
+    if options.get('output_dir'):
+        os.makedirs(options['output_dir'], exist_ok=True)
+    if jobs == 1 or len(paths) == 1:
+        for path in paths:
+            yield run_task(command, path, options)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_task, command, path, options) for path in paths]
+        for future in futures:
+            yield future.result()
+
+
+# ============ SQL (one database across all files) ============
+
+def run_sql(paths, options, as_json=False):
+    """Load all saves into one SQLite database, run the queries and write changes back"""
+    # Loader messages would otherwise end up between the result rows on stdout
+    set_log_level(options.get('log_level', 'WARNING'))
+    editors = [_load_editor(path) for path in paths]
+    db = SaveDatabase.create_file(options['db']) if options.get('db') else SaveDatabase()
+    try:
+        save_ids = [db.add_save(editor) for editor in editors]
+        catalog = options.get('catalog') or DEFAULT_CATALOG
+        if os.path.exists(catalog):
+            db.add_catalog(ItemDatabase(catalog))
+        for sql in options.get('queries') or []:
+            columns, result = db.run(sql)
+            if not columns:
+                print(f"{result} rows affected", file=sys.stderr)
+            elif as_json:
+                for row in result:
+                    print(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            else:
+                print('\t'.join(columns))
+                for row in result:
+                    print('\t'.join('' if v is None else str(v) for v in row))
+        if options.get('write'):
+            for editor, save_id in zip(editors, save_ids):
+                if db.write_back(editor, save_id):
+                    print(f"Wrote {_save_editor(editor, options)}", file=sys.stderr)
+    finally:
+        db.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Dave the Diver save editor (headless)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='print per-file results as JSON lines')
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--columnar', action='store_true',
+                        help='keep Ingredients in typed columns (less memory, faster bulk edits)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add(name, help_text, output_dir=True):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('files', nargs='+')
+        if output_dir:
+            p.add_argument('-o', '--output-dir', default=None)
+        return p
+
+    add('decode', 'decrypt .sav files to JSON')
+    add('encode', 'encrypt JSON files to .sav')
+    p = add('set', 'set fields by dotted path, e.g. PlayerInfo.m_Gold=1000')
+    p.add_argument('--no-backup', dest='backup', action='store_false')
+    p.add_argument('--assign', dest='assignments', action='append', default=[], metavar='PATH=VALUE')
+    p = add('bulk-edit', 'apply editor operations to many saves')
+    p.add_argument('--no-backup', dest='backup', action='store_false')
+    for field in FIELDS:
+        p.add_argument(f'--{field.key}', type=int, help=f'{field.path} (max {field.max_value})')
+    p.add_argument('--all-ingredients', type=int)
+    p.add_argument('--item', dest='items', action='append', metavar='ID=COUNT')
+    add('verify', 'check that saves decode, parse and re-encode identically', output_dir=False)
+    p = add('export', 'export saves as indented JSON')
+    p.add_argument('--compress', choices=tuple(COMPRESSIONS), default='none')
+    p = add('import', 'encode exported JSON (.json, .json.gz, .json.xz) back to .sav, streaming')
+    p.add_argument('--no-check', dest='check', action='store_false',
+                   help='skip the full JSON parse before encoding')
+    p = add('diff', 'write a JSON Patch from --base to each file')
+    p.add_argument('--base', required=True, help='save the patches start from')
+    p = add('patch', 'apply a JSON Patch to saves (all-or-nothing per save)')
+    p.add_argument('--patch', required=True, help='JSON Patch file')
+    p.add_argument('--no-backup', dest='backup', action='store_false')
+    p = add('sql', 'load saves and the catalog into SQLite and run queries (tables: saves, ingredients, '
+                   'player_info, sns_info, catalog)')
+    p.add_argument('-q', '--query', dest='queries', action='append', default=[], metavar='SQL')
+    p.add_argument('--db', default=None, help='keep the database in this file (default: in memory)')
+    p.add_argument('--catalog', default=None, help='item catalog (default: bundled items_id_map.json)')
+    p.add_argument('--write', action='store_true', help='write UPDATE/INSERT/DELETE changes back to the saves')
+    p.add_argument('--no-backup', dest='backup', action='store_false')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = {k: v for k, v in vars(args).items() if k not in ('files', 'command', 'jobs', 'json', 'columnar')}
+    if args.columnar:
+        # Inherited by the worker processes
+        os.environ['DAVESAVEED_COLUMNAR'] = '1'
+
+    files = args.files
+    if args.command == 'sql':
+        try:
+            return run_sql(files, options, args.json)
+        except (RuntimeError, *SQL_ERRORS) as e:
+            print(f"FAIL {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+    if args.command == 'set':
+        # Trailing PATH=VALUE arguments are assignments, not files
+        options['assignments'] += [f for f in files if '=' in f and not os.path.exists(f)]
+        files = [f for f in files if f not in options['assignments']]
+
+    start = time.perf_counter()
+    failed = 0
+    for row in run_batch(args.command, files, options, args.jobs):
+        failed += not row['ok']
+        if args.json:
+            print(json.dumps(row, ensure_ascii=False))
+        else:
+            status = 'OK  ' if row['ok'] else 'FAIL'
+            print(f"{status} {row['ms']:>9.1f} ms  {row['file']} -> {row['result']}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(files) - failed}/{len(files)} succeeded in {elapsed:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
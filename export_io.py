@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming JSON export and import
+Exports are written section by section, optionally gzip or xz compressed;
+imports are minified line by line and encoded to .sav in bounded chunks
+"""
+
+import gzip
+import json
+import lzma
+import os
+import re
+
+from log_utils import log_message
+from perf_utils import perf
+from json_backend import serializer
+from save_core import encode_json_chunk, encoded_digest, new_verify_digest, text_digest
+
+# Compression name -> file suffix
+COMPRESSIONS = {
+    'none': '.json',
+    'gzip': '.json.gz',
+    'xz': '.json.xz',
+}
+GZIP_MAGIC = b'\x1f\x8b'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+
+# Objects down to this depth are written entry by entry
+STREAM_DEPTH = 2
+WRITE_BUFFER_SIZE = 256 * 1024
+ENCODE_CHUNK_SIZE = 256 * 1024
+
+# A JSON string, or whitespace outside strings
+_STRING_OR_SPACE = re.compile(r'("(?:[^"\\]|\\.)*")|[ \t\r\n]+')
+
+
+def export_path(base_path, compression='none'):
+    """Output path for an export of base_path (extension replaced)"""
+    base = os.path.splitext(base_path)[0]
+    return base + '_exported' + COMPRESSIONS[compression]
+
+
+def open_for_write(path, compression='none'):
+    """Text stream that writes through the chosen compressor"""
+    if compression == 'gzip':
+        # Level 6 is within a few percent of 9 on saves at a fraction of the time
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if compression == 'xz':
+        return lzma.open(path, 'wt', encoding='utf-8', preset=6)
+    return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+
+def open_for_read(path):
+    """Text stream over a plain, gzip or xz export (detected from the file header)"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(XZ_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if magic.startswith(XZ_MAGIC):
+        return lzma.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8-sig')
+
+
+def iter_pretty_chunks(value, depth=0, max_depth=STREAM_DEPTH):
+    """Yield the indent=2 JSON text of value in pieces
+
+    Only one entry below max_depth is serialized at a time. The key list of
+    each streamed object is copied first, so edits made meanwhile cannot
+    break the iteration.
+    """
+    if depth >= max_depth or not isinstance(value, dict) or not value:
+        text = serializer.dumps_pretty(value)
+        yield text.replace('\n', '\n' + '  ' * depth) if depth else text
+        return
+
+    indent = '\n' + '  ' * (depth + 1)
+    yield '{'
+    for index, (key, item) in enumerate(list(value.items())):
+        yield (',' if index else '') + indent + json.dumps(key, ensure_ascii=False) + ': '
+        yield from iter_pretty_chunks(item, depth + 1, max_depth)
+    yield '\n' + '  ' * depth + '}'
+
+
+def stream_export(data, path, compression='none', bypass_table=None, progress=None):
+    """Write data as indented JSON without building the whole document
+
+    Bypass references are expanded to BYPASSED_HEX strings so the export can
+    be imported on its own. The file is written to a temporary name and
+    renamed into place when complete. Returns the number of characters written.
+    """
+    tmp_path = path + '.tmp'
+    written = 0
+    with perf.operation('export_json', compression=compression):
+        with perf.span('write') as span:
+            try:
+                with open_for_write(tmp_path, compression) as f:
+                    for chunk in iter_pretty_chunks(data):
+                        if bypass_table is not None:
+                            chunk = bypass_table.inline(chunk)
+                        f.write(chunk)
+                        written += len(chunk)
+                        if progress is not None:
+                            progress(written)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            span.add_bytes(written)
+    log_message(f"Exported {written} chars to {path}")
+    return written
+
+
+def minify_line(line):
+    """Remove whitespace outside strings from one line of JSON"""
+    if '"' not in line:
+        return ''.join(line.split())
+    if '\\' not in line:
+        # No escapes: every even-numbered piece between quotes is outside a string
+        parts = line.split('"')
+        parts[::2] = [''.join(part.split()) for part in parts[::2]]
+        return '"'.join(parts)
+    return _STRING_OR_SPACE.sub(lambda m: m.group(1) or '', line)
+
+
+def iter_minified(stream, chunk_size=ENCODE_CHUNK_SIZE):
+    """Yield compact JSON text in pieces of about chunk_size characters
+
+    JSON strings cannot contain raw newlines, so cutting between lines never
+    splits a string (or a BYPASSED_HEX span inside one).
+    """
+    pending = []
+    size = 0
+    for line in stream:
+        compact = minify_line(line)
+        pending.append(compact)
+        size += len(compact)
+        if size >= chunk_size:
+            yield ''.join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def import_json_to_sav(json_path, sav_path, chunk_size=ENCODE_CHUNK_SIZE):
+    """Encode an exported (optionally compressed) JSON file back to .sav
+
+    Memory use while encoding is bounded by chunk_size and the longest line
+    of the input, not by the size of the document. The .sav is written to a
+    temporary name, decoded once to check that it gives back the export
+    (ValueError otherwise; this holds the .sav in memory) and renamed into
+    place. Returns the number of bytes written.
+    """
+    tmp_path = sav_path + '.tmp'
+    key_idx = 0
+    written = 0
+    first = True
+    expected = new_verify_digest()
+    with perf.operation('import_json', file=os.path.basename(json_path)):
+        with perf.span('encode') as span:
+            try:
+                with open_for_read(json_path) as src, \
+                        open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as dst:
+                    for text in iter_minified(src, chunk_size):
+                        if first:
+                            if not text.lstrip().startswith(('{', '[')):
+                                raise ValueError("Not a JSON export")
+                            first = False
+                        encrypted, key_idx = encode_json_chunk(text, key_idx)
+                        text_digest(text, digest=expected)
+                        dst.write(encrypted)
+                        written += len(encrypted)
+                if first:
+                    raise ValueError("Export is empty")
+                with perf.span('verify', written):
+                    with open(tmp_path, 'rb') as f:
+                        if encoded_digest(f.read()) != expected.digest():
+                            raise ValueError("Encoded .sav does not decode back to the export")
+                os.replace(tmp_path, sav_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            span.add_bytes(written)
+    log_message(f"Imported {json_path} -> {sav_path} ({written} bytes)")
+    return written
+
+
+def validate_export(json_path):
+    """Parse a whole export to check that it is valid JSON (loads it into memory)"""
+    with open_for_read(json_path) as f:
+        serializer.loads(f.read())
+    return True
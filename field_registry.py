@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Declarative save fields
+Named fields map to dotted paths such as PlayerInfo.m_Gold with their value
+limits; paths are compiled once into getter/setter closures, and batches of
+changes resolve each shared parent object once
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+
+_MISSING = object()
+
+
+def _child(node, key, path, create):
+    """node[key] for make_parent: missing keys become {} when create is set, otherwise None"""
+    child = node.get(key, _MISSING)
+    if child is _MISSING:
+        if not create:
+            return None
+        node[key] = {}
+        # Read back: a mapping may wrap what it stores (IngredientTable rows)
+        child = node[key]
+    if not isinstance(child, MutableMapping):
+        raise ValueError(f"Not an object at {key!r} in field path {path!r}")
+    return child
+
+
+def compile_path(path):
+    """Return (parents, leaf, get_parent, make_parent) closures for a dotted path
+
+    get_parent(data) returns the object holding the leaf or None.
+    make_parent(data, create=True) creates missing objects on the way (with
+    create=False it only checks, returning None if something is missing)
+    and raises ValueError rather than replace a value that is not an object.
+    Any mapping counts as an object, so columnar Ingredients rows are edited
+    in place.
+    """
+    parts = tuple(path.split('.'))
+    if not all(parts):
+        raise ValueError(f"Invalid field path: {path!r}")
+    parents, leaf = parts[:-1], parts[-1]
+
+    if len(parents) == 1:
+        # Every registered field today: one section below the root
+        section_key = parents[0]
+
+        def get_parent(data):
+            section = data.get(section_key)
+            return section if isinstance(section, Mapping) else None
+
+        def make_parent(data, create=True):
+            return _child(data, section_key, path, create)
+    else:
+        def get_parent(data):
+            node = data
+            for key in parents:
+                node = node.get(key) if isinstance(node, Mapping) else None
+            return node if isinstance(node, Mapping) else None
+
+        def make_parent(data, create=True):
+            node = data
+            for key in parents:
+                node = _child(node, key, path, create)
+                if node is None:
+                    return None
+            return node
+
+    return parents, leaf, get_parent, make_parent
+
+
+class Field:
+    """One editable value: registry key, dotted path, display label, limits and tab"""
+
+    __slots__ = ('key', 'path', 'label', 'max_value', 'min_value', 'default', 'tab',
+                 'parents', 'leaf', '_get_parent', '_make_parent')
+
+    def __init__(self, key, path, label=None, max_value=None, min_value=0, default=0, tab='Currency'):
+        self.key = key
+        self.path = path
+        self.label = label or key
+        self.max_value = max_value
+        self.min_value = min_value
+        self.default = default
+        self.tab = tab
+        self.parents, self.leaf, self._get_parent, self._make_parent = compile_path(path)
+
+    def clamp(self, value):
+        if self.max_value is not None and value > self.max_value:
+            value = self.max_value
+        if self.min_value is not None and value < self.min_value:
+            value = self.min_value
+        return value
+
+    def get(self, data):
+        parent = self._get_parent(data)
+        return parent.get(self.leaf, self.default) if parent is not None else self.default
+
+    def set(self, data, value):
+        """Store the clamped value, creating missing parents; returns what was stored"""
+        value = self.clamp(value)
+        self._make_parent(data)[self.leaf] = value
+        return value
+
+    def __repr__(self):
+        return f'Field({self.key!r}, {self.path!r})'
+
+
+class FieldRegistry:
+    """Fields by key and by path, in registration order"""
+
+    def __init__(self, fields=()):
+        self.fields = {}
+        self._by_path = {}
+        self._adhoc = {}
+        for field in fields:
+            self.register(field)
+
+    def register(self, field):
+        if field.key in self.fields or field.path in self._by_path:
+            raise ValueError(f"Field already registered: {field.key} ({field.path})")
+        self.fields[field.key] = field
+        self._by_path[field.path] = field
+        return field
+
+    def __iter__(self):
+        return iter(self.fields.values())
+
+    def __len__(self):
+        return len(self.fields)
+
+    def resolve(self, name):
+        """Field for a key ('gold') or a path ('PlayerInfo.m_Gold')
+
+        Unregistered dotted paths are compiled on first use (without limits)
+        and cached; anything else raises KeyError.
+        """
+        field = self.fields.get(name) or self._by_path.get(name)
+        if field is not None:
+            return field
+        field = self._adhoc.get(name)
+        if field is None:
+            if '.' not in name:
+                raise KeyError(f"Unknown field: {name}")
+            field = self._adhoc[name] = Field(name, name, max_value=None, min_value=None, default=None, tab=None)
+        return field
+
+    def values(self, data, tab=None):
+        """{key: value} for every registered field (of one tab)"""
+        return {field.key: field.get(data) for field in self.fields.values() if tab is None or field.tab == tab}
+
+    def apply(self, data, changes):
+        """Set several fields at once; returns {name: stored value}
+
+        All names and paths are checked before anything is written, so an
+        unknown name (KeyError), or a path through a value that is not an
+        object or onto an object or array (ValueError), changes nothing. Fields sharing a parent object
+        resolve (and if needed create) it once.
+        """
+        resolved = [(name, self.resolve(name), value) for name, value in changes.items()]
+        groups = {}
+        for name, field, value in resolved:
+            groups.setdefault(field.parents, []).append((name, field, value))
+        for entries in groups.values():
+            parent = entries[0][1]._make_parent(data, create=False)
+            for name, field, _ in entries:
+                if parent is not None and isinstance(parent.get(field.leaf), (Mapping, list)):
+                    raise ValueError(f"Not a plain value: {field.path!r}")
+        applied = {}
+        for entries in groups.values():
+            parent = entries[0][1]._make_parent(data)
+            for name, field, value in entries:
+                value = field.clamp(value)
+                parent[field.leaf] = value
+                applied[name] = value
+        return applied
+
+    def tabs(self):
+        """{tab title: [fields]} in registration order"""
+        tabs = {}
+        for field in self.fields.values():
+            if field.tab:
+                tabs.setdefault(field.tab, []).append(field)
+        return tabs
@@ -4,16 +4,28 @@
 字体工具模块 - 确保中文字体正确加载和应用
 """
 
+import json
 import os
+import threading
+import time
+from kivy.clock import Clock
 from kivy.core.text import LabelBase
+from kivy.core.text import Label as CoreLabel
+from kivy.metrics import sp
 from kivy.utils import platform
 
+from log_utils import get_app_dir
+
 # 全局字体名称
 CHINESE_FONT_NAME = 'ChineseFont'
 
+# 打包的字体目录
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(__file__), 'fonts')
+
 # 字体文件搜索路径（按优先级排序）
 FONT_SEARCH_PATHS = [
     # 打包后的路径（PyInstaller/Buildozer）
+    os.path.join(os.path.dirname(__file__), 'fonts', 'SourceHanSansSC-Regular.otf'),
     os.path.join(os.path.dirname(__file__), 'fonts', 'SourceHanSansCN-Regular.otf'),
     os.path.join(os.path.dirname(__file__), 'fonts', 'NotoSansCJK-Regular.ttc'),
     os.path.join(os.path.dirname(__file__), 'fonts', 'NotoSansCJK-Regular.otf'),
@@ -22,6 +34,7 @@ FONT_SEARCH_PATHS = [
     os.path.join(os.path.dirname(__file__), 'fonts', 'msyh.ttf'),
     os.path.join(os.path.dirname(__file__), 'fonts', 'simhei.ttf'),
     # 相对路径
+    'fonts/SourceHanSansSC-Regular.otf',
     'fonts/SourceHanSansCN-Regular.otf',
     'fonts/NotoSansCJK-Regular.ttc',
     'fonts/NotoSansCJK-Regular.otf',
@@ -31,6 +44,9 @@ FONT_SEARCH_PATHS = [
     'fonts/simhei.ttf',
 ]
 
+# 上次解析出的字体路径缓存（避免每次启动都逐个探测）
+FONT_CACHE_FILE = get_app_dir('font_cache.json')
+
 # Android 系统字体路径
 ANDROID_SYSTEM_FONTS = [
     '/system/fonts/NotoSansCJK-Regular.ttc',
@@ -42,9 +58,84 @@ ANDROID_SYSTEM_FONTS = [
 ]
 
 
+def _stat_signature(path):
+    """
+    文件的 mtime 和大小，用于判断缓存是否仍然有效
+    
+    Returns:
+        list: [mtime_ns, size]，文件不存在时返回 None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_cached_font_path():
+    """
+    读取上次运行缓存的字体路径（校验字体文件和打包字体目录的 mtime）
+    
+    Returns:
+        str: 缓存的字体路径，如果缓存不存在或已失效则返回 None
+    """
+    try:
+        with open(FONT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        font_path = cache.get('path')
+    except (OSError, ValueError, AttributeError):
+        return None
+    
+    if not font_path:
+        return None
+    
+    # 字体被替换，或打包字体目录有变化（例如新版本带了新字体）时重新探测
+    if cache.get('font') != _stat_signature(font_path):
+        return None
+    if cache.get('font_dir') != _stat_signature(BUNDLED_FONT_DIR):
+        return None
+    return font_path
+
+
+def save_cached_font_path(font_path):
+    """
+    保存解析出的字体路径，供下次启动使用
+    
+    Args:
+        font_path: 字体文件路径
+    """
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_FILE), exist_ok=True)
+        with open(FONT_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'path': font_path,
+                'font': _stat_signature(font_path),
+                'font_dir': _stat_signature(BUNDLED_FONT_DIR),
+            }, f)
+    except OSError as e:
+        print(f"[FONT] Failed to write font cache: {e}")
+
+
 def find_font_file():
     """
-    查找可用的中文字体文件
+    查找可用的中文字体文件（优先使用上次的缓存结果）
+    
+    Returns:
+        str: 字体文件的完整路径，如果找不到则返回 None
+    """
+    cached = load_cached_font_path()
+    if cached:
+        return cached
+    
+    font_path = probe_font_file()
+    if font_path:
+        save_cached_font_path(font_path)
+    return font_path
+
+
+def probe_font_file():
+    """
+    逐个探测字体搜索路径
     
     Returns:
         str: 字体文件的完整路径，如果找不到则返回 None
@@ -182,3 +273,83 @@ def create_tabbed_panel_header_kwargs(font_size='14sp', **kwargs):
     }
     header_kwargs.update(kwargs)
     return header_kwargs
+
+
+# 预热时使用的字号（Button 默认 15sp，列表和输入框常用 14/16sp）
+PREWARM_FONT_SIZES = ('14sp', '15sp', '16sp')
+
+
+def collect_charset(texts):
+    """
+    收集文本中用到的全部字符
+    
+    Args:
+        texts: 字符串的可迭代对象
+    
+    Returns:
+        str: 去重并排序后的字符
+    """
+    chars = set()
+    for text in texts:
+        chars.update(str(text))
+    chars.discard('\n')
+    return ''.join(sorted(chars))
+
+
+class GlyphPrewarmer:
+    """
+    后台预热字形缓存
+    
+    字符集在后台线程中计算；渲染必须在主线程（GL 上下文），
+    因此按帧分块进行，每帧只占用少量时间，避免首次打开搜索弹窗时卡顿。
+    """
+    
+    def __init__(self, font_name=None, font_sizes=PREWARM_FONT_SIZES, chunk_size=48, frame_budget_ms=4):
+        self.font_name = font_name or GLOBAL_FONT_NAME
+        self.font_sizes = font_sizes
+        self.chunk_size = chunk_size
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.pending = []
+        self.rendered = 0
+        self._event = None
+    
+    def start(self, texts):
+        """
+        开始预热
+        
+        Args:
+            texts: 需要预热的文本（物品名称、界面字符串等）
+        """
+        texts = list(texts)
+        threading.Thread(target=self._prepare, args=(texts,), daemon=True).start()
+    
+    def _prepare(self, texts):
+        charset = collect_charset(texts)
+        chunks = [charset[i:i + self.chunk_size] for i in range(0, len(charset), self.chunk_size)]
+        pending = [(chunk, size) for size in self.font_sizes for chunk in chunks]
+        Clock.schedule_once(lambda dt: self._schedule(pending))
+    
+    def _schedule(self, pending):
+        self.pending = pending
+        if self._event is None and pending:
+            self._event = Clock.schedule_interval(self._step, 0)
+    
+    def _step(self, dt):
+        start = time.perf_counter()
+        while self.pending and time.perf_counter() - start < self.frame_budget:
+            chunk, size = self.pending.pop()
+            label = CoreLabel(text=chunk, font_name=self.font_name, font_size=sp(size))
+            label.refresh()
+            self.rendered += len(chunk)
+        
+        if not self.pending:
+            print(f"[FONT] Pre-warmed {self.rendered} glyph renders")
+            self._event = None
+            return False
+    
+    def cancel(self):
+        """停止预热"""
+        self.pending = []
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
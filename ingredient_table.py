@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar Ingredients table
+Parallel typed columns instead of one dict per ingredient; rebuilt to the
+exact dict form (key order, value types) when the save is written
+"""
+
+import sys
+from array import array
+from collections.abc import MutableMapping
+
+# row_schema marker for deleted rows
+DELETED = 0xFFFF
+
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 63 - 1
+
+# Column kind -> (array typecode or None for a list, placeholder for rows without the field)
+COLUMN_KINDS = {
+    'int': ('q', 0),
+    'float': ('d', 0.0),
+    'bool': ('b', 0),
+    'str': (None, ''),
+    'obj': (None, None),
+}
+
+
+def _kind_of(value):
+    kind = type(value)
+    if kind is bool:
+        return 'bool'
+    if kind is int:
+        return 'int' if _INT_MIN <= value <= _INT_MAX else 'obj'
+    if kind is float:
+        return 'float'
+    if kind is str:
+        return 'str'
+    return 'obj'
+
+
+class Column:
+    """One field for every row, stored as a typed array where possible"""
+
+    __slots__ = ('kind', 'data')
+
+    @classmethod
+    def from_values(cls, values, missing):
+        """Build a column in one pass; rows holding `missing` get the placeholder"""
+        kinds = {_kind_of(v) for v in values if v is not missing}
+        kind = kinds.pop() if len(kinds) == 1 else 'obj'
+        column = cls.__new__(cls)
+        column.kind = kind
+        typecode, placeholder = COLUMN_KINDS[kind]
+        if any(v is missing for v in values):
+            values = [placeholder if v is missing else v for v in values]
+        if kind == 'str':
+            values = [sys.intern(v) for v in values]
+        column.data = array(typecode, values) if typecode else list(values)
+        return column
+
+    def __init__(self, kind, length=0):
+        self.kind = kind
+        typecode, placeholder = COLUMN_KINDS[kind]
+        if typecode:
+            self.data = array(typecode, [placeholder]) * length
+        else:
+            self.data = [placeholder] * length
+
+    def _accepts(self, value):
+        return self.kind == 'obj' or _kind_of(value) == self.kind
+
+    def _widen(self):
+        """Fall back to a plain list when a value does not fit the column type"""
+        self.data = self.values()
+        self.kind = 'obj'
+
+    def _store(self, value):
+        if self.kind == 'str':
+            return sys.intern(value)
+        return value
+
+    def append(self, value):
+        if not self._accepts(value):
+            self._widen()
+        self.data.append(self._store(value))
+
+    def append_placeholder(self):
+        self.data.append(COLUMN_KINDS[self.kind][1])
+
+    def get(self, row):
+        value = self.data[row]
+        return bool(value) if self.kind == 'bool' else value
+
+    def set(self, row, value):
+        if not self._accepts(value):
+            self._widen()
+        self.data[row] = self._store(value)
+
+    def fill(self, value, length):
+        """Set every row to value"""
+        if not self._accepts(value):
+            self._widen()
+        typecode = COLUMN_KINDS[self.kind][0]
+        value = self._store(value)
+        self.data = array(typecode, [value]) * length if typecode else [value] * length
+
+    def values(self):
+        """All values as Python objects"""
+        if self.kind == 'bool':
+            return list(map(bool, self.data))
+        return list(self.data)
+
+    def nbytes(self):
+        if isinstance(self.data, array):
+            return self.data.itemsize * len(self.data)
+        return sys.getsizeof(self.data)
+
+
+class RowView(MutableMapping):
+    """Dict-like access to one ingredient row"""
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, field):
+        if field not in self.table.schemas[self.table.row_schema[self.row]]:
+            raise KeyError(field)
+        return self.table.columns[field].get(self.row)
+
+    def __setitem__(self, field, value):
+        self.table.set_value(self.row, field, value)
+
+    def __delitem__(self, field):
+        self.table.delete_field(self.row, field)
+
+    def __iter__(self):
+        return iter(self.table.schemas[self.table.row_schema[self.row]])
+
+    def __len__(self):
+        return len(self.table.schemas[self.table.row_schema[self.row]])
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class IngredientTable(MutableMapping):
+    """Ingredients as parallel columns, keyed like the original dict
+
+    Each row records the field order of its original dict (a shared schema
+    tuple), so rows with missing or extra fields round-trip exactly.
+    Deleted rows are tombstoned; re-adding a key appends it at the end, as a
+    dict would.
+    """
+
+    def __init__(self):
+        self.row_keys = []
+        self.index = {}
+        self.schemas = []
+        self._schema_ids = {}
+        self.row_schema = array('H')
+        self.columns = {}
+
+    @classmethod
+    def from_dict(cls, ingredients):
+        """Build a table from save_data["Ingredients"]"""
+        table = cls()
+        records = list(ingredients.values())
+        if not all(isinstance(record, dict) for record in records):
+            raise TypeError("Ingredient records must be objects")
+        table.row_keys = [sys.intern(key) for key in ingredients]
+        table.index = {key: row for row, key in enumerate(table.row_keys)}
+        schema_id = table._schema_id
+        table.row_schema = array('H', [schema_id(tuple(record)) for record in records])
+
+        fields = {}
+        for schema in table.schemas:
+            for field in schema:
+                fields.setdefault(field)
+        missing = object()
+        for field in fields:
+            table.columns[field] = Column.from_values([record.get(field, missing) for record in records], missing)
+        return table
+
+    # ---- schemas ----
+
+    def _schema_id(self, fields):
+        sid = self._schema_ids.get(fields)
+        if sid is None:
+            sid = len(self.schemas)
+            if sid >= DELETED:
+                raise ValueError("Too many distinct ingredient layouts")
+            self.schemas.append(tuple(sys.intern(f) for f in fields))
+            self._schema_ids[fields] = sid
+        return sid
+
+    def _column(self, field, value):
+        column = self.columns.get(field)
+        if column is None:
+            column = Column(_kind_of(value), len(self.row_keys))
+            self.columns[sys.intern(field)] = column
+        return column
+
+    # ---- row access ----
+
+    def _append_row(self, key, record):
+        if not isinstance(record, dict):
+            raise TypeError("Ingredient records must be objects")
+        row = len(self.row_keys)
+        for field, value in record.items():
+            self._column(field, value)
+        for field, column in self.columns.items():
+            if field in record:
+                column.append(record[field])
+            else:
+                column.append_placeholder()
+        self.row_keys.append(sys.intern(key))
+        self.row_schema.append(self._schema_id(tuple(record)))
+        self.index[key] = row
+
+    def set_value(self, row, field, value):
+        column = self._column(field, value)
+        column.set(row, value)
+        schema = self.schemas[self.row_schema[row]]
+        if field not in schema:
+            self.row_schema[row] = self._schema_id(schema + (field,))
+
+    def delete_field(self, row, field):
+        schema = self.schemas[self.row_schema[row]]
+        if field not in schema:
+            raise KeyError(field)
+        self.row_schema[row] = self._schema_id(tuple(f for f in schema if f != field))
+
+    def __getitem__(self, key):
+        return RowView(self, self.index[key])
+
+    def __setitem__(self, key, record):
+        if isinstance(record, RowView):
+            record = dict(record)
+        row = self.index.get(key)
+        if row is None:
+            self._append_row(key, record)
+            return
+        # Replacing a record keeps the key's position, like dict assignment
+        for field, value in record.items():
+            self._column(field, value).set(row, value)
+        self.row_schema[row] = self._schema_id(tuple(record))
+
+    def __delitem__(self, key):
+        row = self.index.pop(key)
+        self.row_schema[row] = DELETED
+
+    def __iter__(self):
+        row_schema = self.row_schema
+        for row, key in enumerate(self.row_keys):
+            if row_schema[row] != DELETED:
+                yield key
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    # ---- column-wise operations ----
+
+    def fill(self, field, value, where=None):
+        """Set field on every row that has the field `where`; returns the row count
+
+        Rows without the field get it appended, like item[field] = value.
+        """
+        schemas = self.schemas
+        live = set(self.row_schema)
+        live.discard(DELETED)
+        qualifying = {sid for sid in live if where is None or where in schemas[sid]}
+        column = self._column(field, value)
+
+        if qualifying == live and len(self.index) == len(self.row_keys):
+            # Every row: rebuild the column in one step
+            column.fill(value, len(self.row_keys))
+            count = len(self.row_keys)
+        else:
+            rows = [row for row, sid in enumerate(self.row_schema) if sid in qualifying]
+            for row in rows:
+                column.set(row, value)
+            count = len(rows)
+
+        # Rows that did not have the field yet get it at the end of their order
+        extended = {sid: self._schema_id(schemas[sid] + (field,))
+                    for sid in qualifying if field not in schemas[sid]}
+        if extended:
+            self.row_schema = array('H', [extended.get(sid, sid) for sid in self.row_schema])
+        return count
+
+    def find(self, field, value):
+        """Key of the first row whose field equals value, or None"""
+        column = self.columns.get(field)
+        if column is None:
+            return None
+        data = column.data
+        start = 0
+        while True:
+            try:
+                row = data.index(value, start)
+            except (ValueError, TypeError):
+                return None
+            sid = self.row_schema[row]
+            if sid != DELETED and field in self.schemas[sid] and \
+                    _kind_of(column.get(row)) == _kind_of(value):
+                return self.row_keys[row]
+            start = row + 1
+
+    def iter_fields(self, fields, require=None, defaults=None):
+        """Yield (key, values...) for live rows that have the field `require`"""
+        defaults = defaults or {}
+        getters = [self.columns[f].values() if f in self.columns else None for f in fields]
+        for row, key in enumerate(self.row_keys):
+            sid = self.row_schema[row]
+            if sid == DELETED:
+                continue
+            schema = self.schemas[sid]
+            if require and require not in schema:
+                continue
+            yield (key,) + tuple(
+                values[row] if values is not None and f in schema else defaults.get(f)
+                for f, values in zip(fields, getters))
+
+    # ---- materialization ----
+
+    def to_dict(self):
+        """The exact dict form, for serialization"""
+        values = {field: column.values() for field, column in self.columns.items()}
+        schema_columns = [tuple(values[f] for f in schema) for schema in self.schemas]
+        result = {}
+        row_schema = self.row_schema
+        for row, key in enumerate(self.row_keys):
+            sid = row_schema[row]
+            if sid == DELETED:
+                continue
+            schema = self.schemas[sid]
+            result[key] = dict(zip(schema, [column[row] for column in schema_columns[sid]]))
+        return result
+
+    def nbytes(self):
+        """Approximate memory held by the table (column storage, keys and index)"""
+        total = sys.getsizeof(self.row_keys) + sys.getsizeof(self.index) + self.row_schema.itemsize * len(self.row_schema)
+        total += sum(column.nbytes() for column in self.columns.values())
+        # Interned strings are shared, count each distinct one once
+        strings = set(self.row_keys)
+        for column in self.columns.values():
+            if column.kind in ('str', 'obj'):
+                strings.update(v for v in column.data if isinstance(v, str))
+        total += sum(sys.getsizeof(s) for s in strings)
+        return total
+
+
+def dict_nbytes(ingredients):
+    """Approximate memory of the plain dict-of-dicts form, for comparison"""
+    total = sys.getsizeof(ingredients)
+    seen = set()
+    for key, record in ingredients.items():
+        total += sys.getsizeof(record)
+        for value in (key,) + tuple(record.values()):
+            if id(value) not in seen and not isinstance(value, bool):
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
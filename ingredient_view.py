@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingredient view model
+Keeps sorted orderings of the ingredient list up to date incrementally
+"""
+
+from bisect import bisect_left, insort
+
+SORT_COUNT = 'count'
+SORT_NAME = 'name'
+SORT_ID = 'id'
+SORT_MODES = (SORT_COUNT, SORT_NAME, SORT_ID)
+
+
+class IngredientViewModel:
+    """Sorted and filtered view over DaveSaveEditor.list_ingredients()"""
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.rows = {}
+        self._indexes = {mode: [] for mode in SORT_MODES}
+        self._filter_cache = ('', None)
+
+    @staticmethod
+    def _sort_key(mode, row):
+        """Index entry for a row; the row key keeps entries unique"""
+        if mode == SORT_COUNT:
+            return (-row['count'], row['name_lower'], row['key'])
+        if mode == SORT_NAME:
+            return (row['name_lower'], row['id'], row['key'])
+        return (row['id'], row['key'])
+
+    @staticmethod
+    def _make_row(ing):
+        row = dict(ing)
+        row['name_lower'] = str(ing['name']).lower()
+        row['id_str'] = str(ing['id'])
+        return row
+
+    def reload(self):
+        """Rebuild all indexes from the editor"""
+        self.rows = {ing['key']: self._make_row(ing) for ing in self.editor.list_ingredients()}
+        for mode in SORT_MODES:
+            self._indexes[mode] = sorted(self._sort_key(mode, row) for row in self.rows.values())
+        self._filter_cache = ('', None)
+        return len(self.rows)
+
+    def _insert(self, row):
+        self.rows[row['key']] = row
+        for mode in SORT_MODES:
+            insort(self._indexes[mode], self._sort_key(mode, row))
+
+    def _remove(self, key):
+        row = self.rows.pop(key)
+        for mode in SORT_MODES:
+            index = self._indexes[mode]
+            entry = self._sort_key(mode, row)
+            pos = bisect_left(index, entry)
+            if pos < len(index) and index[pos] == entry:
+                del index[pos]
+        return row
+
+    def update_item(self, key):
+        """Re-read one ingredient from the save and update indexes in place"""
+        ingredients = (self.editor.save_data or {}).get("Ingredients", {})
+        item = ingredients.get(key)
+
+        if key in self.rows:
+            old = self.rows[key]
+            if item is not None and item.get("ingredientsID") == old['id'] \
+                    and item.get("count", 0) == old['count']:
+                return False
+            self._remove(key)
+
+        if item is not None and "ingredientsID" in item:
+            ing_id = item["ingredientsID"]
+            item_db = self.editor.item_db
+            self._insert(self._make_row({
+                'id': ing_id,
+                'name': item_db.get_name(ing_id) if item_db else f"Item{ing_id}",
+                'count': item.get("count", 0),
+                'key': key
+            }))
+
+        self._filter_cache = ('', None)
+        return True
+
+    def _matching_keys(self, text):
+        """Keys of rows whose name or ID contains text (None means no filter)"""
+        if not text:
+            return None
+
+        # Typing usually extends the previous filter, so narrow the last match set
+        last_text, last_keys = self._filter_cache
+        if last_keys is not None and last_text and text.startswith(last_text):
+            candidates = (self.rows[k] for k in last_keys)
+        else:
+            candidates = self.rows.values()
+
+        keys = {row['key'] for row in candidates
+                if text in row['name_lower'] or text in row['id_str']}
+        self._filter_cache = (text, keys)
+        return keys
+
+    def _prefix_keys(self, text):
+        """Keys of rows whose name starts with text, found by bisecting the name index"""
+        index = self._indexes[SORT_NAME]
+        start = bisect_left(index, (text,))
+        keys = set()
+        for entry in index[start:]:
+            if not entry[0].startswith(text):
+                break
+            keys.add(entry[-1])
+        return keys
+
+    def view(self, sort=SORT_COUNT, filter_text='', prefix=False, limit=None):
+        """Return rows in the given order, optionally filtered by name/ID"""
+        if sort not in self._indexes:
+            raise ValueError(f"Unknown sort mode: {sort}")
+
+        text = filter_text.strip().lower()
+        if not text:
+            keys = None
+        elif prefix:
+            keys = self._prefix_keys(text)
+        else:
+            keys = self._matching_keys(text)
+
+        result = []
+        for entry in self._indexes[sort]:
+            key = entry[-1]
+            if keys is not None and key not in keys:
+                continue
+            result.append(self.rows[key])
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def count(self, filter_text='', prefix=False):
+        """Number of rows matching a filter"""
+        text = filter_text.strip().lower()
+        if not text:
+            return len(self.rows)
+        keys = self._prefix_keys(text) if prefix else self._matching_keys(text)
+        return len(keys)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Layered item catalogs
+Item names come from a stack of catalog files: user copies (Download/) over
+the bundled ones, and the selected locale over the base catalog. Each file
+is parsed on first use and looked up through an overlay instead of being
+merged; a file whose mtime changes is re-parsed off to the side and swapped
+in at once, so a running search never sees a half-built catalog.
+
+    items_id_map.json        base catalog
+    items_id_map.<lang>.json one locale, e.g. items_id_map.en.json
+
+    python item_catalog.py <bundled dir> [user dir ...] [--locale en] [--search word]
+"""
+
+import heapq
+import locale as system_locale
+import os
+import re
+import sys
+import threading
+from collections import ChainMap
+
+from log_utils import log_message, log_debug
+from perf_utils import perf
+from save_core import ItemDatabase
+
+CATALOG_NAME = 'items_id_map'
+CATALOG_SUFFIX = '.json'
+_LOCALE_FILE = re.compile(rf'^{CATALOG_NAME}\.([A-Za-z]{{2,3}}(?:[_-][A-Za-z0-9]+)?){re.escape(CATALOG_SUFFIX)}$')
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def preferred_locale(available):
+    """DAVESAVEED_LOCALE, else the system language, if a catalog exists for it (None otherwise)"""
+    wanted = os.environ.get('DAVESAVEED_LOCALE')
+    if wanted is None:
+        try:
+            wanted = system_locale.getlocale()[0]
+        except ValueError:
+            wanted = None
+    if not wanted:
+        return None
+    wanted = wanted.replace('-', '_')
+    by_lower = {name.lower().replace('-', '_'): name for name in available}
+    return by_lower.get(wanted.lower()) or by_lower.get(wanted.split('_')[0].lower())
+
+
+class CatalogLayer:
+    """One catalog file, parsed on first use and re-parsed when it changes on disk"""
+
+    __slots__ = ('path', 'locale', 'user', 'db', 'signature')
+
+    def __init__(self, path, locale=None, user=False):
+        self.path = path
+        self.locale = locale
+        self.user = user
+        self.db = None
+        self.signature = None
+
+    @property
+    def loaded(self):
+        return self.db is not None
+
+    def load(self):
+        """Parse the file into a fresh ItemDatabase; returns (db, signature) without installing them
+
+        The signature is taken before reading, so a write during the read
+        shows up as a change on the next check.
+        """
+        signature = _signature(self.path)
+        with perf.operation('catalog_load', file=os.path.basename(self.path)):
+            db = ItemDatabase(self.path)
+        return db, signature
+
+    def stale(self):
+        """Loaded, and the file's mtime or size differs from what was parsed"""
+        return self.db is not None and _signature(self.path) != self.signature
+
+    def __repr__(self):
+        return f"CatalogLayer({self.path!r}, locale={self.locale!r}, user={self.user})"
+
+
+class _View:
+    """Immutable snapshot of the active stack: ItemDatabases in priority order and their overlay"""
+
+    __slots__ = ('dbs', 'items')
+
+    def __init__(self, dbs):
+        self.dbs = dbs
+        self.items = ChainMap(*[db.items for db in dbs])
+
+
+class ItemCatalog:
+    """Item names from layered catalog files, with the ItemDatabase lookup interface
+
+    For the active locale the stack is, highest priority first: user locale
+    file, bundled locale file, user base file, bundled base file (those that
+    exist). An item takes its name from the first layer that has it.
+    """
+
+    def __init__(self, bundled_dir, user_dirs=(), locale=None):
+        self.bundled_dir = bundled_dir
+        self.user_dirs = [d for d in user_dirs if d and os.path.abspath(d) != os.path.abspath(bundled_dir)]
+        self.layers = {}
+        self._lock = threading.Lock()
+        self._view = None
+        self.discover()
+        if locale is None:
+            locale = preferred_locale(self.locales())
+        self.locale = locale if locale in self.locales() else None
+
+    # ---- layers ----
+
+    def _find(self, file_name):
+        """(user path or None, bundled path or None) for one catalog file name"""
+        user = next((os.path.join(d, file_name) for d in self.user_dirs
+                     if os.path.isfile(os.path.join(d, file_name))), None)
+        bundled = os.path.join(self.bundled_dir, file_name)
+        return user, bundled if os.path.isfile(bundled) else None
+
+    def discover(self):
+        """Find base and locale files (no parsing); keeps layers that were already loaded"""
+        names = {None: CATALOG_NAME + CATALOG_SUFFIX}
+        for directory in [self.bundled_dir] + self.user_dirs:
+            try:
+                entries = os.listdir(directory)
+            except OSError:
+                continue
+            for entry in entries:
+                match = _LOCALE_FILE.match(entry)
+                if match:
+                    names.setdefault(match.group(1), entry)
+
+        layers = {}
+        for locale, file_name in names.items():
+            user, bundled = self._find(file_name)
+            for path, is_user in ((user, True), (bundled, False)):
+                if path is None:
+                    continue
+                old = self.layers.get((locale, is_user))
+                layers[(locale, is_user)] = old if old is not None and old.path == path \
+                    else CatalogLayer(path, locale, is_user)
+        with self._lock:
+            self.layers = layers
+            self._view = None
+        log_debug(f"Catalog layers: {sorted(layers.values(), key=lambda layer: layer.path)}")
+        return len(layers)
+
+    def locales(self):
+        """Locales with a catalog file, sorted"""
+        return sorted({locale for locale, _ in self.layers if locale is not None})
+
+    def stack(self, locale=None):
+        """Layers consulted for a locale (default: the active one), highest priority first"""
+        locale = self.locale if locale is None else locale
+        order = [(locale, True), (locale, False)] if locale is not None else []
+        order += [(None, True), (None, False)]
+        return [self.layers[key] for key in order if key in self.layers]
+
+    def set_locale(self, locale):
+        """Switch the active locale (None: base catalog only); its files are parsed on first lookup"""
+        if locale is not None and locale not in self.locales():
+            raise KeyError(f"No catalog for locale: {locale}")
+        with self._lock:
+            self.locale = locale
+            self._view = None
+        log_message(f"Catalog locale: {locale or 'default'}")
+
+    def _current(self):
+        """The active snapshot, loading layers of the stack that were never used"""
+        view = self._view
+        if view is not None:
+            return view
+        with self._lock:
+            if self._view is None:
+                for layer in self.stack():
+                    if layer.db is None:
+                        layer.db, layer.signature = layer.load()
+                self._view = _View(tuple(layer.db for layer in self.stack()))
+            return self._view
+
+    # ---- hot reload ----
+
+    def changed(self):
+        """Loaded layers whose file changed since it was parsed (stat only)"""
+        return [layer for layer in list(self.layers.values()) if layer.stale()]
+
+    def reload_changed(self):
+        """Re-parse changed files, then swap them in together; returns the number of layers reloaded
+
+        Parsing happens outside the lock, so lookups keep using the previous
+        snapshot until the new one is complete.
+        """
+        fresh = [(layer,) + layer.load() for layer in self.changed()]
+        if not fresh:
+            return 0
+        with self._lock:
+            for layer, db, signature in fresh:
+                layer.db, layer.signature = db, signature
+            self._view = None
+        for layer, db, _ in fresh:
+            log_message(f"Catalog reloaded: {os.path.basename(layer.path)} ({len(db.items)} items)")
+        return len(fresh)
+
+    # ---- ItemDatabase interface ----
+
+    @property
+    def items(self):
+        """Read-only overlay {item ID: name} of the active stack"""
+        return self._current().items
+
+    def get_name(self, item_id):
+        """Get item name"""
+        return self._current().items.get(item_id, f"Unknown({item_id})")
+
+    def search_ids(self, keyword):
+        """Search by ID or name, returning matching item IDs in ID order
+
+        Each layer searches its own index; hits are kept only in the layer
+        the item's name comes from.
+        """
+        view = self._current()
+        try:
+            item_id = int(keyword)
+            if item_id in view.items:
+                return [item_id]
+        except ValueError:
+            pass
+
+        hits = []
+        for depth, db in enumerate(view.dbs):
+            found = db.search_ids(keyword)
+            if depth:
+                above = view.dbs[:depth]
+                found = [i for i in found if not any(i in upper.items for upper in above)]
+            hits.append(found)
+        return list(heapq.merge(*hits)) if len(hits) > 1 else (hits[0] if hits else [])
+
+    def search(self, keyword):
+        """Search by ID or name"""
+        items = self._current().items
+        return [(item_id, items[item_id]) for item_id in self.search_ids(keyword)]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the layered item catalog')
+    parser.add_argument('bundled_dir')
+    parser.add_argument('user_dirs', nargs='*')
+    parser.add_argument('--locale', default=None)
+    parser.add_argument('--search', default=None)
+    args = parser.parse_args(argv)
+
+    catalog = ItemCatalog(args.bundled_dir, args.user_dirs)
+    if args.locale:
+        catalog.set_locale(args.locale)
+    for layer in catalog.stack():
+        print(f"{'user' if layer.user else 'bundled':<8}{layer.locale or 'base':<8}{layer.path}")
+    print(f"{len(catalog.items)} items, locales: {', '.join(catalog.locales()) or '-'}")
+    if args.search:
+        for item_id, name in catalog.search(args.search)[:50]:
+            print(f"{item_id}\t{name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pluggable JSON backend
+
+Uses orjson or ujson when installed and falls back to the stdlib. Save output
+is guaranteed to be identical to
+json.dumps(obj, separators=(',', ':'), ensure_ascii=False): a fast backend is
+only selected if it passes a conformance probe, and at runtime its output is
+re-done with the stdlib whenever it may differ (exponent/tiny floats,
+non-finite numbers, integers beyond 64 bits).
+
+    python json_backend.py [save.sav ...]   # conformance check for every backend
+"""
+
+import json
+import os
+import re
+import sys
+
+from log_utils import log_message, log_debug
+
+# Float tokens the fast backends format differently from repr(): exponents
+# (1e16 vs 1e+16) and small numbers (0.00001 vs 1e-05). Matches inside strings
+# only cause a harmless stdlib fallback.
+_RISKY_FLOAT = re.compile(rb'\d[eE][+-]?\d|0\.0000')
+# Integer tokens outside int64/uint64: orjson parses them as floats without an
+# error, so they must be seen before parsing. 19 digits catches values below
+# -2**63 too; a match inside a string only costs a stdlib parse.
+_WIDE_INT = re.compile(r'\d{19,}')
+_WIDE_INT_BYTES = re.compile(_WIDE_INT.pattern.encode('ascii'))
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _stdlib_dumps_pretty(obj):
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+class StdlibBackend:
+    """Reference backend"""
+
+    name = 'stdlib'
+    # loads() takes UTF-8 bytes without decoding them to a str first
+    parses_bytes = False
+
+    def __init__(self):
+        self.nonfinite_seen = False
+
+    def _parse_constant(self, value):
+        # NaN/Infinity literals: remember them so fast dumps cannot turn them into null
+        self.nonfinite_seen = True
+        return float(value)
+
+    def loads(self, text):
+        return json.loads(text, parse_constant=self._parse_constant)
+
+    def dumps(self, obj):
+        return _stdlib_dumps(obj)
+
+    def dumps_pretty(self, obj):
+        return _stdlib_dumps_pretty(obj)
+
+    def _conforms(self, out):
+        """False if fast-backend output (UTF-8 bytes) may format a number differently from the stdlib"""
+        return not (_RISKY_FLOAT.search(out) or (self.nonfinite_seen and b'null' in out))
+
+
+class OrjsonBackend(StdlibBackend):
+    name = 'orjson'
+    parses_bytes = True
+
+    def __init__(self):
+        super().__init__()
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, text):
+        wide = _WIDE_INT if isinstance(text, str) else _WIDE_INT_BYTES
+        if wide.search(text):
+            return super().loads(text)
+        try:
+            return self.orjson.loads(text)
+        except (self.orjson.JSONDecodeError, TypeError):
+            # NaN, >64-bit integers, lone surrogates: the stdlib accepts these
+            return super().loads(text)
+
+    def dumps_bytes(self, obj):
+        try:
+            out = self.orjson.dumps(obj)
+        except TypeError:
+            return None
+        return out if self._conforms(out) else None
+
+    def dumps(self, obj):
+        out = self.dumps_bytes(obj)
+        return out.decode('utf-8') if out is not None else _stdlib_dumps(obj)
+
+    def dumps_pretty(self, obj):
+        try:
+            out = self.orjson.dumps(obj, option=self.orjson.OPT_INDENT_2)
+        except TypeError:
+            return _stdlib_dumps_pretty(obj)
+        return out.decode('utf-8') if self._conforms(out) else _stdlib_dumps_pretty(obj)
+
+
+class UjsonBackend(StdlibBackend):
+    name = 'ujson'
+
+    def __init__(self):
+        super().__init__()
+        import ujson
+        self.ujson = ujson
+
+    def loads(self, text):
+        try:
+            return self.ujson.loads(text)
+        except (ValueError, OverflowError):
+            return super().loads(text)
+
+    def dumps(self, obj):
+        try:
+            out = self.ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        except (OverflowError, TypeError, ValueError):
+            return _stdlib_dumps(obj)
+        return out if self._conforms(out.encode('utf-8', 'surrogatepass')) else _stdlib_dumps(obj)
+
+    def dumps_pretty(self, obj):
+        try:
+            out = self.ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, indent=2)
+        except (OverflowError, TypeError, ValueError):
+            return _stdlib_dumps_pretty(obj)
+        return out if self._conforms(out.encode('utf-8', 'surrogatepass')) else _stdlib_dumps_pretty(obj)
+
+
+BACKENDS = {
+    'orjson': OrjsonBackend,
+    'ujson': UjsonBackend,
+    'stdlib': StdlibBackend,
+}
+PREFERENCE = ('orjson', 'ujson', 'stdlib')
+
+# Values where backends are known to disagree with the stdlib
+PROBE_DOCUMENT = {
+    "ints": [0, -1, 2 ** 31, 2 ** 53 + 1, 2 ** 63 - 1, -2 ** 63, 2 ** 64 - 1, 2 ** 64, -2 ** 63 - 1,
+             123456789012345678901234567890],
+    "floats": [0.1, 1.5, -0.0, 1e15, 123.456, 0.0001, 1e-05, 1e16, 5e-324, 1.7976931348623157e308],
+    "strings": ["", "Dave", "潜水员戴夫", "😀", "quote\"back\\slash/", "\x00\x1f\x7f  ", "\t\n\r\b\f"],
+    "nested": {"a": [], "b": {}, "c": [None, True, False], "d": {"e": [{"f": "g"}]}},
+    "m_Gold": 999999999,
+    "lastGainTime": "10/03/2022 08:30:52",
+}
+
+
+def check_backend(backend, documents=(PROBE_DOCUMENT,)):
+    """Return a list of conformance failures for a backend (empty means conformant)"""
+    failures = []
+    for index, document in enumerate(documents):
+        expected = _stdlib_dumps(document)
+        try:
+            actual = backend.dumps(document)
+            parsed = backend.loads(expected)
+        except Exception as e:
+            failures.append(f"document {index}: {type(e).__name__}: {e}")
+            continue
+        if actual != expected:
+            failures.append(f"document {index}: dumps output differs")
+        # Exports may be indented differently, but must hold the same number tokens
+        if _stdlib_dumps(json.loads(backend.dumps_pretty(document))) != expected:
+            failures.append(f"document {index}: dumps_pretty values differ")
+        if _stdlib_dumps(parsed) != expected:
+            failures.append(f"document {index}: loads result differs")
+    return failures
+
+
+def available_backends():
+    """Instantiate every backend whose library is importable"""
+    backends = []
+    for name in PREFERENCE:
+        try:
+            backends.append(BACKENDS[name]())
+        except ImportError:
+            continue
+    return backends
+
+
+def select_backend(preferred=None):
+    """Pick the fastest installed backend that passes the conformance probe"""
+    names = [preferred] if preferred else list(PREFERENCE)
+    for name in names:
+        cls = BACKENDS.get(name)
+        if cls is None:
+            log_message(f"Unknown JSON backend: {name}")
+            continue
+        try:
+            backend = cls()
+        except ImportError:
+            log_debug(f"JSON backend {name} not installed")
+            continue
+        failures = check_backend(backend)
+        if failures:
+            log_message(f"JSON backend {name} rejected: {failures[0]}")
+            continue
+        log_debug(f"JSON backend: {name}")
+        return backend
+    return StdlibBackend()
+
+
+# Override with DAVESAVEED_JSON_BACKEND=stdlib|orjson|ujson
+serializer = select_backend(os.environ.get('DAVESAVEED_JSON_BACKEND'))
+
+
+def main(argv=None):
+    """Conformance check: every backend must round-trip saves byte-identically"""
+    from save_core import decode_sav_to_json, encode_json_to_sav, clean_json_string
+
+    paths = sys.argv[1:] if argv is None else argv
+    saves = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            saves.append((path, f.read()))
+    if not saves:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+        from benchmark import generate_sav
+        saves = [(f'synthetic-{n}', generate_sav(n, seed=n)) for n in (10, 500, 3000)]
+
+    failed = False
+    for backend in available_backends():
+        problems = check_backend(backend)
+        for name, encrypted_bytes in saves:
+            json_str = clean_json_string(decode_sav_to_json(encrypted_bytes))
+            try:
+                data = backend.loads(json_str)
+                output = encode_json_to_sav(backend.dumps(data))
+            except Exception as e:
+                problems.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            if output != encrypted_bytes:
+                problems.append(f"{name}: re-encoded save differs")
+        status = 'OK  ' if not problems else 'FAIL'
+        print(f"{status} {backend.name}")
+        for problem in problems:
+            print(f"     {problem}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging utilities
+Buffered background logger with levels, size rotation and gzip compression
+"""
+
+import atexit
+import glob
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+
+LOGGER_NAME = 'DaveSaveEd'
+LOG_FILE_NAME = 'app.log'
+LOG_MAX_BYTES = 512 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Release builds stay at INFO; set DAVESAVEED_LOG_LEVEL=DEBUG for pipeline detail
+DEFAULT_LOG_LEVEL = os.environ.get('DAVESAVEED_LOG_LEVEL', 'INFO').upper()
+
+IS_ANDROID = 'ANDROID_ARGUMENT' in os.environ
+
+LOG_FILE = None
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False
+_logger.setLevel(DEFAULT_LOG_LEVEL)
+_listener = None
+
+
+def get_app_dir(*parts):
+    """Return a path under the app data directory (/sdcard/DaveSaveEd on Android)"""
+    if IS_ANDROID:
+        base = '/sdcard/DaveSaveEd'
+    else:
+        base = os.path.expanduser('~/DaveSaveEd')
+    return os.path.join(base, *parts)
+
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+
+def _gzip_rotator(source, dest):
+    """Compress a rotated log file, runs on the writer thread"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _cleanup_legacy_logs(log_dir, keep=LOG_BACKUP_COUNT):
+    """Remove per-launch app_<timestamp>.log files left by older versions"""
+    legacy = sorted(glob.glob(os.path.join(log_dir, 'app_*.log')))
+    for path in legacy[:-keep] if keep else legacy:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def init_logging(level=None, log_dir=None):
+    """Initialize logging"""
+    global LOG_FILE, _listener
+
+    _logger.setLevel(level or DEFAULT_LOG_LEVEL)
+    if _listener is not None:
+        return True
+
+    formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%H:%M:%S')
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(formatter)
+    handlers = [console]
+
+    try:
+        log_dir = log_dir or get_app_dir('logs')
+        os.makedirs(log_dir, exist_ok=True)
+        _cleanup_legacy_logs(log_dir)
+
+        LOG_FILE = os.path.join(log_dir, LOG_FILE_NAME)
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+        file_handler.setFormatter(logging.Formatter(
+            '[%(asctime)s] %(levelname)s %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        handlers.append(file_handler)
+    except Exception as e:
+        LOG_FILE = None
+        print(f"Failed to initialize log file: {e}")
+
+    # Callers only enqueue; formatting and file I/O happen on the listener thread
+    log_queue = queue.SimpleQueue()
+    _logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    log_message("=== DaveSaveEd Started ===")
+    log_message(f"Log file: {LOG_FILE}")
+    return LOG_FILE is not None
+
+
+def shutdown_logging():
+    """Flush queued records and close the log file"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+
+
+def log_message(msg, level=logging.INFO):
+    """Log message to file and console"""
+    if not _logger.isEnabledFor(level):
+        return
+    if _listener is None:
+        # Logging not initialized (CLI, tools): keep the old console behaviour
+        print(msg)
+        return
+    _logger.log(level, msg)
+
+
+def log_debug(msg):
+    """Log a debug-level message (dropped in release builds)"""
+    log_message(msg, logging.DEBUG)
+
+
+def log_error(msg):
+    """Log an error-level message"""
+    log_message(msg, logging.ERROR)
+
+
+def set_log_level(level):
+    """Change the log level at runtime (e.g. 'WARNING' to silence tools)"""
+    _logger.setLevel(level)
@@ -7,798 +7,75 @@ Kivy GUI Edition
 
 import os
 import sys
-import json
-import re
-import shutil
 import time
-import traceback
-from datetime import datetime
+import threading
 from pathlib import Path
 
-# Kivy imports
+# Startup timing starts before the heavy imports
+from perf_utils import StartupTimer, perf, format_report
+
+# Time-to-interactive budget for the startup report (ms)
+STARTUP_BUDGET_MS = 1500
+startup = StartupTimer(budget_ms=STARTUP_BUDGET_MS)
+
+# Kivy imports: only what the first frame shows. Widgets of tabs and popups
+# (popups.py) are imported when those are first built.
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.uix.popup import Popup
-from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelHeader
 from kivy.core.window import Window
 from kivy.clock import Clock
 from kivy.utils import platform
-from kivy.metrics import dp
+startup.mark('kivy')
 
-# Import font utilities
+# Import font utilities (first-frame labels need the registered font)
 from font_utils import GLOBAL_FONT_NAME
+startup.mark('font')
 
-# ============ Logging Configuration ============
-LOG_FILE = None
-
-def init_logging():
-    """Initialize logging"""
-    global LOG_FILE
-    try:
-        if platform == 'android':
-            log_dir = '/sdcard/DaveSaveEd/logs'
-        else:
-            log_dir = os.path.expanduser('~/DaveSaveEd/logs')
-        
-        os.makedirs(log_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        LOG_FILE = os.path.join(log_dir, f'app_{timestamp}.log')
-        log_message("=== DaveSaveEd Started ===")
-        log_message(f"Log file: {LOG_FILE}")
-        log_message(f"Platform: {platform}")
-        return True
-    except Exception as e:
-        print(f"Failed to initialize logging: {e}")
-        return False
-
-def log_message(msg):
-    """Log message to file and console"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_line = f"[{timestamp}] {msg}"
-    print(log_line)
-    
-    if LOG_FILE:
-        try:
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(log_line + '\n')
-        except:
-            pass
-
-# ============ Configuration Constants ============
-XOR_KEY = b"GameData"
-BYPASS_PREFIX = "BYPASSED_HEX::"
+from ingredient_view import IngredientViewModel, SORT_COUNT, SORT_NAME, SORT_ID
+from log_utils import init_logging, shutdown_logging, log_message, log_debug
+from save_core import SAVE_MAX_INGREDIENT, FIELDS, DaveSaveEditor, diff_saves
+from export_io import COMPRESSIONS, export_path, stream_export, import_json_to_sav, validate_export
+from save_diff import load_patch, save_patch, summarize
+from workspace import SaveWorkspace
+from item_catalog import ItemCatalog
+from save_index import SaveIndex
+from save_watcher import SaveWatcher
+startup.mark('modules')
 
-# Value limits
-SAVE_MAX_CURRENCY = 999999999
-SAVE_MAX_FLAME = 999999
-SAVE_MAX_FOLLOWER = 99999
-SAVE_MAX_INGREDIENT = 9999
-SAVE_MAX_ITEM = 999
-
-# Problem field triggers (for special handling)
-TROUBLESOME_TRIGGERS = [
-    b'"FarmAnimal":[{"FarmAnimalID":11090001,"Name":"',
-]
-END_MARKER = b'"],'
-
-
-def xor_bytes(data_bytes, key_bytes, key_start_index=0):
-    """Perform XOR encryption/decryption"""
-    key_len = len(key_bytes)
-    return bytes([byte ^ key_bytes[(key_start_index + i) % key_len] 
-                  for i, byte in enumerate(data_bytes)])
-
-
-def find_field_details(encrypted_bytes, start_pos):
-    """Find details of problematic field"""
-    field_len = None
-    
-    slice_for_len_check = encrypted_bytes[start_pos:]
-    for offset_pass1 in range(len(XOR_KEY)):
-        temp_key_idx = (start_pos + offset_pass1) % len(XOR_KEY)
-        decrypted_slice = xor_bytes(slice_for_len_check, XOR_KEY, key_start_index=temp_key_idx)
-        
-        try:
-            end_marker_pos = decrypted_slice.index(END_MARKER)
-            field_len = end_marker_pos
-            break
-        except ValueError:
-            continue
-    
-    if field_len is None:
-        return None, None
-    
-    resync_pos = start_pos + field_len
-    if resync_pos >= len(encrypted_bytes):
-        return None, None
-    
-    slice_len = min(50, len(encrypted_bytes) - resync_pos)
-    slice_for_offset_check = encrypted_bytes[resync_pos:resync_pos + slice_len]
-    
-    for offset_pass2 in range(len(XOR_KEY)):
-        temp_key_idx = (resync_pos + offset_pass2) % len(XOR_KEY)
-        decrypted_slice = xor_bytes(slice_for_offset_check, XOR_KEY, key_start_index=temp_key_idx)
-        
-        if decrypted_slice.startswith(END_MARKER):
-            return field_len, temp_key_idx
-    
-    return field_len, None
-
-
-def decode_sav_to_json(encrypted_bytes):
-    """Decrypt .sav file to JSON string"""
-    output_buffer = bytearray()
-    data_idx = 0
-    key_idx = 0
-    
-    while data_idx < len(encrypted_bytes):
-        decrypted_byte = encrypted_bytes[data_idx] ^ XOR_KEY[key_idx % len(XOR_KEY)]
-        output_buffer.append(decrypted_byte)
-        
-        trigger_found = False
-        for trigger in TROUBLESOME_TRIGGERS:
-            if output_buffer.endswith(trigger):
-                field_start_pos = data_idx + 1
-                length, new_key_idx = find_field_details(encrypted_bytes, field_start_pos)
-                
-                if length is not None and new_key_idx is not None:
-                    field_bytes = encrypted_bytes[field_start_pos:field_start_pos + length]
-                    
-                    output_buffer = output_buffer[:-len(trigger)]
-                    output_buffer.extend(trigger)
-                    bypass_string = f'{BYPASS_PREFIX}{field_bytes.hex()}:{new_key_idx}'
-                    output_buffer.extend(bypass_string.encode('ascii'))
-                    
-                    data_idx = field_start_pos + length
-                    key_idx = new_key_idx
-                    trigger_found = True
-                break
-        
-        if not trigger_found:
-            data_idx += 1
-            key_idx += 1
-    
-    return output_buffer.decode('utf-8', errors='ignore')
-
-
-def encode_json_to_sav(json_string):
-    """Encrypt JSON string to .sav format"""
-    pattern = re.compile(rf'{BYPASS_PREFIX}([a-fA-F0-9]+):(\d+)')
-    output_bytes = bytearray()
-    last_end = 0
-    key_idx = 0
-    
-    for match in pattern.finditer(json_string):
-        start, end = match.span()
-        
-        clean_part_str = json_string[last_end:start]
-        clean_part_bytes = clean_part_str.encode('utf-8')
-        output_bytes.extend(xor_bytes(clean_part_bytes, XOR_KEY, key_start_index=key_idx))
-        key_idx = (key_idx + len(clean_part_bytes)) % len(XOR_KEY)
-        
-        hex_data = match.group(1)
-        new_key_idx = int(match.group(2))
-        
-        raw_field_bytes = bytes.fromhex(hex_data)
-        output_bytes.extend(raw_field_bytes)
-        key_idx = new_key_idx
-        
-        last_end = end
-    
-    remaining_part_str = json_string[last_end:]
-    remaining_part_bytes = remaining_part_str.encode('utf-8')
-    output_bytes.extend(xor_bytes(remaining_part_bytes, XOR_KEY, key_start_index=key_idx))
-    
-    return bytes(output_bytes)
-
-
-def clean_json_string(json_str):
-    """Clean JSON string by removing invalid characters"""
-    # Remove BOM if present
-    if json_str.startswith('\ufeff'):
-        json_str = json_str[1:]
-    
-    # Remove control characters except common whitespace
-    result = []
-    for char in json_str:
-        code = ord(char)
-        # Allow: printable chars, tab(9), newline(10), carriage return(13)
-        if code >= 32 or code in (9, 10, 13):
-            result.append(char)
-    
-    cleaned = ''.join(result)
-    
-    # Try to fix truncated JSON
-    # Count braces and brackets
-    brace_count = 0
-    bracket_count = 0
-    last_valid_pos = len(cleaned) - 1
-    
-    for i, char in enumerate(cleaned):
-        if char == '{':
-            brace_count += 1
-        elif char == '}':
-            brace_count -= 1
-        elif char == '[':
-            bracket_count += 1
-        elif char == ']':
-            bracket_count -= 1
-        
-        # Record last balanced position
-        if brace_count == 0 and bracket_count == 0 and i > 0:
-            last_valid_pos = i
-    
-    if last_valid_pos < len(cleaned) - 1:
-        log_message(f"Truncated JSON at position {last_valid_pos}")
-        cleaned = cleaned[:last_valid_pos + 1]
-    
-    return cleaned
+# Time per frame spent interning strings of a freshly loaded save (seconds)
+COMPACTION_FRAME_BUDGET = 0.004
 
+# Seconds between checks for saves rewritten by the game (a stat per open save)
+WATCH_INTERVAL = 2.0
 
-class ItemDatabase:
-    """Item database class"""
-    
-    def __init__(self, json_path):
-        self.items = {}
-        self.name_to_id = {}
-        self.load_database(json_path)
-    
-    def load_database(self, json_path):
-        """Load item database"""
-        try:
-            log_message(f"Loading database: {json_path}")
-            if os.path.exists(json_path):
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                log_message(f"Database file size: {len(content)} characters")
-                
-                # Clean and parse JSON
-                content = clean_json_string(content)
-                
-                try:
-                    data = json.loads(content)
-                    
-                    # Handle different JSON structures
-                    if isinstance(data, dict):
-                        self.items = {int(k): v for k, v in data.items() if str(k).isdigit()}
-                    elif isinstance(data, list):
-                        self.items = {int(item['id']): item['name'] for item in data if 'id' in item and 'name' in item}
-                    
-                    self.name_to_id = {v: k for k, v in self.items.items()}
-                    log_message(f"Database loaded: {len(self.items)} items")
-                    return True
-                    
-                except json.JSONDecodeError as e:
-                    log_message(f"JSON parse failed: {e}")
-                    return False
-            else:
-                log_message(f"Database file not found: {json_path}")
-            return False
-            
-        except Exception as e:
-            log_message(f"Failed to load database: {e}")
-            log_message(traceback.format_exc())
-            return False
-    
-    def search(self, keyword):
-        """Search by ID or name"""
-        try:
-            item_id = int(keyword)
-            if item_id in self.items:
-                return [(item_id, self.items[item_id])]
-        except ValueError:
-            pass
-        
-        keyword = keyword.lower()
-        results = []
-        for item_id, item_name in self.items.items():
-            if keyword in item_name.lower():
-                results.append((item_id, item_name))
-        return results
-    
-    def get_name(self, item_id):
-        """Get item name"""
-        return self.items.get(item_id, f"Unknown({item_id})")
+# Seconds between autosave checks; the write cadence itself is AutosavePolicy's
+AUTOSAVE_TICK = 1.0
 
 
-class DaveSaveEditor:
-    """Save editor main class"""
-    
-    def __init__(self):
-        self.save_data = None
-        self.file_path = None
-        self.backup_path = None
-        self.item_db = None
-        self.last_error = None
-    
-    def load_item_database(self, json_path):
-        """Load item database"""
-        self.item_db = ItemDatabase(json_path)
-        return len(self.item_db.items) > 0
-    
-    def load_save_file(self, filepath):
-        """Load save file"""
-        self.last_error = None
-        try:
-            log_message(f"Loading save: {filepath}")
-            
-            # Check if file exists
-            if not os.path.exists(filepath):
-                self.last_error = f"File not found: {filepath}"
-                log_message(self.last_error)
-                return False
-            
-            # Check file size
-            file_size = os.path.getsize(filepath)
-            log_message(f"File size: {file_size} bytes")
-            
-            if file_size == 0:
-                self.last_error = "File is empty"
-                log_message(self.last_error)
-                return False
-            
-            # Read file
-            with open(filepath, 'rb') as f:
-                encrypted_bytes = f.read()
-            
-            log_message(f"Read {len(encrypted_bytes)} bytes")
-            
-            # Decrypt
-            json_str = decode_sav_to_json(encrypted_bytes)
-            log_message(f"Decrypted, JSON length: {len(json_str)}")
-            
-            # Clean JSON
-            json_str = clean_json_string(json_str)
-            log_message(f"Cleaned JSON length: {len(json_str)}")
-            
-            # Parse JSON
-            self.save_data = json.loads(json_str)
-            self.file_path = filepath
-            
-            log_message("Save loaded successfully")
-            return True
-            
-        except json.JSONDecodeError as e:
-            self.last_error = f"JSON parse error: {e}"
-            log_message(self.last_error)
-            # Save debug file
-            try:
-                debug_path = '/sdcard/DaveSaveEd/debug_decrypted.json'
-                with open(debug_path, 'w', encoding='utf-8') as f:
-                    f.write(json_str if 'json_str' in locals() else "Decryption failed")
-                log_message(f"Debug file saved: {debug_path}")
-            except:
-                pass
-            return False
-        except Exception as e:
-            self.last_error = f"Load failed: {str(e)}"
-            log_message(self.last_error)
-            log_message(traceback.format_exc())
-            return False
-    
-    def create_backup(self):
-        """Create backup"""
-        if not self.file_path:
-            return False
-        
-        try:
-            backup_dir = os.path.join(os.path.dirname(self.file_path), "backups")
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.basename(self.file_path)
-            backup_name = f"{filename}_{timestamp}.bak"
-            self.backup_path = os.path.join(backup_dir, backup_name)
-            
-            shutil.copy2(self.file_path, self.backup_path)
-            log_message(f"Backup created: {self.backup_path}")
-            return True
-        except Exception as e:
-            log_message(f"Backup failed: {e}")
-            return False
-    
-    def save_save_file(self):
-        """Save save file"""
-        if not self.save_data or not self.file_path:
-            return False
-        
-        try:
-            self.create_backup()
-            json_str = json.dumps(self.save_data, separators=(',', ':'), ensure_ascii=False)
-            encrypted_bytes = encode_json_to_sav(json_str)
-            
-            with open(self.file_path, 'wb') as f:
-                f.write(encrypted_bytes)
-            
-            log_message(f"Save saved: {self.file_path}")
-            return True
-        except Exception as e:
-            log_message(f"Save failed: {e}")
-            log_message(traceback.format_exc())
-            return False
-    
-    def get_current_values(self):
-        """Get current values"""
-        if not self.save_data:
-            return None
-        
-        player_info = self.save_data.get("PlayerInfo", {})
-        sns_info = self.save_data.get("SNSInfo", {})
-        
-        return {
-            'gold': player_info.get("m_Gold", 0),
-            'bei': player_info.get("m_Bei", 0),
-            'flame': player_info.get("m_ChefFlame", 0),
-            'follower': sns_info.get("m_Follow_Count", 0)
-        }
-    
-    def set_gold(self, value):
-        """Set gold"""
-        if not self.save_data:
-            return False
-        
-        if "PlayerInfo" not in self.save_data:
-            self.save_data["PlayerInfo"] = {}
-        
-        value = min(value, SAVE_MAX_CURRENCY)
-        self.save_data["PlayerInfo"]["m_Gold"] = value
-        return True
-    
-    def set_bei(self, value):
-        """Set bei currency"""
-        if not self.save_data:
-            return False
-        
-        if "PlayerInfo" not in self.save_data:
-            self.save_data["PlayerInfo"] = {}
-        
-        value = min(value, SAVE_MAX_CURRENCY)
-        self.save_data["PlayerInfo"]["m_Bei"] = value
-        return True
-    
-    def set_flame(self, value):
-        """Set flame"""
-        if not self.save_data:
-            return False
-        
-        if "PlayerInfo" not in self.save_data:
-            self.save_data["PlayerInfo"] = {}
-        
-        value = min(value, SAVE_MAX_FLAME)
-        self.save_data["PlayerInfo"]["m_ChefFlame"] = value
-        return True
-    
-    def set_follower(self, value):
-        """Set follower count"""
-        if not self.save_data:
-            return False
-        
-        if "SNSInfo" not in self.save_data:
-            self.save_data["SNSInfo"] = {}
-        
-        value = min(value, SAVE_MAX_FOLLOWER)
-        self.save_data["SNSInfo"]["m_Follow_Count"] = value
-        return True
-    
-    def list_ingredients(self):
-        """List all ingredients"""
-        if not self.save_data or "Ingredients" not in self.save_data:
-            return []
-        
-        ingredients = []
-        for key, item in self.save_data["Ingredients"].items():
-            if "ingredientsID" in item:
-                ing_id = item["ingredientsID"]
-                count = item.get("count", 0)
-                name = self.item_db.get_name(ing_id) if self.item_db else f"Item{ing_id}"
-                ingredients.append({
-                    'id': ing_id,
-                    'name': name,
-                    'count': count,
-                    'key': key
-                })
-        
-        return ingredients
-    
-    def set_all_ingredients(self, value):
-        """Set all ingredient quantities"""
-        if not self.save_data or "Ingredients" not in self.save_data:
-            return False
-        
-        value = min(value, SAVE_MAX_INGREDIENT)
-        count = 0
-        
-        for key, item in self.save_data["Ingredients"].items():
-            if "ingredientsID" in item:
-                self.save_data["Ingredients"][key]["count"] = value
-                count += 1
-        
-        return count
-    
-    def search_and_modify_item(self, keyword, new_value):
-        """Search and modify item"""
-        if not self.save_data or not self.item_db:
-            return False, "Save or database not loaded"
-        
-        results = self.item_db.search(keyword)
-        
-        if not results:
-            return False, f"'{keyword}' not found"
-        
-        if len(results) == 1:
-            item_id, item_name = results[0]
-            return self._modify_item_by_id(item_id, item_name, new_value)
-        else:
-            return "multiple", results
-    
-    def _modify_item_by_id(self, item_id, item_name, new_value):
-        """Modify item quantity by ID"""
-        modified = False
-        
-        if "Ingredients" in self.save_data:
-            for key, item in self.save_data["Ingredients"].items():
-                if item.get("ingredientsID") == item_id:
-                    item["count"] = min(new_value, SAVE_MAX_INGREDIENT)
-                    modified = True
-                    break
-        
-        if not modified:
-            if "Ingredients" not in self.save_data:
-                self.save_data["Ingredients"] = {}
-            
-            key = str(item_id)
-            self.save_data["Ingredients"][key] = {
-                "ingredientsID": item_id,
-                "parentID": item_id,
-                "count": min(new_value, SAVE_MAX_INGREDIENT),
-                "level": 1,
-                "branchCount": 0,
-                "isNew": True,
-                "placeTagMask": 1,
-                "lastGainTime": datetime.now().strftime("%m/%d/%Y %H:%M:%S"),
-                "lastGainGameTime": "10/03/2022 08:30:52"
-            }
-            modified = True
-        
-        return True, item_name if modified else False
-    
-    def set_ingredient_count(self, ingredient_key, value):
-        """Set specific ingredient quantity"""
-        if not self.save_data or "Ingredients" not in self.save_data:
-            return False
-        
-        if ingredient_key in self.save_data["Ingredients"]:
-            value = min(value, SAVE_MAX_INGREDIENT)
-            self.save_data["Ingredients"][ingredient_key]["count"] = value
-            return True
-        return False
-
-
-class FileChooserPopup(Popup):
-    """File chooser popup"""
-    
-    def __init__(self, callback, **kwargs):
-        super().__init__(**kwargs)
-        self.title = 'Select Save File (.sav)'
-        self.title_font = GLOBAL_FONT_NAME
-        self.size_hint = (0.9, 0.9)
-        self.callback = callback
-        
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        if platform == 'android':
-            from android.storage import primary_external_storage_path
-            initial_path = primary_external_storage_path()
-        else:
-            initial_path = os.path.expanduser('~')
-        
-        self.filechooser = FileChooserListView(
-            path=initial_path,
-            filters=['*.sav'],
-            dirselect=False
-        )
-        layout.add_widget(self.filechooser)
-        
-        btn_layout = BoxLayout(size_hint_y=0.1, spacing=10)
-        
-        btn_cancel = Button(text='Cancel', font_name=GLOBAL_FONT_NAME)
-        btn_cancel.bind(on_press=self.dismiss)
-        
-        btn_select = Button(text='Select', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.8, 0.2, 1))
-        btn_select.bind(on_press=self.on_select)
-        
-        btn_layout.add_widget(btn_cancel)
-        btn_layout.add_widget(btn_select)
-        
-        layout.add_widget(btn_layout)
-        self.add_widget(layout)
-    
-    def on_select(self, instance):
-        if self.filechooser.selection:
-            selected_path = self.filechooser.selection[0]
-            log_message(f"User selected: {selected_path}")
-            self.callback(selected_path)
-            self.dismiss()
-
-
-class MessagePopup(Popup):
-    """Message popup"""
-    
-    def __init__(self, title, message, **kwargs):
-        super().__init__(**kwargs)
-        self.title = title
-        self.title_font = GLOBAL_FONT_NAME
-        self.size_hint = (0.8, 0.4)
-        
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
-        
-        layout.add_widget(Label(
-            text=message,
-            font_name=GLOBAL_FONT_NAME,
-            font_size='16sp',
-            text_size=(None, None),
-            halign='center'
-        ))
-        
-        btn_ok = Button(text='OK', font_name=GLOBAL_FONT_NAME, size_hint_y=0.3)
-        btn_ok.bind(on_press=self.dismiss)
-        layout.add_widget(btn_ok)
-        
-        self.add_widget(layout)
-
-
-class NumberInputPopup(Popup):
-    """Number input popup"""
-    
-    def __init__(self, title, hint, max_val, callback, **kwargs):
-        super().__init__(**kwargs)
-        self.title = title
-        self.title_font = GLOBAL_FONT_NAME
-        self.size_hint = (0.8, 0.4)
-        self.callback = callback
-        self.max_val = max_val
-        
-        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
-        
-        self.text_input = TextInput(
-            hint_text=hint,
-            font_name=GLOBAL_FONT_NAME,
-            input_filter='int',
-            multiline=False,
-            font_size='18sp'
-        )
-        layout.add_widget(self.text_input)
-        
-        btn_layout = BoxLayout(size_hint_y=0.4, spacing=10)
-        
-        btn_cancel = Button(text='Cancel', font_name=GLOBAL_FONT_NAME)
-        btn_cancel.bind(on_press=self.dismiss)
-        
-        btn_ok = Button(text='OK', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.8, 0.2, 1))
-        btn_ok.bind(on_press=self.on_confirm)
-        
-        btn_layout.add_widget(btn_cancel)
-        btn_layout.add_widget(btn_ok)
-        
-        layout.add_widget(btn_layout)
-        self.add_widget(layout)
+class LazyTabbedPanel(TabbedPanel):
+    """TabbedPanel that builds a tab's content the first time the tab is selected
     
-    def on_confirm(self, instance):
-        try:
-            value = int(self.text_input.text)
-            if value < 0:
-                value = 0
-            if value > self.max_val:
-                value = self.max_val
-            self.callback(value)
-            self.dismiss()
-        except ValueError:
-            pass
-
-
-class SearchPopup(Popup):
-    """Search item popup"""
+    The content must exist before TabbedPanel.switch_to reads it: a
+    current_tab binding runs inside switch_to, too late to be shown.
+    """
     
-    def __init__(self, editor, callback, **kwargs):
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.title = 'Search Item'
-        self.title_font = GLOBAL_FONT_NAME
-        self.size_hint = (0.9, 0.8)
-        self.editor = editor
-        self.callback = callback
-        
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        search_layout = BoxLayout(size_hint_y=0.1, spacing=10)
-        self.search_input = TextInput(
-            hint_text='Enter item ID or name',
-            font_name=GLOBAL_FONT_NAME,
-            multiline=False,
-            font_size='16sp'
-        )
-        search_btn = Button(text='Search', font_name=GLOBAL_FONT_NAME, size_hint_x=0.2)
-        search_btn.bind(on_press=self.do_search)
-        
-        search_layout.add_widget(self.search_input)
-        search_layout.add_widget(search_btn)
-        layout.add_widget(search_layout)
-        
-        self.results_layout = GridLayout(cols=1, spacing=5, size_hint_y=None)
-        self.results_layout.bind(minimum_height=self.results_layout.setter('height'))
-        
-        scroll = ScrollView()
-        scroll.add_widget(self.results_layout)
-        layout.add_widget(scroll)
-        
-        btn_close = Button(text='Close', font_name=GLOBAL_FONT_NAME, size_hint_y=0.1)
-        btn_close.bind(on_press=self.dismiss)
-        layout.add_widget(btn_close)
-        
-        self.add_widget(layout)
-        self.search_results = []
+        self.builders = {}
     
-    def do_search(self, instance):
-        keyword = self.search_input.text.strip()
-        if not keyword:
-            return
-        
-        self.results_layout.clear_widgets()
-        results = self.editor.item_db.search(keyword)
-        
-        if not results:
-            self.results_layout.add_widget(Label(
-                text='No items found',
-                font_name=GLOBAL_FONT_NAME,
-                size_hint_y=None,
-                height=40
-            ))
-            return
-        
-        self.search_results = results
-        
-        for idx, (item_id, item_name) in enumerate(results[:20]):
-            btn = Button(
-                text=f'{item_name} (ID: {item_id})',
-                font_name=GLOBAL_FONT_NAME,
-                size_hint_y=None,
-                height=50
-            )
-            btn.bind(on_press=lambda inst, i=idx: self.on_select(i))
-            self.results_layout.add_widget(btn)
-        
-        if len(results) > 20:
-            self.results_layout.add_widget(Label(
-                text=f'...and {len(results)-20} more',
-                font_name=GLOBAL_FONT_NAME,
-                size_hint_y=None,
-                height=30
-            ))
+    def add_tab(self, header, builder):
+        self.builders[header] = builder
+        self.add_widget(header)
     
-    def on_select(self, index):
-        item_id, item_name = self.search_results[index]
-        
-        def set_value(value):
-            success, msg = self.editor._modify_item_by_id(item_id, item_name, value)
-            if success:
-                self.callback(f'Modified {item_name} to {value}')
-            else:
-                self.callback('Modification failed')
-        
-        popup = NumberInputPopup(
-            title=f'Modify {item_name}',
-            hint=f'Enter quantity (0-{SAVE_MAX_ITEM})',
-            max_val=SAVE_MAX_ITEM,
-            callback=set_value
-        )
-        popup.open()
-        self.dismiss()
+    def switch_to(self, header, do_scroll=False):
+        builder = self.builders.pop(header, None)
+        if builder is not None:
+            with perf.operation('build_tab', tab=header.text):
+                header.content = builder()
+        super().switch_to(header, do_scroll=do_scroll)
 
 
 class MainScreen(BoxLayout):
@@ -810,7 +87,12 @@ class MainScreen(BoxLayout):
         self.padding = 10
         self.spacing = 10
         
+        # Open saves share one item database; self.editor is the active one
+        self.workspace = SaveWorkspace(compact_strings=False, watcher=SaveWatcher())
+        self.save_index = SaveIndex()
         self.editor = DaveSaveEditor()
+        self.ingredient_view = IngredientViewModel(self.editor)
+        self.ingredient_sort = SORT_COUNT
         
         # Log label
         self.log_label = Label(
@@ -842,68 +124,127 @@ class MainScreen(BoxLayout):
         )
         self.add_widget(self.status_label)
         
-        # Load database
-        self.load_item_database()
-        
-        # Tabs
-        self.tabs = TabbedPanel(do_default_tab=False, size_hint_y=0.86)
-        
-        tab_file = TabbedPanelHeader(text='Save')
-        tab_file.font_name = GLOBAL_FONT_NAME
-        tab_file.content = self.create_file_tab()
-        self.tabs.add_widget(tab_file)
-        
-        tab_currency = TabbedPanelHeader(text='Currency')
-        tab_currency.font_name = GLOBAL_FONT_NAME
-        tab_currency.content = self.create_currency_tab()
-        self.tabs.add_widget(tab_currency)
-        
-        tab_ingredients = TabbedPanelHeader(text='Ingredients')
-        tab_ingredients.font_name = GLOBAL_FONT_NAME
-        tab_ingredients.content = self.create_ingredients_tab()
-        self.tabs.add_widget(tab_ingredients)
-        
-        tab_items = TabbedPanelHeader(text='Items')
-        tab_items.font_name = GLOBAL_FONT_NAME
-        tab_items.content = self.create_items_tab()
-        self.tabs.add_widget(tab_items)
+        # Widgets owned by tabs that are built on first selection
+        self.file_info_label = None
+        self.field_labels = {}
+        self.ingredients_layout = None
+        self.ingredient_filter_input = None
+        self.export_compression = None
+        self.slot_spinner = None
+        self.locale_spinner = None
+        
+        # Layered item catalog (bundled, Download/ overrides, locales); hot-reloaded on change
+        self.catalog = None
+        self.catalog_reloading = False
+        
+        # Export/import running on a worker thread
+        self.busy = False
+        
+        # Idle-time string interning of the loaded save
+        self.compaction_event = None
+        
+        # Tabs (content is created when a tab is first selected)
+        self.tabs = LazyTabbedPanel(do_default_tab=False, size_hint_y=0.86)
+        
+        # One tab per field group of the registry, after the Save tab
+        field_tabs = [(title, lambda fields=fields: self.create_field_tab(fields))
+                      for title, fields in FIELDS.tabs().items()]
+        for text, builder in ([('Save', self.create_file_tab)] + field_tabs +
+                              [('Ingredients', self.create_ingredients_tab),
+                               ('Items', self.create_items_tab)]):
+            header = TabbedPanelHeader(text=text)
+            header.font_name = GLOBAL_FONT_NAME
+            self.tabs.add_tab(header, builder)
         
         self.add_widget(self.tabs)
         self.add_widget(self.log_label)
+        
+        # Performance overlay (DAVESAVEED_PROFILE=1)
+        self.perf_label = None
+        if perf.enabled:
+            self.perf_label = Label(
+                text='',
+                font_name=GLOBAL_FONT_NAME,
+                font_size='10sp',
+                size_hint_y=0.12,
+                color=(0.9, 0.8, 0.3, 1),
+                halign='left',
+                valign='top'
+            )
+            self.perf_label.bind(size=self.perf_label.setter('text_size'))
+            self.add_widget(self.perf_label)
+            perf.add_listener(self.on_perf_report)
     
     def load_item_database(self):
-        """Load item database"""
-        possible_paths = []
+        """Load the layered item catalog: bundled files, overridden by copies in Download/"""
+        bundled_dir = os.path.dirname(os.path.abspath(__file__))
         
         if platform == 'android':
             from android.storage import primary_external_storage_path
             storage = primary_external_storage_path()
-            possible_paths = [
-                os.path.join(storage, 'Download', 'items_id_map.json'),
-                os.path.join(os.path.dirname(__file__), 'items_id_map.json'),
-                '/sdcard/Download/items_id_map.json',
-                '/storage/emulated/0/Download/items_id_map.json',
+            user_dirs = [
+                os.path.join(storage, 'Download'),
+                '/sdcard/Download',
+                '/storage/emulated/0/Download',
             ]
         else:
-            possible_paths = [
-                os.path.join(os.path.dirname(__file__), 'items_id_map.json'),
-                'items_id_map.json',
-            ]
+            user_dirs = [os.getcwd()]
         
-        log_message(f"Searching database paths: {possible_paths}")
+        log_debug(f"Catalog dirs: bundled {bundled_dir}, user {user_dirs}")
         
-        loaded = False
-        for path in possible_paths:
-            log_message(f"Checking: {path} -> exists: {os.path.exists(path)}")
-            if os.path.exists(path):
-                if self.editor.load_item_database(path):
-                    self.log(f'Database loaded: {os.path.basename(path)}')
-                    loaded = True
-                    break
-        
-        if not loaded:
+        catalog = ItemCatalog(bundled_dir, user_dirs)
+        if not catalog.items:
             self.log('Warning: Database not found')
             log_message('All database paths not found')
+            return
+        
+        self.catalog = catalog
+        self.workspace.set_item_db(catalog)
+        self.editor.item_db = catalog
+        self.update_locale_list()
+        layers = ', '.join(os.path.basename(layer.path) for layer in catalog.stack())
+        self.log(f'Database loaded: {layers}')
+    
+    def update_locale_list(self):
+        """Offer the catalog locales in the Items tab"""
+        if self.locale_spinner is None or self.catalog is None:
+            return
+        self.locale_spinner.values = ('Default',) + tuple(self.catalog.locales())
+        self.locale_spinner.text = self.catalog.locale or 'Default'
+    
+    def on_locale_selected(self, spinner, text):
+        """Switch item names to another catalog locale"""
+        if self.catalog is None:
+            return
+        locale = None if text == 'Default' else text
+        if locale == self.catalog.locale:
+            return
+        self.catalog.set_locale(locale)
+        self.reload_ingredients()
+        self.log(f'Item names: {text}')
+    
+    def check_catalog_changes(self, dt):
+        """Re-read catalog files edited on disk off the UI thread; searches keep the old index until the swap"""
+        if self.catalog is None or self.catalog_reloading or not self.catalog.changed():
+            return
+        self.catalog_reloading = True
+        
+        def done(count, error):
+            self.catalog_reloading = False
+            if error is None and count:
+                self.reload_ingredients()
+                self.log(f'Item catalog reloaded ({count} files)')
+        
+        self.run_in_background('catalog_reload', self.catalog.reload_changed, done)
+    
+    def on_perf_report(self, report):
+        """Show the latest performance report in the overlay"""
+        text = format_report(report)
+        
+        def update(dt):
+            self.perf_label.text = text
+        
+        Clock.schedule_once(update)
     
     def log(self, message):
         """Add log"""
@@ -914,15 +255,23 @@ class MainScreen(BoxLayout):
     
     def show_message(self, title, message):
         """Show message popup"""
+        from popups import MessagePopup
         popup = MessagePopup(title, message)
         popup.open()
     
     def create_file_tab(self):
         """Create file management tab"""
+        from kivy.uix.spinner import Spinner
+        from kivy.uix.togglebutton import ToggleButton
         layout = BoxLayout(orientation='vertical', padding=20, spacing=15)
         
+        if self.editor.file_path:
+            info_text = f'Loaded: {os.path.basename(self.editor.file_path)}'
+        else:
+            info_text = 'Please select save file'
+        
         self.file_info_label = Label(
-            text='Please select save file',
+            text=info_text,
             font_name=GLOBAL_FONT_NAME,
             font_size='16sp',
             size_hint_y=0.3
@@ -933,6 +282,17 @@ class MainScreen(BoxLayout):
         btn_load.bind(on_press=self.show_file_chooser)
         layout.add_widget(btn_load)
         
+        # Saves kept open in the workspace; switching to a resident one is instant
+        self.slot_spinner = Spinner(
+            text='Open saves',
+            values=(),
+            font_name=GLOBAL_FONT_NAME,
+            size_hint_y=0.15
+        )
+        self.slot_spinner.bind(text=self.on_slot_selected)
+        layout.add_widget(self.slot_spinner)
+        self.update_slot_list()
+        
         btn_save = Button(
             text='Save Changes',
             font_name=GLOBAL_FONT_NAME,
@@ -943,49 +303,79 @@ class MainScreen(BoxLayout):
         btn_save.bind(on_press=self.save_file)
         layout.add_widget(btn_save)
         
-        btn_export = Button(text='Export JSON', font_name=GLOBAL_FONT_NAME, font_size='16sp', size_hint_y=0.15)
+        self.autosave_toggle = ToggleButton(
+            text='Autosave: Off',
+            font_name=GLOBAL_FONT_NAME,
+            font_size='16sp',
+            size_hint_y=0.12,
+            state='down' if self.workspace.autosave_settings is not None else 'normal'
+        )
+        self.autosave_toggle.bind(state=self.on_autosave_toggled)
+        self.on_autosave_toggled(self.autosave_toggle, self.autosave_toggle.state)
+        layout.add_widget(self.autosave_toggle)
+        
+        export_layout = BoxLayout(spacing=10, size_hint_y=0.15)
+        self.export_compression = Spinner(
+            text='none',
+            values=tuple(COMPRESSIONS),
+            font_name=GLOBAL_FONT_NAME,
+            size_hint_x=0.35
+        )
+        export_layout.add_widget(self.export_compression)
+        btn_export = Button(text='Export JSON', font_name=GLOBAL_FONT_NAME, font_size='16sp')
         btn_export.bind(on_press=self.export_json)
-        layout.add_widget(btn_export)
+        export_layout.add_widget(btn_export)
+        layout.add_widget(export_layout)
+        
+        btn_import = Button(text='Import JSON', font_name=GLOBAL_FONT_NAME, font_size='16sp', size_hint_y=0.15)
+        btn_import.bind(on_press=self.show_import_chooser)
+        layout.add_widget(btn_import)
+        
+        patch_layout = BoxLayout(spacing=10, size_hint_y=0.15)
+        btn_diff = Button(text='Diff vs Save', font_name=GLOBAL_FONT_NAME, font_size='16sp')
+        btn_diff.bind(on_press=self.show_diff_chooser)
+        patch_layout.add_widget(btn_diff)
+        btn_patch = Button(text='Apply Patch', font_name=GLOBAL_FONT_NAME, font_size='16sp')
+        btn_patch.bind(on_press=self.show_patch_chooser)
+        patch_layout.add_widget(btn_patch)
+        layout.add_widget(patch_layout)
         
         return layout
     
-    def create_currency_tab(self):
-        """Create currency modification tab"""
+    def create_field_tab(self, fields):
+        """Create a tab with a value label and Modify button per registry field"""
+        from kivy.uix.gridlayout import GridLayout
         layout = GridLayout(cols=2, padding=20, spacing=15)
         
-        self.currency_labels = {}
-        currencies = [
-            ('gold', 'Gold', SAVE_MAX_CURRENCY),
-            ('bei', 'Bei', SAVE_MAX_CURRENCY),
-            ('flame', 'Flame', SAVE_MAX_FLAME),
-            ('follower', 'Followers', SAVE_MAX_FOLLOWER)
-        ]
-        
-        for key, name, max_val in currencies:
+        for field in fields:
             label = Label(
-                text=f'{name}: 0',
+                text=f'{field.label}: 0',
                 font_name=GLOBAL_FONT_NAME,
                 font_size='16sp',
                 size_hint_y=None,
                 height=50
             )
-            self.currency_labels[key] = label
+            self.field_labels[field.key] = label
             layout.add_widget(label)
             
             btn = Button(text='Modify', font_name=GLOBAL_FONT_NAME, size_hint_y=None, height=50)
-            btn.bind(on_press=lambda inst, k=key, n=name, m=max_val: self.modify_currency(k, n, m))
+            btn.bind(on_press=lambda inst, f=field: self.modify_field(f))
             layout.add_widget(btn)
         
+        self.update_field_display()
         return layout
     
     def create_ingredients_tab(self):
         """Create ingredients management tab"""
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.scrollview import ScrollView
+        from kivy.uix.textinput import TextInput
         layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
         
         btn_layout = BoxLayout(size_hint_y=0.15, spacing=10)
         
         btn_refresh = Button(text='Refresh List', font_name=GLOBAL_FONT_NAME)
-        btn_refresh.bind(on_press=self.refresh_ingredients)
+        btn_refresh.bind(on_press=self.reload_ingredients)
         
         btn_set_all = Button(text='Set All Quantities', font_name=GLOBAL_FONT_NAME)
         btn_set_all.bind(on_press=self.set_all_ingredients)
@@ -994,6 +384,24 @@ class MainScreen(BoxLayout):
         btn_layout.add_widget(btn_set_all)
         layout.add_widget(btn_layout)
         
+        filter_layout = BoxLayout(size_hint_y=0.1, spacing=5)
+        
+        self.ingredient_filter_input = TextInput(
+            hint_text='Filter by name or ID',
+            font_name=GLOBAL_FONT_NAME,
+            multiline=False,
+            font_size='14sp'
+        )
+        self.ingredient_filter_input.bind(text=lambda inst, text: self.refresh_ingredients())
+        filter_layout.add_widget(self.ingredient_filter_input)
+        
+        for mode, label in ((SORT_COUNT, 'Count'), (SORT_NAME, 'Name'), (SORT_ID, 'ID')):
+            btn = Button(text=label, font_name=GLOBAL_FONT_NAME, size_hint_x=0.2)
+            btn.bind(on_press=lambda inst, m=mode: self.set_ingredient_sort(m))
+            filter_layout.add_widget(btn)
+        
+        layout.add_widget(filter_layout)
+        
         self.ingredients_layout = GridLayout(cols=1, spacing=5, size_hint_y=None)
         self.ingredients_layout.bind(minimum_height=self.ingredients_layout.setter('height'))
         
@@ -1001,10 +409,12 @@ class MainScreen(BoxLayout):
         scroll.add_widget(self.ingredients_layout)
         layout.add_widget(scroll)
         
+        self.refresh_ingredients()
         return layout
     
     def create_items_tab(self):
         """Create item search tab"""
+        from kivy.uix.spinner import Spinner
         layout = BoxLayout(orientation='vertical', padding=20, spacing=15)
         
         btn_search = Button(text='Search and Modify Item', font_name=GLOBAL_FONT_NAME, font_size='20sp', size_hint_y=0.3)
@@ -1018,67 +428,137 @@ class MainScreen(BoxLayout):
             color=(0.6, 0.6, 0.6, 1)
         ))
         
+        # Catalog locale for item names (items_id_map.<locale>.json)
+        self.locale_spinner = Spinner(
+            text='Default',
+            values=('Default',),
+            font_name=GLOBAL_FONT_NAME,
+            size_hint_y=0.15
+        )
+        self.update_locale_list()
+        self.locale_spinner.bind(text=self.on_locale_selected)
+        layout.add_widget(self.locale_spinner)
+        
         return layout
     
     def show_file_chooser(self, instance):
         """Show file chooser"""
+        from popups import SavePickerPopup
         def on_select(path):
             log_message(f"Selected: {path}")
-            
-            if self.editor.load_save_file(path):
-                self.file_info_label.text = f'Loaded: {os.path.basename(path)}'
-                self.status_label.text = f'Current: {os.path.basename(path)}'
-                self.status_label.color = (0.2, 0.8, 0.2, 1)
-                self.update_currency_display()
-                self.refresh_ingredients()
+            self.load_save(path)
+        
+        popup = SavePickerPopup(self.save_index, on_select)
+        popup.open()
+    
+    def load_save(self, path):
+        """Open a save in the workspace (instant if still in memory) and refresh all tabs"""
+        with perf.operation('open_save', file=os.path.basename(path)):
+            was_resident = self.workspace.is_resident(path)
+            editor = self.workspace.open(path)
+            if editor is not None:
+                self.editor = editor
+                self.ingredient_view.editor = editor
+                with perf.span('ui_refresh'):
+                    if self.file_info_label is not None:
+                        self.file_info_label.text = f'Loaded: {os.path.basename(path)}'
+                    self.status_label.text = f'Current: {os.path.basename(path)}'
+                    self.status_label.color = (0.2, 0.8, 0.2, 1)
+                    self.update_field_display()
+                    self.reload_ingredients()
+                    self.update_slot_list()
+                if not was_resident:
+                    self.start_string_compaction()
+                self.save_index.mark_opened(path)
                 self.log('Save loaded successfully')
             else:
-                error_msg = self.editor.last_error or 'Unknown error'
+                error_msg = self.workspace.last_error or 'Unknown error'
                 log_message(f"Load failed: {error_msg}")
                 self.show_message('Error', f'Failed to load save\n{error_msg}')
+    
+    def update_slot_list(self):
+        """Show the workspace's open saves, most recent first"""
+        if self.slot_spinner is None:
+            return
+        self.slot_paths = {}
+        for path in self.workspace.paths():
+            label = os.path.basename(path)
+            if label in self.slot_paths:
+                label = os.path.join(os.path.basename(os.path.dirname(path)), label)
+            self.slot_paths[label] = path
+        self.slot_spinner.values = tuple(self.slot_paths)
+    
+    def on_slot_selected(self, spinner, text):
+        """Switch to another open save"""
+        path = getattr(self, 'slot_paths', {}).get(text)
+        if path is None or path == self.editor.file_path:
+            return
+        log_message(f"Switching to: {path}")
+        self.load_save(path)
+    
+    def start_string_compaction(self):
+        """Intern repeated strings of the loaded save a few milliseconds per frame"""
+        if self.compaction_event is not None:
+            self.compaction_event.cancel()
+        steps = self.editor.compact_strings_steps()
         
-        popup = FileChooserPopup(on_select)
-        popup.open()
+        def step(dt):
+            start = time.perf_counter()
+            try:
+                while time.perf_counter() - start < COMPACTION_FRAME_BUDGET:
+                    next(steps)
+            except StopIteration:
+                self.compaction_event = None
+                return False
+        
+        self.compaction_event = Clock.schedule_interval(step, 0)
     
-    def update_currency_display(self):
-        """Update currency display"""
+    def update_field_display(self):
+        """Show the current value of every field tab that has been built"""
         values = self.editor.get_current_values()
-        if values:
-            self.currency_labels['gold'].text = f'Gold: {values["gold"]}'
-            self.currency_labels['bei'].text = f'Bei: {values["bei"]}'
-            self.currency_labels['flame'].text = f'Flame: {values["flame"]}'
-            self.currency_labels['follower'].text = f'Followers: {values["follower"]}'
+        if not values:
+            return
+        for key, label in self.field_labels.items():
+            label.text = f'{FIELDS.resolve(key).label}: {values[key]}'
     
-    def modify_currency(self, key, name, max_val):
-        """Modify currency"""
+    def modify_field(self, field):
+        """Ask for a new value of a registry field"""
+        from popups import NumberInputPopup
         if not self.editor.save_data:
             self.show_message('Error', 'Please load save first')
             return
         
         def do_modify(value):
-            if key == 'gold':
-                success = self.editor.set_gold(value)
-            elif key == 'bei':
-                success = self.editor.set_bei(value)
-            elif key == 'flame':
-                success = self.editor.set_flame(value)
-            elif key == 'follower':
-                success = self.editor.set_follower(value)
-            
-            if success:
-                self.update_currency_display()
-                self.log(f'{name} set to {value}')
+            if self.editor.set_field(field.key, value):
+                self.update_field_display()
+                self.log(f'{field.label} set to {field.get(self.editor.save_data)}')
         
         popup = NumberInputPopup(
-            title=f'Modify {name}',
-            hint=f'Enter value (0-{max_val})',
-            max_val=max_val,
+            title=f'Modify {field.label}',
+            hint=f'Enter value ({field.min_value}-{field.max_value})',
+            max_val=field.max_value,
             callback=do_modify
         )
         popup.open()
     
+    def reload_ingredients(self, instance=None):
+        """Rebuild the ingredient indexes from the save and refresh the list"""
+        with perf.operation('reload_ingredients'):
+            with perf.span('index'):
+                self.ingredient_view.reload()
+            with perf.span('widgets'):
+                self.refresh_ingredients()
+    
+    def set_ingredient_sort(self, mode):
+        """Switch ingredient sort order"""
+        self.ingredient_sort = mode
+        self.refresh_ingredients()
+    
     def refresh_ingredients(self, instance=None):
         """Refresh ingredients list"""
+        if self.ingredients_layout is None:
+            return
+        
         self.ingredients_layout.clear_widgets()
         
         if not self.editor.save_data:
@@ -1090,8 +570,7 @@ class MainScreen(BoxLayout):
             ))
             return
         
-        ingredients = self.editor.list_ingredients()
-        if not ingredients:
+        if not self.ingredient_view.rows:
             self.ingredients_layout.add_widget(Label(
                 text='No ingredients data',
                 font_name=GLOBAL_FONT_NAME,
@@ -1100,9 +579,10 @@ class MainScreen(BoxLayout):
             ))
             return
         
-        ingredients.sort(key=lambda x: x['count'], reverse=True)
+        filter_text = self.ingredient_filter_input.text
+        ingredients = self.ingredient_view.view(self.ingredient_sort, filter_text, limit=50)
         
-        for ing in ingredients[:50]:
+        for ing in ingredients:
             btn = Button(
                 text=f'{ing["name"]} x{ing["count"]}',
                 font_name=GLOBAL_FONT_NAME,
@@ -1111,12 +591,23 @@ class MainScreen(BoxLayout):
             )
             btn.bind(on_press=lambda inst, k=ing['key'], n=ing['name']: self.modify_ingredient(k, n))
             self.ingredients_layout.add_widget(btn)
+        
+        total = self.ingredient_view.count(filter_text)
+        if total > len(ingredients):
+            self.ingredients_layout.add_widget(Label(
+                text=f'...and {total - len(ingredients)} more',
+                font_name=GLOBAL_FONT_NAME,
+                size_hint_y=None,
+                height=30
+            ))
     
     def modify_ingredient(self, key, name):
         """Modify single ingredient"""
+        from popups import NumberInputPopup
         def do_modify(value):
             if self.editor.set_ingredient_count(key, value):
                 self.log(f'{name} set to {value}')
+                self.ingredient_view.update_item(key)
                 self.refresh_ingredients()
         
         popup = NumberInputPopup(
@@ -1129,6 +620,7 @@ class MainScreen(BoxLayout):
     
     def set_all_ingredients(self, instance):
         """Set all ingredient quantities"""
+        from popups import NumberInputPopup
         if not self.editor.save_data:
             self.show_message('Error', 'Please load save first')
             return
@@ -1136,7 +628,7 @@ class MainScreen(BoxLayout):
         def do_modify(value):
             count = self.editor.set_all_ingredients(value)
             self.log(f'Set {count} ingredients to {value}')
-            self.refresh_ingredients()
+            self.reload_ingredients()
         
         popup = NumberInputPopup(
             title='Set All Ingredients',
@@ -1148,12 +640,17 @@ class MainScreen(BoxLayout):
     
     def show_search_popup(self, instance):
         """Show search popup"""
+        from popups import SearchPopup
         if not self.editor.save_data:
             self.show_message('Error', 'Please load save first')
             return
         
-        def on_result(message):
+        def on_result(message, item_id=None):
             self.log(message)
+            if item_id is not None:
+                key = self.editor.find_ingredient_key(item_id)
+                if key is not None and self.ingredient_view.update_item(key):
+                    self.refresh_ingredients()
         
         popup = SearchPopup(self.editor, on_result)
         popup.open()
@@ -1164,36 +661,225 @@ class MainScreen(BoxLayout):
             self.show_message('Error', 'Please load save first')
             return
         
-        if self.editor.save_save_file():
+        # Merge a newer file from the game first; conflicts are settled before writing
+        if self.apply_external_change(self.editor.file_path, self.workspace.sync_path(self.editor.file_path)):
+            return
+        
+        if self.workspace.save(self.editor.file_path):
             self.show_message('Success', 'Save saved\nBackup created')
             self.log('Save saved successfully')
+            self.update_slot_list()
         else:
-            self.show_message('Error', 'Save failed')
+            self.show_message('Error', self.workspace.last_error or 'Save failed')
+    
+    def on_autosave_toggled(self, button, state):
+        """Coalesced background saving on or off for all open saves"""
+        enabled = state == 'down'
+        button.text = 'Autosave: On' if enabled else 'Autosave: Off'
+        if enabled != (self.workspace.autosave_settings is not None):
+            self.workspace.set_autosave({} if enabled else None)
+            log_message(f"Autosave {'enabled' if enabled else 'disabled'}")
+    
+    def run_autosave(self, dt):
+        """Write saves whose edits have settled (no-op when nothing is due)"""
+        written = self.workspace.autosave()
+        if written:
+            self.log(f'Autosaved {", ".join(os.path.basename(path) for path in written)}')
+    
+    def check_external_changes(self, dt):
+        """Merge saves rewritten by the game or a sync tool into the open ones"""
+        for path, result in self.workspace.sync_external().items():
+            self.apply_external_change(path, result)
+    
+    def apply_external_change(self, path, result):
+        """Refresh the UI after a merge; returns True if conflicts need a decision"""
+        from popups import ConflictPopup
+        if result is None:
+            return False
+        name = os.path.basename(path)
+        if result.error:
+            log_message(result.error)
+            return False
+        if path == os.path.abspath(self.editor.file_path or ''):
+            self.update_field_display()
+            self.reload_ingredients()
+        if not result.conflicts:
+            self.log(f'{name} changed on disk: merged {result.applied} updates')
+            return False
+        
+        def resolve(take):
+            self.workspace.resolve_conflicts(path, result.conflicts, take)
+            if path == os.path.abspath(self.editor.file_path or ''):
+                self.update_field_display()
+                self.reload_ingredients()
+            self.log(f'{name}: kept {"file" if take == "remote" else "your"} values for {len(result.conflicts)} fields')
+        
+        ConflictPopup(name, result.conflicts, resolve).open()
+        return True
+    
+    def run_in_background(self, name, work, on_done):
+        """Run work() on a worker thread and call on_done(result, error) on the UI thread"""
+        def runner():
+            result, error = None, None
+            try:
+                result = work()
+            except Exception as e:
+                log_message(f"{name} failed: {e}")
+                error = e
+            Clock.schedule_once(lambda dt: on_done(result, error))
+        
+        threading.Thread(target=runner, name=name, daemon=True).start()
     
     def export_json(self, instance):
-        """Export JSON"""
+        """Export JSON (streamed on a worker thread)"""
         if not self.editor.save_data:
             self.show_message('Error', 'Please load save first')
             return
+        if self.busy:
+            self.show_message('Busy', 'Another export or import is running')
+            return
         
-        try:
-            base_name = os.path.splitext(os.path.basename(self.editor.file_path))[0]
-            
-            if platform == 'android':
-                from android.storage import primary_external_storage_path
-                output_dir = primary_external_storage_path()
-            else:
-                output_dir = os.path.dirname(self.editor.file_path)
-            
-            output_path = os.path.join(output_dir, f'{base_name}_exported.json')
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.editor.save_data, f, ensure_ascii=False, indent=2)
-            
+        compression = self.export_compression.text if self.export_compression else 'none'
+        base_name = os.path.basename(self.editor.file_path)
+        
+        if platform == 'android':
+            from android.storage import primary_external_storage_path
+            output_dir = primary_external_storage_path()
+        else:
+            output_dir = os.path.dirname(self.editor.file_path)
+        
+        output_path = export_path(os.path.join(output_dir, base_name), compression)
+        # Copied here: the UI thread keeps editing (and compacting) the live document
+        document = self.editor.snapshot()
+        bypass_table = self.editor.bypass_table
+        
+        def done(result, error):
+            self.busy = False
+            if error is not None:
+                self.show_message('Error', f'Export failed: {str(error)}')
+                return
             self.show_message('Success', f'JSON exported to:\n{output_path}')
             self.log('JSON export successful')
+        
+        self.busy = True
+        self.log('Exporting JSON...')
+        self.run_in_background('export_json',
+                               lambda: stream_export(document, output_path, compression, bypass_table),
+                               done)
+    
+    def show_import_chooser(self, instance):
+        """Pick an exported JSON to write back into the loaded save"""
+        from popups import FileChooserPopup
+        if not self.editor.save_data:
+            self.show_message('Error', 'Please load save first')
+            return
+        
+        popup = FileChooserPopup(self.import_json,
+                                 filters=['*.json', '*.json.gz', '*.json.xz'],
+                                 title='Select Exported JSON')
+        popup.open()
+    
+    def import_json(self, json_path):
+        """Encode an exported JSON over the loaded save (backup first), then reload it"""
+        if self.busy:
+            self.show_message('Busy', 'Another export or import is running')
+            return
+        
+        save_path = self.editor.file_path
+        
+        def work():
+            validate_export(json_path)
+            if not self.editor.create_backup():
+                raise IOError('Backup failed')
+            return import_json_to_sav(json_path, save_path)
+        
+        def done(result, error):
+            self.busy = False
+            if error is not None:
+                self.show_message('Error', f'Import failed: {str(error)}')
+                return
+            # The parsed copy in the workspace is stale now
+            self.workspace.close(save_path, discard=True)
+            self.load_save(save_path)
+            self.show_message('Success', f'Imported {os.path.basename(json_path)}\nBackup created')
+        
+        self.busy = True
+        self.log('Importing JSON...')
+        self.run_in_background('import_json', work, done)
+    
+    def show_diff_chooser(self, instance):
+        """Pick a second save and write the JSON Patch from the loaded save to it"""
+        from popups import FileChooserPopup
+        if not self.editor.save_data:
+            self.show_message('Error', 'Please load save first')
+            return
+        
+        popup = FileChooserPopup(self.diff_against, title='Select Save to Compare (.sav)')
+        popup.open()
+    
+    def diff_against(self, other_path):
+        """Diff the loaded save against another save file on a worker thread"""
+        if self.busy:
+            self.show_message('Busy', 'Another export or import is running')
+            return
+        
+        base = os.path.splitext(self.editor.file_path)[0]
+        other_name = os.path.splitext(os.path.basename(other_path))[0]
+        patch_path = f'{base}_to_{other_name}.patch.json'
+        # Copied here: the UI thread keeps editing (and compacting) the live document
+        document = self.editor.snapshot()
+        
+        def work():
+            other = DaveSaveEditor()
+            if not other.load_save_file(other_path):
+                raise IOError(other.last_error or 'Load failed')
+            patch = diff_saves(document, other.document())
+            save_patch(patch, patch_path)
+            return patch
+        
+        def done(patch, error):
+            self.busy = False
+            if error is not None:
+                self.show_message('Error', f'Diff failed: {str(error)}')
+                return
+            if not patch:
+                self.show_message('Diff', 'Saves are identical')
+                return
+            lines = summarize(patch, limit=12)
+            self.show_message('Diff', f'{len(patch)} changes, patch written to:\n{patch_path}\n\n' + '\n'.join(lines))
+            self.log(f'Diff: {len(patch)} changes')
+        
+        self.busy = True
+        self.log('Comparing saves...')
+        self.run_in_background('diff', work, done)
+    
+    def show_patch_chooser(self, instance):
+        """Pick a JSON Patch to apply to the loaded save"""
+        from popups import FileChooserPopup
+        if not self.editor.save_data:
+            self.show_message('Error', 'Please load save first')
+            return
+        
+        popup = FileChooserPopup(self.apply_patch_file, filters=['*.json'], title='Select JSON Patch')
+        popup.open()
+    
+    def apply_patch_file(self, patch_path):
+        """Apply a patch file to the loaded save; nothing changes if any operation fails"""
+        try:
+            patch = load_patch(patch_path)
         except Exception as e:
-            self.show_message('Error', f'Export failed: {str(e)}')
+            self.show_message('Error', f'Invalid patch: {str(e)}')
+            return
+        
+        count = self.editor.apply_patch(patch)
+        if count is None:
+            self.show_message('Error', self.editor.last_error or 'Patch failed')
+            return
+        
+        self.update_field_display()
+        self.reload_ingredients()
+        self.log(f'Applied {count} patch operations')
+        self.show_message('Success', f'Applied {count} operations\nSave Changes to write them')
 
 
 class DaveSaveEdApp(App):
@@ -1202,6 +888,7 @@ class DaveSaveEdApp(App):
     def build(self):
         # Initialize logging
         init_logging()
+        log_message(f"Platform: {platform}")
         
         # Request permissions on Android
         if platform == 'android':
@@ -1237,7 +924,43 @@ class DaveSaveEdApp(App):
         
         Window.clearcolor = (0.12, 0.14, 0.18, 1)
         self.title = 'Dave the Diver Save Editor'
-        return MainScreen()
+        screen = MainScreen()
+        startup.mark('build')
+        Window.bind(on_flip=self.on_first_frame)
+        return screen
+    
+    def on_first_frame(self, window):
+        """First frame is on screen: load the item database on the next tick"""
+        window.unbind(on_flip=self.on_first_frame)
+        startup.mark('first_frame')
+        Clock.schedule_once(self.finish_startup)
+    
+    def finish_startup(self, dt):
+        from font_utils import GlyphPrewarmer
+        self.root.load_item_database()
+        startup.finish('interactive')
+        
+        # Crawl storage for saves off the UI thread; the picker shows whatever is indexed so far
+        self.root.save_index.start_background_scan()
+        Clock.schedule_interval(self.root.check_external_changes, WATCH_INTERVAL)
+        Clock.schedule_interval(self.root.check_catalog_changes, WATCH_INTERVAL)
+        Clock.schedule_interval(self.root.run_autosave, AUTOSAVE_TICK)
+        
+        # Rasterize catalog and UI glyphs in small per-frame chunks
+        texts = [getattr(w, 'text', '') for w in self.root.walk()]
+        if self.root.editor.item_db:
+            texts.extend(self.root.editor.item_db.items.values())
+        self.glyph_prewarmer = GlyphPrewarmer()
+        self.glyph_prewarmer.start(texts)
+    
+    def on_stop(self):
+        # With autosave on, settle pending edits now; otherwise unsaved changes
+        # are lost on exit as before. Spill files are removed either way.
+        if self.root.workspace.autosave_settings is not None:
+            self.root.workspace.autosave(flush=True)
+        self.root.workspace.close_all(discard=True)
+        self.root.workspace.watcher.close()
+        shutdown_logging()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Performance instrumentation
+Per-stage spans (wall time, bytes, throughput, tracemalloc peak) grouped into
+per-operation reports written as JSON lines to the log directory
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from log_utils import get_app_dir, log_message, log_debug
+
+PERF_FILE_NAME = 'perf.jsonl'
+STARTUP_FILE_NAME = 'startup.jsonl'
+
+
+class _NullSpan:
+    """Shared do-nothing span used while profiling is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, nbytes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed pipeline stage"""
+
+    __slots__ = ('recorder', 'name', 'nbytes', '_start', '_mem_start', '_mem_peak')
+
+    def __init__(self, recorder, name, nbytes=0):
+        self.recorder = recorder
+        self.name = name
+        self.nbytes = nbytes
+
+    def add_bytes(self, nbytes):
+        self.nbytes += nbytes
+
+    def __enter__(self):
+        if self.recorder.trace_memory:
+            self.recorder._start_peak(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        record = {
+            'stage': self.name,
+            'ms': round(elapsed * 1000, 3),
+            'bytes': self.nbytes,
+            'mb_per_s': round(self.nbytes / elapsed / 1e6, 2) if self.nbytes and elapsed > 0 else None,
+        }
+        if self.recorder.trace_memory:
+            record['peak_kb'] = round((self.recorder._end_peak(self) - self._mem_start) / 1024, 1)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.recorder._add_span(record)
+        return False
+
+
+class PerfRecorder:
+    """Collects spans into per-operation reports"""
+
+    def __init__(self, enabled=False, trace_memory=True, report_dir=None):
+        self.enabled = False
+        self.trace_memory = trace_memory
+        self.report_dir = report_dir
+        self.listeners = []
+        self.last_report = None
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Spans measuring memory (any thread); tracemalloc has a single peak counter
+        self._memory_spans = []
+        self._memory_lock = threading.Lock()
+        if enabled:
+            self.enable()
+
+    def enable(self, enabled=True):
+        """Turn instrumentation on or off"""
+        self.enabled = enabled
+        if enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def add_listener(self, callback):
+        """Call callback(report) after each finished operation"""
+        self.listeners.append(callback)
+
+    def span(self, name, nbytes=0):
+        """Time one stage of the current operation"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, nbytes)
+
+    @contextmanager
+    def operation(self, name, **meta):
+        """Group spans into one report; nested operations join the outer one"""
+        if not self.enabled or getattr(self._local, 'current', None) is not None:
+            yield
+            return
+
+        report = {
+            'op': name,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'spans': [],
+        }
+        report.update(meta)
+        self._local.current = report
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            report['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            self._local.current = None
+            report['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self._finish(report)
+
+    def _start_peak(self, span):
+        """Start measuring a span's peak; spans already running keep the peak reached so far"""
+        with self._memory_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for running in self._memory_spans:
+                running._mem_peak = max(running._mem_peak, peak)
+            span._mem_start = span._mem_peak = current
+            self._memory_spans.append(span)
+            tracemalloc.reset_peak()
+
+    def _end_peak(self, span):
+        """Highest traced memory while the span ran"""
+        with self._memory_lock:
+            self._memory_spans.remove(span)
+            return max(span._mem_peak, tracemalloc.get_traced_memory()[1])
+
+    def _add_span(self, record):
+        report = getattr(self._local, 'current', None)
+        if report is not None:
+            report['spans'].append(record)
+        else:
+            log_debug(f"[PERF] {record}")
+
+    def _finish(self, report):
+        self.last_report = report
+        self._write(report)
+        for callback in self.listeners:
+            try:
+                callback(report)
+            except Exception as e:
+                log_debug(f"[PERF] listener failed: {e}")
+
+    def _write(self, report):
+        try:
+            report_dir = self.report_dir or get_app_dir('logs')
+            os.makedirs(report_dir, exist_ok=True)
+            line = json.dumps(report, ensure_ascii=False)
+            with self._write_lock:
+                with open(os.path.join(report_dir, PERF_FILE_NAME), 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+        except Exception as e:
+            log_debug(f"[PERF] failed to write report: {e}")
+
+
+class StartupTimer:
+    """Time-to-interactive report: named phases with duration and modules imported"""
+
+    def __init__(self, budget_ms=None, report_dir=None):
+        self.budget_ms = budget_ms
+        self.report_dir = report_dir
+        self.phases = []
+        self.done = False
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._modules = set(sys.modules)
+
+    def mark(self, phase):
+        """Close the current phase"""
+        if self.done:
+            return
+        now = time.perf_counter()
+        modules = set(sys.modules)
+        new_modules = modules - self._modules
+        # Top-level packages, like the first column of python -X importtime
+        packages = sorted({name.split('.')[0] for name in new_modules})
+        self.phases.append({
+            'phase': phase,
+            'ms': round((now - self._last) * 1000, 1),
+            'at_ms': round((now - self._start) * 1000, 1),
+            'modules': len(new_modules),
+            'packages': packages,
+        })
+        self._last = now
+        self._modules = modules
+
+    def finish(self, phase='interactive'):
+        """Close the last phase, then log and persist the report"""
+        if self.done:
+            return None
+        self.mark(phase)
+        self.done = True
+        total = self.phases[-1]['at_ms']
+        report = {
+            'op': 'startup',
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'total_ms': total,
+            'budget_ms': self.budget_ms,
+            'within_budget': self.budget_ms is None or total <= self.budget_ms,
+            'phases': self.phases,
+        }
+        log_message(f"Startup: {total:.0f} ms to {phase}" +
+                    (f" (budget {self.budget_ms} ms)" if self.budget_ms else ''))
+        for entry in self.phases:
+            log_debug(f"  {entry['phase']:<16}{entry['ms']:>8.1f} ms  "
+                      f"{entry['modules']:>4} modules  {', '.join(entry['packages'][:8])}")
+        if not report['within_budget']:
+            log_message(f"Startup over budget by {total - self.budget_ms:.0f} ms", logging.WARNING)
+        try:
+            report_dir = self.report_dir or get_app_dir('logs')
+            os.makedirs(report_dir, exist_ok=True)
+            with open(os.path.join(report_dir, STARTUP_FILE_NAME), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report) + '\n')
+        except Exception as e:
+            log_debug(f"[PERF] failed to write startup report: {e}")
+        return report
+
+
+def format_report(report):
+    """Short multi-line summary of a report, for the on-screen overlay"""
+    lines = [f"{report['op']}: {report['total_ms']:.0f} ms"]
+    for span in report['spans']:
+        line = f"  {span['stage']}: {span['ms']:.1f} ms"
+        if span.get('mb_per_s'):
+            line += f", {span['mb_per_s']} MB/s"
+        if span.get('peak_kb') is not None:
+            line += f", peak {span['peak_kb']:.0f} KB"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+# ============ Process memory ============
+
+def _read_proc_kb(path, fields):
+    """{field: bytes} for 'Name:   123 kB' lines of a /proc file; {} where it cannot be read"""
+    values = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in fields:
+                    values[name] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return values
+
+
+def available_memory():
+    """Memory the system can hand out without swapping, in bytes (None off Linux/Android)"""
+    info = _read_proc_kb('/proc/meminfo', ('MemAvailable', 'MemFree', 'Cached', 'Buffers'))
+    if 'MemAvailable' in info:
+        return info['MemAvailable']
+    # Kernels before 3.14
+    if 'MemFree' in info:
+        return info['MemFree'] + info.get('Cached', 0) + info.get('Buffers', 0)
+    return None
+
+
+def reset_peak_rss():
+    """Restart the process's peak RSS (VmHWM) counter; False where the kernel refuses"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None"""
+    return _read_proc_kb('/proc/self/status', ('VmHWM',)).get('VmHWM')
+
+
+# Enable with DAVESAVEED_PROFILE=1
+perf = PerfRecorder(enabled=os.environ.get('DAVESAVEED_PROFILE') == '1')
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Popups of the editor UI
+Imported on first use, so their widget modules (popup, text input, recycle
+view) are not loaded before the first frame
+"""
+
+import os
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.textinput import TextInput
+from kivy.uix.popup import Popup
+from kivy.clock import Clock
+from kivy.utils import platform
+from kivy.metrics import dp
+from kivy.properties import NumericProperty, ObjectProperty
+
+from font_utils import GLOBAL_FONT_NAME
+from log_utils import log_message
+from save_core import SAVE_MAX_ITEM
+
+
+class FileChooserPopup(Popup):
+    """File chooser popup"""
+    
+    def __init__(self, callback, filters=None, title='Select Save File (.sav)', **kwargs):
+        super().__init__(**kwargs)
+        self.title = title
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.9, 0.9)
+        self.callback = callback
+        
+        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        # Imported on first use: the file chooser is not needed for the first frame
+        from kivy.uix.filechooser import FileChooserListView
+        
+        if platform == 'android':
+            from android.storage import primary_external_storage_path
+            initial_path = primary_external_storage_path()
+        else:
+            initial_path = os.path.expanduser('~')
+        
+        self.filechooser = FileChooserListView(
+            path=initial_path,
+            filters=filters or ['*.sav'],
+            dirselect=False
+        )
+        layout.add_widget(self.filechooser)
+        
+        btn_layout = BoxLayout(size_hint_y=0.1, spacing=10)
+        
+        btn_cancel = Button(text='Cancel', font_name=GLOBAL_FONT_NAME)
+        btn_cancel.bind(on_press=self.dismiss)
+        
+        btn_select = Button(text='Select', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.8, 0.2, 1))
+        btn_select.bind(on_press=self.on_select)
+        
+        btn_layout.add_widget(btn_cancel)
+        btn_layout.add_widget(btn_select)
+        
+        layout.add_widget(btn_layout)
+        self.add_widget(layout)
+    
+    def on_select(self, instance):
+        if self.filechooser.selection:
+            selected_path = self.filechooser.selection[0]
+            log_message(f"User selected: {selected_path}")
+            self.callback(selected_path)
+            self.dismiss()
+
+
+class MessagePopup(Popup):
+    """Message popup"""
+    
+    def __init__(self, title, message, **kwargs):
+        super().__init__(**kwargs)
+        self.title = title
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.8, 0.4)
+        
+        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
+        
+        layout.add_widget(Label(
+            text=message,
+            font_name=GLOBAL_FONT_NAME,
+            font_size='16sp',
+            text_size=(None, None),
+            halign='center'
+        ))
+        
+        btn_ok = Button(text='OK', font_name=GLOBAL_FONT_NAME, size_hint_y=0.3)
+        btn_ok.bind(on_press=self.dismiss)
+        layout.add_widget(btn_ok)
+        
+        self.add_widget(layout)
+
+
+class NumberInputPopup(Popup):
+    """Number input popup"""
+    
+    def __init__(self, title, hint, max_val, callback, **kwargs):
+        super().__init__(**kwargs)
+        self.title = title
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.8, 0.4)
+        self.callback = callback
+        self.max_val = max_val
+        
+        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
+        
+        self.text_input = TextInput(
+            hint_text=hint,
+            font_name=GLOBAL_FONT_NAME,
+            input_filter='int',
+            multiline=False,
+            font_size='18sp'
+        )
+        layout.add_widget(self.text_input)
+        
+        btn_layout = BoxLayout(size_hint_y=0.4, spacing=10)
+        
+        btn_cancel = Button(text='Cancel', font_name=GLOBAL_FONT_NAME)
+        btn_cancel.bind(on_press=self.dismiss)
+        
+        btn_ok = Button(text='OK', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.8, 0.2, 1))
+        btn_ok.bind(on_press=self.on_confirm)
+        
+        btn_layout.add_widget(btn_cancel)
+        btn_layout.add_widget(btn_ok)
+        
+        layout.add_widget(btn_layout)
+        self.add_widget(layout)
+    
+    def on_confirm(self, instance):
+        try:
+            value = int(self.text_input.text)
+            if value < 0:
+                value = 0
+            if value > self.max_val:
+                value = self.max_val
+            self.callback(value)
+            self.dismiss()
+        except ValueError:
+            pass
+
+
+class SearchResultButton(Button):
+    """Recycled row widget for search results"""
+    
+    result_index = NumericProperty(-1)
+    popup = ObjectProperty(None, allownone=True)
+    
+    def on_press(self):
+        if self.popup is not None and self.result_index >= 0:
+            self.popup.on_select(self.result_index)
+
+
+class SearchResultsView(RecycleView):
+    """Virtualized result list; only rows on screen get widgets"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.viewclass = SearchResultButton
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(50)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=5
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+
+class SearchPopup(Popup):
+    """Search item popup"""
+    
+    # Rows are materialized into RecycleView data a page at a time while scrolling
+    PAGE_SIZE = 200
+    
+    def __init__(self, editor, callback, **kwargs):
+        super().__init__(**kwargs)
+        self.title = 'Search Item'
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.9, 0.8)
+        self.editor = editor
+        self.callback = callback
+        
+        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        search_layout = BoxLayout(size_hint_y=0.1, spacing=10)
+        self.search_input = TextInput(
+            hint_text='Enter item ID or name',
+            font_name=GLOBAL_FONT_NAME,
+            multiline=False,
+            font_size='16sp'
+        )
+        self.search_input.bind(on_text_validate=self.do_search)
+        search_btn = Button(text='Search', font_name=GLOBAL_FONT_NAME, size_hint_x=0.2)
+        search_btn.bind(on_press=self.do_search)
+        
+        search_layout.add_widget(self.search_input)
+        search_layout.add_widget(search_btn)
+        layout.add_widget(search_layout)
+        
+        self.count_label = Label(
+            text='',
+            font_name=GLOBAL_FONT_NAME,
+            font_size='12sp',
+            size_hint_y=0.05,
+            color=(0.6, 0.6, 0.6, 1)
+        )
+        layout.add_widget(self.count_label)
+        
+        self.results_view = SearchResultsView()
+        self.results_view.bind(scroll_y=self.on_results_scroll)
+        layout.add_widget(self.results_view)
+        
+        btn_close = Button(text='Close', font_name=GLOBAL_FONT_NAME, size_hint_y=0.1)
+        btn_close.bind(on_press=self.dismiss)
+        layout.add_widget(btn_close)
+        
+        self.add_widget(layout)
+        self.search_results = []
+    
+    def do_search(self, instance):
+        keyword = self.search_input.text.strip()
+        if not keyword:
+            return
+        
+        self.results_view.data = []
+        item_db = self.editor.item_db
+        self.search_results = item_db.search_ids(keyword) if item_db else []
+        
+        if not self.search_results:
+            self.count_label.text = 'No items found'
+            return
+        
+        self.count_label.text = f'{len(self.search_results)} items found'
+        self.load_next_page()
+        self.results_view.scroll_y = 1
+    
+    def load_next_page(self):
+        """Append the next page of results to the RecycleView data"""
+        start = len(self.results_view.data)
+        if start >= len(self.search_results):
+            return
+        
+        get_name = self.editor.item_db.get_name
+        page = []
+        for idx in range(start, min(start + self.PAGE_SIZE, len(self.search_results))):
+            item_id = self.search_results[idx]
+            page.append({
+                'text': f'{get_name(item_id)} (ID: {item_id})',
+                'font_name': GLOBAL_FONT_NAME,
+                'result_index': idx,
+                'popup': self
+            })
+        self.results_view.data.extend(page)
+    
+    def on_results_scroll(self, instance, scroll_y):
+        # Near the bottom of what is loaded: fetch another page
+        if scroll_y < 0.1:
+            self.load_next_page()
+    
+    def on_select(self, index):
+        item_id = self.search_results[index]
+        item_name = self.editor.item_db.get_name(item_id)
+        
+        def set_value(value):
+            success, msg = self.editor._modify_item_by_id(item_id, item_name, value)
+            if success:
+                self.callback(f'Modified {item_name} to {value}', item_id)
+            else:
+                self.callback('Modification failed')
+        
+        popup = NumberInputPopup(
+            title=f'Modify {item_name}',
+            hint=f'Enter quantity (0-{SAVE_MAX_ITEM})',
+            max_val=SAVE_MAX_ITEM,
+            callback=set_value
+        )
+        popup.open()
+        self.dismiss()
+
+
+class SavePickerPopup(Popup):
+    """Recent and discovered saves from the background index; Browse falls back to the file chooser"""
+    
+    def __init__(self, save_index, callback, **kwargs):
+        super().__init__(**kwargs)
+        self.title = 'Select Save File (.sav)'
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.9, 0.9)
+        self.save_index = save_index
+        self.callback = callback
+        self.entries = []
+        
+        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        self.count_label = Label(
+            text='',
+            font_name=GLOBAL_FONT_NAME,
+            font_size='12sp',
+            size_hint_y=0.05,
+            color=(0.6, 0.6, 0.6, 1)
+        )
+        layout.add_widget(self.count_label)
+        
+        self.results_view = SearchResultsView()
+        layout.add_widget(self.results_view)
+        
+        btn_layout = BoxLayout(size_hint_y=0.1, spacing=10)
+        
+        btn_cancel = Button(text='Cancel', font_name=GLOBAL_FONT_NAME)
+        btn_cancel.bind(on_press=self.dismiss)
+        
+        btn_rescan = Button(text='Rescan', font_name=GLOBAL_FONT_NAME)
+        btn_rescan.bind(on_press=self.rescan)
+        
+        btn_browse = Button(text='Browse...', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.6, 0.8, 1))
+        btn_browse.bind(on_press=self.browse)
+        
+        btn_layout.add_widget(btn_cancel)
+        btn_layout.add_widget(btn_rescan)
+        btn_layout.add_widget(btn_browse)
+        layout.add_widget(btn_layout)
+        
+        self.add_widget(layout)
+        self.refresh()
+    
+    def refresh(self, *args):
+        """Show the index as it is now (a scan may still be running)"""
+        self.entries = self.save_index.recent()
+        rows = []
+        for idx, info in enumerate(self.entries):
+            path = info['path']
+            marker = '* ' if info.get('last_opened') else ''
+            rows.append({
+                'text': f"{marker}{os.path.basename(path)}  ({info.get('size', 0) // 1024} KB)\n{os.path.dirname(path)}",
+                'font_name': GLOBAL_FONT_NAME,
+                'result_index': idx,
+                'popup': self
+            })
+        self.results_view.data = rows
+        if self.save_index.scanning:
+            self.count_label.text = f'{len(rows)} saves (scanning...)'
+        elif rows:
+            self.count_label.text = f'{len(rows)} saves'
+        else:
+            self.count_label.text = 'No saves found yet, use Browse...'
+    
+    def rescan(self, instance):
+        def done(index):
+            Clock.schedule_once(self.refresh)
+        
+        self.save_index.start_background_scan(done)
+        self.refresh()
+    
+    def browse(self, instance):
+        self.dismiss()
+        FileChooserPopup(self.callback).open()
+    
+    def on_select(self, index):
+        path = self.entries[index]['path']
+        log_message(f"User selected: {path}")
+        self.dismiss()
+        self.callback(path)
+
+
+class ConflictPopup(Popup):
+    """Fields changed both in the editor and in the rewritten save file"""
+    
+    def __init__(self, file_name, conflicts, callback, **kwargs):
+        super().__init__(**kwargs)
+        self.title = f'{file_name} changed on disk'
+        self.title_font = GLOBAL_FONT_NAME
+        self.size_hint = (0.9, 0.6)
+        self.callback = callback
+        
+        layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
+        
+        paths = [entry['path'] for entry in conflicts[:8]]
+        if len(conflicts) > 8:
+            paths.append(f'... {len(conflicts) - 8} more')
+        layout.add_widget(Label(
+            text='Changed both here and by the game:\n' + '\n'.join(paths),
+            font_name=GLOBAL_FONT_NAME,
+            font_size='14sp',
+            halign='center'
+        ))
+        
+        btn_layout = BoxLayout(size_hint_y=0.25, spacing=10)
+        
+        btn_local = Button(text='Keep Mine', font_name=GLOBAL_FONT_NAME)
+        btn_local.bind(on_press=lambda instance: self.choose('local'))
+        
+        btn_remote = Button(text='Use File', font_name=GLOBAL_FONT_NAME, background_color=(0.2, 0.6, 0.8, 1))
+        btn_remote.bind(on_press=lambda instance: self.choose('remote'))
+        
+        btn_layout.add_widget(btn_local)
+        btn_layout.add_widget(btn_remote)
+        layout.add_widget(btn_layout)
+        
+        self.add_widget(layout)
+    
+    def choose(self, take):
+        self.dismiss()
+        self.callback(take)
@@ -0,0 +1,1194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dave the Diver save editing core
+Codec, item database and editor, usable without Kivy
+"""
+
+import os
+import json
+import codecs
+import hashlib
+import re
+import shutil
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from log_utils import log_message, log_debug, log_error
+from perf_utils import perf, available_memory, peak_rss, reset_peak_rss
+from json_backend import serializer
+from trigger_engine import TRIGGERS, TRIGGER_AUTOMATON, DEFAULT_END_MARKER
+from save_diff import build_hash_tree, apply_patch, copy_tree, PatchError, diff as diff_documents
+from ingredient_table import IngredientTable, dict_nbytes
+from string_pool import StringPool
+from save_sql import SaveDatabase, export_sqlite, SQL_ERRORS
+from field_registry import Field, FieldRegistry
+
+# ============ Configuration Constants ============
+XOR_KEY = b"GameData"
+BYPASS_PREFIX = "BYPASSED_HEX::"
+BYPASS_REF_PREFIX = "BYPASS_REF::"
+
+# Value limits
+SAVE_MAX_CURRENCY = 999999999
+SAVE_MAX_FLAME = 999999
+SAVE_MAX_FOLLOWER = 99999
+SAVE_MAX_INGREDIENT = 9999
+SAVE_MAX_ITEM = 999
+
+# Editable scalar fields; the UI builds its tabs from this list
+FIELDS = FieldRegistry([
+    Field('gold', 'PlayerInfo.m_Gold', 'Gold', SAVE_MAX_CURRENCY),
+    Field('bei', 'PlayerInfo.m_Bei', 'Bei', SAVE_MAX_CURRENCY),
+    Field('flame', 'PlayerInfo.m_ChefFlame', 'Flame', SAVE_MAX_FLAME),
+    Field('follower', 'SNSInfo.m_Follow_Count', 'Followers', SAVE_MAX_FOLLOWER),
+])
+
+# Autosave cadence (seconds): quiet period after the last edit, minimum time
+# between writes, longest an edit may wait, and minimum time between backups
+AUTOSAVE_DELAY = 3.0
+AUTOSAVE_MIN_INTERVAL = 30.0
+AUTOSAVE_MAX_DELAY = 120.0
+AUTOSAVE_BACKUP_INTERVAL = 900.0
+
+# Load pipelines: 'standard' decodes the whole save in one pass, 'lean' works
+# in chunks and drops each intermediate once the next stage has consumed it
+LOAD_STANDARD = 'standard'
+LOAD_LEAN = 'lean'
+LOAD_CHUNK_SIZE = 1024 * 1024
+# Peak RSS growth of the standard pipeline per byte of save file (7-11x measured,
+# lean 5-8x)
+STANDARD_LOAD_FACTOR = 12
+# Share of available memory the standard pipeline may need before lean is used
+LOAD_MEMORY_SHARE = 0.5
+
+# Problem field triggers (for special handling), loaded from triggers.json
+TROUBLESOME_TRIGGERS = [trigger.pattern for trigger in TRIGGERS]
+END_MARKER = DEFAULT_END_MARKER
+
+
+def xor_bytes(data_bytes, key_bytes, key_start_index=0):
+    """Perform XOR encryption/decryption"""
+    length = len(data_bytes)
+    if not length:
+        return b''
+    key_len = len(key_bytes)
+    start = key_start_index % key_len
+    key_stream = (key_bytes[start:] + key_bytes[:start]) * (length // key_len + 1)
+    # One big-integer XOR instead of a Python-level loop over every byte
+    value = int.from_bytes(data_bytes, 'little') ^ int.from_bytes(key_stream[:length], 'little')
+    return value.to_bytes(length, 'little')
+
+
+def find_field_details(encrypted_bytes, start_pos, end_marker=END_MARKER):
+    """Find details of problematic field"""
+    field_len = None
+    
+    slice_for_len_check = encrypted_bytes[start_pos:]
+    for offset_pass1 in range(len(XOR_KEY)):
+        temp_key_idx = (start_pos + offset_pass1) % len(XOR_KEY)
+        decrypted_slice = xor_bytes(slice_for_len_check, XOR_KEY, key_start_index=temp_key_idx)
+        
+        try:
+            end_marker_pos = decrypted_slice.index(end_marker)
+            field_len = end_marker_pos
+            break
+        except ValueError:
+            continue
+    
+    if field_len is None:
+        return None, None
+    
+    resync_pos = start_pos + field_len
+    if resync_pos >= len(encrypted_bytes):
+        return None, None
+    
+    slice_len = min(50, len(encrypted_bytes) - resync_pos)
+    slice_for_offset_check = encrypted_bytes[resync_pos:resync_pos + slice_len]
+    
+    for offset_pass2 in range(len(XOR_KEY)):
+        temp_key_idx = (resync_pos + offset_pass2) % len(XOR_KEY)
+        decrypted_slice = xor_bytes(slice_for_offset_check, XOR_KEY, key_start_index=temp_key_idx)
+        
+        if decrypted_slice.startswith(end_marker):
+            return field_len, temp_key_idx
+    
+    return field_len, None
+
+
+class BypassTable:
+    """Raw ciphertext spans of troublesome fields, kept out of the JSON text"""
+    
+    def __init__(self):
+        # The nonce keeps reference tokens from colliding with real save strings
+        self.nonce = os.urandom(4).hex()
+        self.spans = []
+    
+    def __len__(self):
+        return len(self.spans)
+    
+    def token(self, index):
+        return f'{BYPASS_REF_PREFIX}{self.nonce}:{index}'
+    
+    def add(self, field_bytes, key_idx):
+        """Store a span and return the token that stands for it in the JSON"""
+        self.spans.append((bytes(field_bytes), key_idx))
+        return self.token(len(self.spans) - 1)
+    
+    def inline(self, text):
+        """Replace reference tokens with self-contained BYPASSED_HEX strings"""
+        if not self.spans or BYPASS_REF_PREFIX not in text:
+            return text
+        
+        def expand(match):
+            field_bytes, key_idx = self.spans[int(match.group(1))]
+            return f'{BYPASS_PREFIX}{field_bytes.hex()}:{key_idx}'
+        
+        return self.pattern().sub(expand, text)
+    
+    def pattern(self):
+        """Regex for this table's reference tokens; group 1 is the span index"""
+        return re.compile(rf'{re.escape(BYPASS_REF_PREFIX)}{self.nonce}:(\d+)')
+
+
+def decode_sav_to_json(encrypted_bytes, bypass_table=None, automaton=None):
+    """Decrypt .sav file to JSON string
+    
+    Troublesome fields are written as BYPASSED_HEX strings, or as short
+    references into bypass_table when one is given.
+    """
+    return _decode_sav_bytes(encrypted_bytes, bypass_table, automaton).decode('utf-8', errors='ignore')
+
+
+def _decode_sav_bytes(encrypted_bytes, bypass_table=None, automaton=None, chunk_size=None):
+    """decode_sav_to_json before the UTF-8 decode
+    
+    With chunk_size, at most that much ciphertext is decrypted at a time, so
+    the temporaries stay small next to the output buffer.
+    """
+    automaton = automaton or TRIGGER_AUTOMATON
+    output_buffer = bytearray()
+    data_idx = 0
+    key_idx = 0
+    state = 0
+    total = len(encrypted_bytes)
+    
+    while data_idx < total:
+        # Decrypt the rest in bulk (or one chunk); it is redone only after a field resyncs the key
+        end = total if chunk_size is None else min(total, data_idx + chunk_size)
+        plain = xor_bytes(encrypted_bytes[data_idx:end], XOR_KEY, key_start_index=key_idx)
+        scan_pos = 0
+        
+        while True:
+            scan_pos, trigger, state = automaton.scan(plain, scan_pos, state)
+            if trigger is None:
+                # The next chunk continues the same key stream and scan state
+                output_buffer.extend(plain)
+                key_idx = (key_idx + len(plain)) % len(XOR_KEY)
+                data_idx = end
+                break
+            
+            field_start_pos = data_idx + scan_pos
+            length, new_key_idx = find_field_details(encrypted_bytes, field_start_pos, trigger.end_marker)
+            
+            if length is not None and new_key_idx is not None:
+                field_bytes = encrypted_bytes[field_start_pos:field_start_pos + length]
+                
+                output_buffer.extend(plain[:scan_pos])
+                if bypass_table is not None:
+                    bypass_string = bypass_table.add(field_bytes, new_key_idx)
+                else:
+                    bypass_string = f'{BYPASS_PREFIX}{field_bytes.hex()}:{new_key_idx}'
+                output_buffer.extend(bypass_string.encode('ascii'))
+                
+                data_idx = field_start_pos + length
+                key_idx = new_key_idx
+                state = 0
+                break
+    
+    return output_buffer
+
+
+def _find_bypass_spans(json_string, bypass_table):
+    """Locate bypass references: (start, end, raw_bytes, key_idx) in document order
+    
+    Every occurrence is spliced, so a reference duplicated by a patch or SQL
+    write-back is written as raw bytes each time it appears.
+    """
+    spans = bypass_table.spans
+    found = []
+    for match in bypass_table.pattern().finditer(json_string):
+        index = int(match.group(1))
+        if index < len(spans):
+            field_bytes, key_idx = spans[index]
+            found.append((match.start(), match.end(), field_bytes, key_idx))
+    return found
+
+
+_LEGACY_BYPASS = re.compile(rf'{re.escape(BYPASS_PREFIX)}([a-fA-F0-9]+):(\d+)')
+
+
+def _find_legacy_bypass_spans(json_string):
+    """Locate inline BYPASSED_HEX strings (exported or hand-edited JSON)"""
+    if BYPASS_PREFIX not in json_string:
+        return []
+    return [(m.start(), m.end(), bytes.fromhex(m.group(1)), int(m.group(2)))
+            for m in _LEGACY_BYPASS.finditer(json_string)]
+
+
+def encode_json_chunk(json_string, key_idx=0, bypass_table=None):
+    """Encrypt one piece of a JSON document starting at key_idx
+    
+    Returns (encrypted_bytes, next_key_idx) so a document can be encoded in
+    pieces. Pieces must not split a bypass string.
+    """
+    if bypass_table is not None:
+        spans = _find_bypass_spans(json_string, bypass_table) if len(bypass_table) else []
+    else:
+        spans = _find_legacy_bypass_spans(json_string)
+    
+    output_bytes = bytearray()
+    last_end = 0
+    
+    for start, end, raw_field_bytes, new_key_idx in spans:
+        clean_part_str = json_string[last_end:start]
+        clean_part_bytes = clean_part_str.encode('utf-8')
+        output_bytes.extend(xor_bytes(clean_part_bytes, XOR_KEY, key_start_index=key_idx))
+        key_idx = (key_idx + len(clean_part_bytes)) % len(XOR_KEY)
+        
+        output_bytes.extend(raw_field_bytes)
+        key_idx = new_key_idx
+        
+        last_end = end
+    
+    remaining_part_str = json_string[last_end:]
+    remaining_part_bytes = remaining_part_str.encode('utf-8')
+    output_bytes.extend(xor_bytes(remaining_part_bytes, XOR_KEY, key_start_index=key_idx))
+    key_idx = (key_idx + len(remaining_part_bytes)) % len(XOR_KEY)
+    
+    return bytes(output_bytes), key_idx
+
+
+def expected_plaintext(json_string, bypass_table=None):
+    """What decoding the encoded json_string must give back
+    
+    Derived from the input alone, not from the encoder's span choices:
+    references are expanded and inline spans written the way the decoder
+    writes them (lowercase hex, plain key index).
+    """
+    if bypass_table is not None:
+        return bypass_table.inline(json_string)
+    if BYPASS_PREFIX not in json_string:
+        return json_string
+    return _LEGACY_BYPASS.sub(
+        lambda m: f'{BYPASS_PREFIX}{bytes.fromhex(m.group(1)).hex()}:{int(m.group(2))}', json_string)
+
+
+def new_verify_digest():
+    """Hash used to compare an encoded save with what it decodes to"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def text_digest(json_string, bypass_table=None, digest=None):
+    """Feed expected_plaintext() of one piece of a document to digest (a new one by default)"""
+    digest = digest or new_verify_digest()
+    digest.update(expected_plaintext(json_string, bypass_table).encode('utf-8'))
+    return digest
+
+
+def encoded_digest(encrypted_bytes):
+    """Digest of the decoded text, comparable with text_digest() of what was encoded"""
+    digest = new_verify_digest()
+    digest.update(_decode_sav_bytes(encrypted_bytes))
+    return digest.digest()
+
+
+def encode_json_to_sav(json_string, bypass_table=None):
+    """Encrypt JSON string to .sav format
+    
+    Spans referenced from bypass_table are spliced back as raw bytes; without
+    a table, inline BYPASSED_HEX strings are used instead.
+    """
+    return encode_json_chunk(json_string, 0, bypass_table)[0]
+
+
+_CONTROL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_CONTROL_BYTES = re.compile(b'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_BRACKETS = re.compile(r'(\{)|(\})|(\[)|(\])')
+_BRACKET_BYTES = re.compile(rb'(\{)|(\})|(\[)|(\])')
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+
+def _unclosed_from(text, brackets, chars):
+    """Offset of the bracket that opened the still unbalanced tail of text, or None
+    
+    Counts every brace and bracket (chars: '{}[]' as str or bytes), including
+    those inside strings.
+    """
+    if (text.count(chars[0:1]) == text.count(chars[1:2]) and
+            text.count(chars[2:3]) == text.count(chars[3:4])):
+        return None
+    braces = squares = 0
+    opened = None
+    for match in brackets.finditer(text):
+        if not braces and not squares:
+            opened = match.start()
+        kind = match.lastindex
+        if kind == 1:
+            braces += 1
+        elif kind == 2:
+            braces -= 1
+        elif kind == 3:
+            squares += 1
+        else:
+            squares -= 1
+    return opened if braces or squares else None
+
+
+def clean_json_string(json_str):
+    """Clean JSON string by removing invalid characters"""
+    # Remove BOM if present
+    if json_str.startswith('\ufeff'):
+        json_str = json_str[1:]
+    
+    # Remove control characters except tab, newline and carriage return
+    cleaned = _CONTROL_CHARS.sub('', json_str)
+    
+    # Try to fix truncated JSON: cut before the bracket that is never closed
+    opened = _unclosed_from(cleaned, _BRACKETS, '{}[]')
+    if opened is not None and opened >= 2:
+        log_message(f"Truncated JSON at position {opened - 1}")
+        cleaned = cleaned[:opened]
+    
+    return cleaned
+
+
+def is_utf8(data, chunk_size=LOAD_CHUNK_SIZE):
+    """True if data is valid UTF-8, checked a chunk at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(data)
+    try:
+        for start in range(0, len(view), chunk_size):
+            decoder.decode(view[start:start + chunk_size])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def clean_json_bytes(buffer):
+    """clean_json_string for a bytearray of valid UTF-8, in place"""
+    if buffer.startswith(_UTF8_BOM):
+        del buffer[:len(_UTF8_BOM)]
+    if _CONTROL_BYTES.search(buffer):
+        buffer[:] = _CONTROL_BYTES.sub(b'', buffer)
+    
+    opened = _unclosed_from(buffer, _BRACKET_BYTES, b'{}[]')
+    # The cut needs two characters in front of the bracket, not two bytes
+    if opened is not None and opened >= 2 and (opened >= 8 or len(buffer[:opened].decode('utf-8')) >= 2):
+        log_message(f"Truncated JSON at byte {opened - 1}")
+        del buffer[opened:]
+    return buffer
+
+
+def choose_load_mode(file_size, available=None, mode=None):
+    """Pick the load pipeline for a save of file_size bytes; returns (mode, available bytes)
+    
+    mode (default: DAVESAVEED_LOAD_MODE) forces 'standard' or 'lean';
+    otherwise lean is used when the standard pipeline's estimated peak
+    would take more than LOAD_MEMORY_SHARE of the available memory.
+    Where available memory is unknown the standard pipeline is used.
+    """
+    mode = mode or os.environ.get('DAVESAVEED_LOAD_MODE', 'auto')
+    if available is None:
+        available = available_memory()
+    if mode in (LOAD_STANDARD, LOAD_LEAN):
+        return mode, available
+    if available is not None and file_size * STANDARD_LOAD_FACTOR > available * LOAD_MEMORY_SHARE:
+        return LOAD_LEAN, available
+    return LOAD_STANDARD, available
+
+
+class ItemDatabase:
+    """Item database class"""
+    
+    def __init__(self, json_path):
+        self.items = {}
+        self.name_to_id = {}
+        self._lower_names = {}
+        self._char_index = {}
+        self.load_database(json_path)
+    
+    def load_database(self, json_path):
+        """Load item database"""
+        try:
+            log_message(f"Loading database: {json_path}")
+            if os.path.exists(json_path):
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                
+                log_debug(f"Database file size: {len(content)} characters")
+                
+                # Clean and parse JSON
+                content = clean_json_string(content)
+                
+                try:
+                    data = serializer.loads(content)
+                    
+                    # Handle different JSON structures
+                    if isinstance(data, dict):
+                        self.items = {int(k): v for k, v in data.items() if str(k).isdigit()}
+                    elif isinstance(data, list):
+                        self.items = {int(item['id']): item['name'] for item in data if 'id' in item and 'name' in item}
+                    
+                except json.JSONDecodeError as e:
+                    # Fall back to plain "id : name" lines
+                    self.items = self.parse_text_map(content)
+                    if not self.items:
+                        log_message(f"JSON parse failed: {e}")
+                        return False
+                
+                self.name_to_id = {v: k for k, v in self.items.items()}
+                self.build_index()
+                log_message(f"Database loaded: {len(self.items)} items")
+                return True
+            else:
+                log_message(f"Database file not found: {json_path}")
+            return False
+            
+        except Exception as e:
+            log_error(f"Failed to load database: {e}")
+            log_debug(traceback.format_exc())
+            return False
+    
+    @staticmethod
+    def parse_text_map(content):
+        """Parse an "id : name" per-line item map"""
+        items = {}
+        for line in content.splitlines():
+            item_id, sep, name = line.partition(':')
+            item_id = item_id.strip()
+            if sep and item_id.isdigit() and name.strip():
+                items[int(item_id)] = name.strip()
+        return items
+    
+    def build_index(self):
+        """Build lowercase names and a character -> item IDs index"""
+        self._lower_names = {}
+        char_index = {}
+        for item_id in sorted(self.items):
+            lower = str(self.items[item_id]).lower()
+            self._lower_names[item_id] = lower
+            for char in set(lower):
+                char_index.setdefault(char, []).append(item_id)
+        self._char_index = char_index
+    
+    def search_ids(self, keyword):
+        """Search by ID or name, returning matching item IDs in ID order"""
+        try:
+            item_id = int(keyword)
+            if item_id in self.items:
+                return [item_id]
+        except ValueError:
+            pass
+        
+        keyword = keyword.lower()
+        if not keyword:
+            return []
+        
+        # Start from the rarest character's posting list, then verify the substring
+        postings = [self._char_index.get(char, []) for char in set(keyword)]
+        candidates = min(postings, key=len)
+        if len(keyword) == 1:
+            return list(candidates)
+        
+        lower_names = self._lower_names
+        return [item_id for item_id in candidates if keyword in lower_names[item_id]]
+    
+    def search(self, keyword):
+        """Search by ID or name"""
+        return [(item_id, self.items[item_id]) for item_id in self.search_ids(keyword)]
+    
+    def get_name(self, item_id):
+        """Get item name"""
+        return self.items.get(item_id, f"Unknown({item_id})")
+
+
+def diff_saves(old, new):
+    """JSON Patch from one save document to another"""
+    with perf.operation('diff'):
+        with perf.span('diff'):
+            return diff_documents(old, new)
+
+
+def text_hash(json_str):
+    """Digest of serialized save data (content_hash() of the document it encodes)"""
+    return hashlib.blake2b(json_str.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class AutosavePolicy:
+    """When coalesced edits are due to be written
+    
+    A burst of edits becomes one write once no edit came for `delay`
+    seconds (or the oldest one has waited `max_delay`), and writes are at
+    least `min_interval` apart. Backups follow their own, slower cadence.
+    """
+    
+    def __init__(self, delay=AUTOSAVE_DELAY, min_interval=AUTOSAVE_MIN_INTERVAL,
+                 max_delay=AUTOSAVE_MAX_DELAY, backup_interval=AUTOSAVE_BACKUP_INTERVAL):
+        self.delay = delay
+        self.min_interval = min_interval
+        self.max_delay = max(max_delay, delay)
+        self.backup_interval = backup_interval
+        self.first_change = None
+        self.last_change = None
+        self.last_write = None
+        self.edits = 0
+        self.writes = 0
+        self.skipped = 0
+        self.coalesced = 0
+    
+    @property
+    def pending(self):
+        return self.first_change is not None
+    
+    def note_change(self, now):
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.edits += 1
+    
+    def due(self, now):
+        if self.first_change is None:
+            return False
+        if self.last_write is not None and now - self.last_write < self.min_interval:
+            return False
+        return now - self.last_change >= self.delay or now - self.first_change >= self.max_delay
+    
+    def backup_due(self, now, last_backup):
+        return last_backup is None or now - last_backup >= self.backup_interval
+    
+    def clear(self):
+        self.coalesced += max(self.edits - 1, 0)
+        self.first_change = self.last_change = None
+        self.edits = 0
+    
+    def stats(self):
+        return {'writes': self.writes, 'skipped': self.skipped, 'coalesced': self.coalesced}
+
+
+class DaveSaveEditor:
+    """Save editor main class"""
+    
+    def __init__(self, columnar=None):
+        # Columnar Ingredients backing; DAVESAVEED_COLUMNAR=1 turns it on by default
+        if columnar is None:
+            columnar = os.environ.get('DAVESAVEED_COLUMNAR') == '1'
+        self.columnar = columnar
+        self.save_data = None
+        self.bypass_table = None
+        self.file_path = None
+        self.backup_path = None
+        self.item_db = None
+        self.last_error = None
+        self.intern_stats = None
+        # content_hash() of what the file holds (None until known); unchanged data is not rewritten
+        self.saved_hash = None
+        self.last_save_skipped = False
+        self.last_backup_time = None
+        self.autosave = None
+        # Load pipeline: None picks one per file (see choose_load_mode), or LOAD_STANDARD / LOAD_LEAN
+        self.load_mode = None
+        self.last_load_mode = None
+        # run_sql() database, reused while the save and catalog are unchanged: (content hash, catalog items, db, save_id)
+        self._sql = None
+    
+    def load_item_database(self, json_path):
+        """Load item database"""
+        self.item_db = ItemDatabase(json_path)
+        return len(self.item_db.items) > 0
+    
+    def load_save_file(self, filepath):
+        """Load save file"""
+        with perf.operation('load_save', file=os.path.basename(filepath)):
+            return self._load_save_file(filepath)
+    
+    def _load_save_file(self, filepath):
+        self.last_error = None
+        try:
+            log_message(f"Loading save: {filepath}")
+            
+            # Check if file exists
+            if not os.path.exists(filepath):
+                self.last_error = f"File not found: {filepath}"
+                log_message(self.last_error)
+                return False
+            
+            # Check file size
+            file_size = os.path.getsize(filepath)
+            log_debug(f"File size: {file_size} bytes")
+            
+            if file_size == 0:
+                self.last_error = "File is empty"
+                log_message(self.last_error)
+                return False
+            
+            # Big saves in tight memory take the lean pipeline
+            mode, available = choose_load_mode(file_size, mode=self.load_mode)
+            self.last_load_mode = mode
+            log_message(f"Load mode: {mode} ({file_size / 1048576:.1f} MB save, " +
+                        (f"{available / 1048576:.0f} MB available)" if available is not None
+                         else "available memory unknown)"))
+            peak_reset = reset_peak_rss()
+            
+            bypass_table = BypassTable()
+            if mode == LOAD_LEAN:
+                self.save_data = self._load_lean(filepath, file_size, bypass_table)
+            else:
+                # Read file
+                with perf.span('read', file_size):
+                    with open(filepath, 'rb') as f:
+                        encrypted_bytes = f.read()
+                
+                log_debug(f"Read {len(encrypted_bytes)} bytes")
+                
+                # Decrypt
+                with perf.span('decode', len(encrypted_bytes)):
+                    json_str = decode_sav_to_json(encrypted_bytes, bypass_table)
+                log_debug(f"Decrypted, JSON length: {len(json_str)}")
+                
+                # Clean JSON
+                with perf.span('clean', len(json_str)):
+                    json_str = clean_json_string(json_str)
+                log_debug(f"Cleaned JSON length: {len(json_str)}")
+                
+                # Parse JSON
+                with perf.span('parse', len(json_str)):
+                    self.save_data = serializer.loads(json_str)
+                if self.columnar:
+                    with perf.span('columnar'):
+                        self._to_columnar(self.save_data)
+            
+            peak = peak_rss()
+            if peak is not None:
+                log_message(f"Load peak RSS: {peak / 1048576:.1f} MB" +
+                            ("" if peak_reset else " (process lifetime)"))
+            self.bypass_table = bypass_table
+            self.file_path = filepath
+            self.saved_hash = None
+            if self.autosave is not None:
+                self.autosave.clear()
+                self.saved_hash = self.content_hash()
+            
+            log_message("Save loaded successfully")
+            return True
+            
+        except json.JSONDecodeError as e:
+            self.last_error = f"JSON parse error: {e}"
+            log_message(self.last_error)
+            # Save debug file
+            try:
+                debug_path = '/sdcard/DaveSaveEd/debug_decrypted.json'
+                with open(debug_path, 'w', encoding='utf-8') as f:
+                    f.write(json_str if 'json_str' in locals() else "Decryption failed")
+                log_message(f"Debug file saved: {debug_path}")
+            except:
+                pass
+            return False
+        except Exception as e:
+            self.last_error = f"Load failed: {str(e)}"
+            log_error(self.last_error)
+            log_error(traceback.format_exc())
+            return False
+    
+    def _load_lean(self, filepath, file_size, bypass_table):
+        """Read, decode, clean and parse with one full-size intermediate alive at a time
+        
+        The ciphertext is decrypted a chunk at a time and dropped after
+        decoding; cleaning works in place on the decoded bytes, which are
+        parsed without building a str where the JSON backend allows it.
+        """
+        with perf.span('read', file_size):
+            with open(filepath, 'rb') as f:
+                encrypted_bytes = f.read()
+        
+        with perf.span('decode', file_size):
+            buffer = _decode_sav_bytes(encrypted_bytes, bypass_table, chunk_size=LOAD_CHUNK_SIZE)
+        del encrypted_bytes
+        
+        with perf.span('clean', len(buffer)):
+            if is_utf8(buffer):
+                clean_json_bytes(buffer)
+            else:
+                # Invalid bytes are dropped by the text decode; clean that text like the standard path
+                buffer = clean_json_string(buffer.decode('utf-8', errors='ignore'))
+        
+        with perf.span('parse', len(buffer)):
+            if not isinstance(buffer, str) and not serializer.parses_bytes:
+                # The parser would decode a copy internally; let the bytes go first
+                buffer = buffer.decode('utf-8')
+            save_data = serializer.loads(buffer)
+        del buffer
+        
+        if self.columnar:
+            with perf.span('columnar'):
+                self._to_columnar(save_data)
+        return save_data
+    
+    def _to_columnar(self, data):
+        """Swap data["Ingredients"] for an IngredientTable"""
+        ingredients = data.get("Ingredients") if isinstance(data, dict) else None
+        if not isinstance(ingredients, dict):
+            return
+        try:
+            table = IngredientTable.from_dict(ingredients)
+        except (TypeError, ValueError) as e:
+            log_message(f"Columnar Ingredients disabled: {e}")
+            return
+        log_debug(f"Columnar Ingredients: {len(table)} rows, "
+                  f"{table.nbytes() // 1024} KB vs {dict_nbytes(ingredients) // 1024} KB as dicts")
+        data["Ingredients"] = table
+    
+    def document(self):
+        """Save data as plain JSON types (a columnar table is re-materialized)"""
+        if not self.save_data:
+            return self.save_data
+        ingredients = self.save_data.get("Ingredients")
+        if not isinstance(ingredients, IngredientTable):
+            return self.save_data
+        data = dict(self.save_data)
+        data["Ingredients"] = ingredients.to_dict()
+        return data
+    
+    def snapshot(self):
+        """Detached copy of document() that later edits (or string compaction) cannot change
+        
+        Take it on the thread that edits the save before handing the data to a worker.
+        """
+        if not self.save_data:
+            return self.save_data
+        return copy_tree(self.document())
+    
+    def content_hash(self):
+        """Digest of the serialized save data (what save_save_file would encode)"""
+        if not self.save_data:
+            return None
+        return text_hash(serializer.dumps(self.document()))
+    
+    def compact_strings_steps(self, step=200):
+        """Generator that interns repeated strings of the loaded save a few containers at a time
+        
+        Parsing is left untouched (an object hook would slow it down by ~40%);
+        the savings are logged and kept in intern_stats when the pass ends.
+        """
+        data = self.save_data
+        pool = StringPool()
+        yield from pool.compact(data, step)
+        if data is self.save_data:
+            self.intern_stats = pool.stats()
+            log_message(f"Interned strings: {self.intern_stats['values_shared']} values, "
+                        f"{self.intern_stats['keys_shared']} keys shared, "
+                        f"{self.intern_stats['saved_kb']} KB saved")
+    
+    def compact_strings(self):
+        """Intern repeated strings of the loaded save in one pass; returns the statistics"""
+        with perf.span('intern'):
+            for _ in self.compact_strings_steps(step=1 << 30):
+                pass
+        return self.intern_stats
+    
+    def create_backup(self):
+        """Create backup"""
+        if not self.file_path:
+            return False
+        
+        try:
+            backup_dir = os.path.join(os.path.dirname(self.file_path), "backups")
+            os.makedirs(backup_dir, exist_ok=True)
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.basename(self.file_path)
+            backup_name = f"{filename}_{timestamp}.bak"
+            self.backup_path = os.path.join(backup_dir, backup_name)
+            
+            shutil.copy2(self.file_path, self.backup_path)
+            self.last_backup_time = time.monotonic()
+            log_message(f"Backup created: {self.backup_path}")
+            return True
+        except Exception as e:
+            log_message(f"Backup failed: {e}")
+            return False
+    
+    def save_save_file(self, backup=True, only_if_changed=False):
+        """Save save file
+        
+        With only_if_changed, nothing is written (and last_save_skipped is
+        set) when the data serializes to what the file already holds.
+        """
+        if not self.save_data or not self.file_path:
+            return False
+        
+        with perf.operation('save_save', file=os.path.basename(self.file_path)):
+            return self._save_save_file(backup, only_if_changed)
+    
+    def _save_save_file(self, backup, only_if_changed=False):
+        try:
+            with perf.span('serialize') as span:
+                json_str = serializer.dumps(self.document())
+                span.add_bytes(len(json_str))
+            digest = text_hash(json_str)
+            self.last_save_skipped = only_if_changed and digest == self.saved_hash
+            if self.last_save_skipped:
+                log_debug(f"Save unchanged, write skipped: {self.file_path}")
+                return True
+            bypass_table = self.bypass_table
+            with perf.span('encode', len(json_str)):
+                encrypted_bytes = encode_json_chunk(json_str, 0, bypass_table)[0]
+            
+            # Decode the output again on a worker thread while the backup and
+            # write run; the file is only replaced if it decodes to the
+            # serialized text (references expanded)
+            verified = []
+            
+            def verify():
+                verified.append(encoded_digest(encrypted_bytes) == text_digest(json_str, bypass_table).digest())
+            
+            verifier = threading.Thread(target=verify, name='save_verify', daemon=True)
+            verifier.start()
+            if backup:
+                with perf.span('backup'):
+                    self.create_backup()
+            tmp_path = self.file_path + '.tmp'
+            with perf.span('write', len(encrypted_bytes)):
+                with open(tmp_path, 'wb') as f:
+                    f.write(encrypted_bytes)
+            with perf.span('verify', len(encrypted_bytes)):
+                verifier.join()
+            
+            if not verified or not verified[0]:
+                os.remove(tmp_path)
+                self.last_error = "Save not written: the encoded file does not decode back to the same data"
+                log_error(f"{self.last_error} ({self.file_path})")
+                return False
+            os.replace(tmp_path, self.file_path)
+            self.saved_hash = digest
+            
+            log_message(f"Save saved: {self.file_path}")
+            return True
+        except Exception as e:
+            log_error(f"Save failed: {e}")
+            log_error(traceback.format_exc())
+            return False
+    
+    # ============ Autosave ============
+    
+    def enable_autosave(self, **settings):
+        """Coalesce edits into rate-limited background writes (see AutosavePolicy for settings)"""
+        self.autosave = AutosavePolicy(**settings)
+        if self.save_data and self.saved_hash is None:
+            self.saved_hash = self.content_hash()
+    
+    def disable_autosave(self):
+        self.autosave = None
+    
+    def note_change(self):
+        """Record an edit to the save data (editing methods call this themselves)"""
+        if self.autosave is not None:
+            self.autosave.note_change(time.monotonic())
+    
+    def autosave_tick(self, now=None, save=None, flush=False):
+        """Write coalesced edits if they are due; call this periodically
+        
+        save(backup, only_if_changed) performs the write, save_save_file by
+        default; flush writes pending edits without waiting (e.g. on exit).
+        Returns 'saved', 'unchanged', 'failed', or None when nothing was due.
+        """
+        policy = self.autosave
+        if policy is None or not self.save_data:
+            return None
+        now = time.monotonic() if now is None else now
+        if not (policy.due(now) or (flush and policy.pending)):
+            return None
+        backup = policy.backup_due(now, self.last_backup_time)
+        edits = policy.edits
+        ok = (save or self.save_save_file)(backup=backup, only_if_changed=True)
+        if not ok:
+            # Retried after another quiet period
+            policy.last_change = now
+            return 'failed'
+        policy.last_write = now
+        policy.clear()
+        if self.last_save_skipped:
+            policy.skipped += 1
+            return 'unchanged'
+        policy.writes += 1
+        log_message(f"Autosaved {os.path.basename(self.file_path)} ({edits} edits"
+                    f"{', backup' if backup else ''})")
+        return 'saved'
+    
+    def get_current_values(self):
+        """Values of all registered fields by key (gold, bei, flame, follower)"""
+        if not self.save_data:
+            return None
+        return FIELDS.values(self.save_data)
+    
+    def get_field(self, name, default=None):
+        """Value of a field by registry key or dotted path"""
+        if not self.save_data:
+            return default
+        return FIELDS.resolve(name).get(self.save_data)
+    
+    def set_field(self, name, value):
+        """Set one field (clamped to its limits); returns False without a save"""
+        return self.apply_fields({name: value}) is not None
+    
+    def apply_fields(self, changes):
+        """Set several fields by key or path in one pass; returns {name: stored value}
+        
+        Returns None (with last_error set) when no save is loaded, a name
+        is unknown or a path runs through a value that is not an object;
+        nothing is changed then.
+        """
+        if not self.save_data:
+            self.last_error = "No save loaded"
+            return None
+        try:
+            applied = FIELDS.apply(self.save_data, changes)
+        except (KeyError, ValueError) as e:
+            self.last_error = f"Cannot set fields: {e.args[0] if e.args else e}"
+            log_message(self.last_error)
+            return None
+        if applied:
+            self.note_change()
+        return applied
+    
+    # Kept for existing callers; the registry holds paths and limits
+    def set_gold(self, value):
+        return self.set_field('gold', value)
+    
+    def set_bei(self, value):
+        return self.set_field('bei', value)
+    
+    def set_flame(self, value):
+        return self.set_field('flame', value)
+    
+    def set_follower(self, value):
+        return self.set_field('follower', value)
+    
+    def list_ingredients(self):
+        """List all ingredients"""
+        if not self.save_data or "Ingredients" not in self.save_data:
+            return []
+        
+        table = self.save_data["Ingredients"]
+        if isinstance(table, IngredientTable):
+            get_name = self.item_db.get_name if self.item_db else (lambda ing_id: f"Item{ing_id}")
+            return [{'id': ing_id, 'name': get_name(ing_id), 'count': count, 'key': key}
+                    for key, ing_id, count in table.iter_fields(
+                        ('ingredientsID', 'count'), require='ingredientsID', defaults={'count': 0})]
+        
+        ingredients = []
+        for key, item in self.save_data["Ingredients"].items():
+            if "ingredientsID" in item:
+                ing_id = item["ingredientsID"]
+                count = item.get("count", 0)
+                name = self.item_db.get_name(ing_id) if self.item_db else f"Item{ing_id}"
+                ingredients.append({
+                    'id': ing_id,
+                    'name': name,
+                    'count': count,
+                    'key': key
+                })
+        
+        return ingredients
+    
+    def set_all_ingredients(self, value):
+        """Set all ingredient quantities"""
+        if not self.save_data or "Ingredients" not in self.save_data:
+            return False
+        
+        value = min(value, SAVE_MAX_INGREDIENT)
+        count = 0
+        
+        table = self.save_data["Ingredients"]
+        if isinstance(table, IngredientTable):
+            count = table.fill("count", value, where="ingredientsID")
+        else:
+            for key, item in self.save_data["Ingredients"].items():
+                if "ingredientsID" in item:
+                    self.save_data["Ingredients"][key]["count"] = value
+                    count += 1
+        
+        self.note_change()
+        return count
+    
+    def search_and_modify_item(self, keyword, new_value):
+        """Search and modify item"""
+        if not self.save_data or not self.item_db:
+            return False, "Save or database not loaded"
+        
+        results = self.item_db.search(keyword)
+        
+        if not results:
+            return False, f"'{keyword}' not found"
+        
+        if len(results) == 1:
+            item_id, item_name = results[0]
+            return self._modify_item_by_id(item_id, item_name, new_value)
+        else:
+            return "multiple", results
+    
+    def _modify_item_by_id(self, item_id, item_name, new_value):
+        """Modify item quantity by ID"""
+        modified = False
+        
+        key = self.find_ingredient_key(item_id)
+        if key is not None:
+            self.save_data["Ingredients"][key]["count"] = min(new_value, SAVE_MAX_INGREDIENT)
+            modified = True
+        
+        if not modified:
+            if "Ingredients" not in self.save_data:
+                self.save_data["Ingredients"] = {}
+            
+            key = str(item_id)
+            self.save_data["Ingredients"][key] = {
+                "ingredientsID": item_id,
+                "parentID": item_id,
+                "count": min(new_value, SAVE_MAX_INGREDIENT),
+                "level": 1,
+                "branchCount": 0,
+                "isNew": True,
+                "placeTagMask": 1,
+                "lastGainTime": datetime.now().strftime("%m/%d/%Y %H:%M:%S"),
+                "lastGainGameTime": "10/03/2022 08:30:52"
+            }
+            modified = True
+        
+        self.note_change()
+        return True, item_name if modified else False
+    
+    def find_ingredient_key(self, item_id):
+        """Find the Ingredients key holding an item ID"""
+        if not self.save_data or "Ingredients" not in self.save_data:
+            return None
+        
+        table = self.save_data["Ingredients"]
+        if isinstance(table, IngredientTable):
+            return table.find("ingredientsID", item_id)
+        
+        for key, item in self.save_data["Ingredients"].items():
+            if item.get("ingredientsID") == item_id:
+                return key
+        return None
+    
+    def set_ingredient_count(self, ingredient_key, value):
+        """Set specific ingredient quantity"""
+        if not self.save_data or "Ingredients" not in self.save_data:
+            return False
+        
+        if ingredient_key in self.save_data["Ingredients"]:
+            value = min(value, SAVE_MAX_INGREDIENT)
+            self.save_data["Ingredients"][ingredient_key]["count"] = value
+            self.note_change()
+            return True
+        return False
+    
+    def hash_tree(self):
+        """Merkle hash tree of the current save data"""
+        if not self.save_data:
+            return None
+        return build_hash_tree(self.document())
+    
+    def diff(self, other):
+        """JSON Patch from this save to other (a DaveSaveEditor or save dict)"""
+        if not self.save_data:
+            return []
+        other_data = other.document() if isinstance(other, DaveSaveEditor) else other
+        return diff_saves(self.document(), other_data)
+    
+    def export_sqlite(self, path, catalog=True):
+        """Write Ingredients, PlayerInfo, SNSInfo (and the item catalog) to an indexed SQLite file"""
+        if not self.save_data:
+            self.last_error = "No save loaded"
+            return False
+        try:
+            export_sqlite([self], path, self.item_db if catalog else None)
+            return True
+        except SQL_ERRORS as e:
+            self.last_error = f"SQLite export failed: {e}"
+            log_message(self.last_error)
+            return False
+    
+    def run_sql(self, sql, params=(), write_back=True):
+        """Run one SQL statement against this save and the catalog
+        
+        Tables are as in save_sql.SaveDatabase. Statements that modify rows
+        (UPDATE, INSERT, DELETE) are written back into the save unless
+        write_back is off. Returns (columns, rows), or ([], rowcount) for
+        modifying statements; None on error, with the reason in last_error.
+        """
+        if not self.save_data:
+            self.last_error = "No save loaded"
+            return None
+        try:
+            db, save_id = self._sql_database()
+            columns, result = db.run(sql, params)
+            if not columns and not (write_back and db.write_back(self, save_id) == 0):
+                # The database no longer matches the save (a written-back change is rebuilt next time)
+                self._drop_sql()
+            return columns, result
+        except SQL_ERRORS as e:
+            self._drop_sql()
+            self.last_error = f"SQL failed: {e}"
+            log_message(self.last_error)
+            return None
+    
+    def _sql_database(self):
+        """(SaveDatabase, save_id) of the current save and catalog, built (and indexed) only when they changed"""
+        content_hash = self.content_hash()
+        items = self.item_db.items if self.item_db is not None else None
+        if self._sql is not None and self._sql[0] == content_hash and self._sql[1] is items:
+            return self._sql[2:]
+        self._drop_sql()
+        db = SaveDatabase()
+        try:
+            save_id = db.add_save(self)
+            db.add_catalog(self.item_db)
+        except SQL_ERRORS:
+            db.close()
+            raise
+        self._sql = (content_hash, items, db, save_id)
+        return db, save_id
+    
+    def _drop_sql(self):
+        if self._sql is not None:
+            self._sql[2].close()
+            self._sql = None
+    
+    def apply_patch(self, patch):
+        """Apply a JSON Patch to the save data (all-or-nothing)
+        
+        Returns the number of operations applied, or None on failure with the
+        reason in last_error.
+        """
+        if not self.save_data:
+            self.last_error = "No save loaded"
+            return None
+        try:
+            with perf.operation('apply_patch', ops=len(patch)):
+                with perf.span('apply'):
+                    data = self.document()
+                    count = apply_patch(data, patch)
+                    if data is not self.save_data:
+                        self._to_columnar(data)
+                        self.save_data = data
+            self.note_change()
+            log_message(f"Applied patch: {count} operations")
+            return count
+        except PatchError as e:
+            self.last_error = f"Patch failed: {e}"
+            log_message(self.last_error)
+            return None
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structural save diff
+Merkle hashes per subtree let identical sections be skipped with one digest
+comparison; differences are emitted and applied as RFC 6902 JSON Patch
+"""
+
+import copy
+import hashlib
+import json
+
+from json_backend import serializer
+
+# Levels above this combine child digests; deeper subtrees are hashed from
+# their compact serialization in one C-speed pass
+HASH_TREE_DEPTH = 2
+DIGEST_SIZE = 16
+
+
+class PatchError(Exception):
+    """A patch operation could not be applied"""
+
+
+# ============ Merkle hash tree ============
+
+class HashNode:
+    """Digest of a subtree, with child nodes for the upper levels"""
+
+    __slots__ = ('digest', 'children')
+
+    def __init__(self, digest, children=None):
+        self.digest = digest
+        self.children = children
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def build_hash_tree(value, depth=0, max_depth=HASH_TREE_DEPTH):
+    """Hash value bottom-up; dict and list nodes above max_depth keep their children"""
+    if depth < max_depth and isinstance(value, dict):
+        children = {key: build_hash_tree(item, depth + 1, max_depth) for key, item in value.items()}
+        h = hashlib.blake2b(b'{', digest_size=DIGEST_SIZE)
+        for key, node in children.items():
+            h.update(key.encode('utf-8', 'surrogatepass'))
+            h.update(b'\0')
+            h.update(node.digest)
+        return HashNode(h.digest(), children)
+    if depth < max_depth and isinstance(value, list):
+        children = [build_hash_tree(item, depth + 1, max_depth) for item in value]
+        h = hashlib.blake2b(b'[', digest_size=DIGEST_SIZE)
+        for node in children:
+            h.update(node.digest)
+        return HashNode(h.digest(), children)
+    return HashNode(_digest(serializer.dumps(value).encode('utf-8', 'surrogatepass')))
+
+
+def copy_tree(value):
+    """Copy the dicts and lists of a JSON tree; strings and numbers are immutable and shared"""
+    if isinstance(value, dict):
+        return {key: copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_tree(item) for item in value]
+    return value
+
+
+# ============ JSON Pointer (RFC 6901) ============
+
+def escape_token(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_token(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def parse_pointer(pointer):
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [unescape_token(token) for token in pointer[1:].split('/')]
+
+
+def _child_pointer(pointer, token):
+    return f'{pointer}/{escape_token(token)}'
+
+
+# ============ Diff ============
+
+def diff(old, new, old_tree=None, new_tree=None):
+    """Return the JSON Patch (list of operations) that turns old into new
+
+    Pass precomputed hash trees to reuse them across several diffs.
+    """
+    ops = []
+    old_tree = old_tree or build_hash_tree(old)
+    new_tree = new_tree or build_hash_tree(new)
+    _diff_node(old, new, old_tree, new_tree, '', ops)
+    return ops
+
+
+def _same_below_tree(old, new):
+    """Equality for subtrees without hash nodes; 1 and True are different values"""
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, (dict, list)):
+        return old == new and serializer.dumps(old) == serializer.dumps(new)
+    return old == new
+
+
+def _diff_node(old, new, old_node, new_node, pointer, ops):
+    if old_node is not None and new_node is not None:
+        if old_node.digest == new_node.digest:
+            return
+    elif _same_below_tree(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        old_children = old_node.children if old_node is not None else None
+        new_children = new_node.children if new_node is not None else None
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': _child_pointer(pointer, key)})
+        for key, value in new.items():
+            child = _child_pointer(pointer, key)
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': copy.deepcopy(value)})
+                continue
+            _diff_node(old[key], value,
+                       old_children.get(key) if old_children else None,
+                       new_children.get(key) if new_children else None,
+                       child, ops)
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        old_children = old_node.children if old_node is not None else None
+        new_children = new_node.children if new_node is not None else None
+        common = min(len(old), len(new))
+        for index in range(common):
+            _diff_node(old[index], new[index],
+                       old_children[index] if old_children else None,
+                       new_children[index] if new_children else None,
+                       _child_pointer(pointer, index), ops)
+        # Remove from the end so earlier indices stay valid
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': _child_pointer(pointer, index)})
+        for index in range(common, len(new)):
+            ops.append({'op': 'add', 'path': _child_pointer(pointer, '-'), 'value': copy.deepcopy(new[index])})
+        return
+    ops.append({'op': 'replace', 'path': pointer, 'value': copy.deepcopy(new)})
+
+
+# ============ Three-way merge ============
+
+def merge3(base_tree, local, remote, local_tree=None, remote_tree=None):
+    """Bring changes made in remote since base into local
+
+    Only the hash tree of the common base is needed, not the base document:
+    a subtree is unchanged on a side when its digest matches the base.
+    Returns (ops, conflicts). ops is a JSON Patch for local; conflicts lists
+    subtrees changed differently on both sides as dicts with 'path' and the
+    'local'/'remote' values (a key is absent when that side deleted it).
+    """
+    ops = []
+    conflicts = []
+    local_tree = local_tree or build_hash_tree(local)
+    remote_tree = remote_tree or build_hash_tree(remote)
+    _merge_node(base_tree, local, remote, local_tree, remote_tree, '', ops, conflicts)
+    return ops, conflicts
+
+
+def _conflict(pointer, local, remote, missing=None):
+    entry = {'path': pointer}
+    if missing != 'local':
+        entry['local'] = copy.deepcopy(local)
+    if missing != 'remote':
+        entry['remote'] = copy.deepcopy(remote)
+    return entry
+
+
+def _merge_node(base_node, local, remote, local_node, remote_node, pointer, ops, conflicts):
+    if remote_node.digest == base_node.digest or local_node.digest == remote_node.digest:
+        return
+    if local_node.digest == base_node.digest:
+        _diff_node(local, remote, local_node, remote_node, pointer, ops)
+        return
+    if not (isinstance(local, dict) and isinstance(remote, dict) and isinstance(base_node.children, dict)
+            and local_node.children is not None and remote_node.children is not None):
+        conflicts.append(_conflict(pointer, local, remote))
+        return
+
+    base_children = base_node.children
+    local_children = local_node.children
+    remote_children = remote_node.children
+    for key, remote_child in remote_children.items():
+        child = _child_pointer(pointer, key)
+        base_child = base_children.get(key)
+        local_child = local_children.get(key)
+        if local_child is None:
+            if base_child is None:
+                ops.append({'op': 'add', 'path': child, 'value': copy.deepcopy(remote[key])})
+            elif base_child.digest != remote_child.digest:
+                # Deleted here, changed on disk
+                conflicts.append(_conflict(child, None, remote[key], missing='local'))
+        elif base_child is None:
+            if local_child.digest != remote_child.digest:
+                conflicts.append(_conflict(child, local[key], remote[key]))
+        else:
+            _merge_node(base_child, local[key], remote[key], local_child, remote_child, child, ops, conflicts)
+    for key, local_child in local_children.items():
+        if key in remote_children:
+            continue
+        base_child = base_children.get(key)
+        if base_child is None:
+            continue
+        child = _child_pointer(pointer, key)
+        if base_child.digest == local_child.digest:
+            ops.append({'op': 'remove', 'path': child})
+        else:
+            # Changed here, deleted on disk
+            conflicts.append(_conflict(child, local[key], None, missing='remote'))
+
+
+def resolution_patch(conflicts, take='remote'):
+    """JSON Patch that settles conflicts from merge3 in favour of one side"""
+    ops = []
+    for entry in conflicts:
+        if take not in entry:
+            ops.append({'op': 'remove', 'path': entry['path']})
+        else:
+            ops.append({'op': 'add', 'path': entry['path'], 'value': copy.deepcopy(entry[take])})
+    return ops
+
+
+# ============ Apply ============
+
+def _json_equal(a, b):
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+def _resolve_parent(doc, tokens, pointer):
+    """Return the container holding the last token of a pointer"""
+    node = doc
+    for token in tokens[:-1]:
+        node = _get_child(node, token, pointer)
+    return node
+
+
+def _list_index(container, token, pointer, allow_end=False):
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise PatchError(f"Invalid array index in {pointer!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range in {pointer!r}")
+    return index
+
+
+def _get_child(node, token, pointer):
+    if isinstance(node, dict):
+        if token not in node:
+            raise PatchError(f"Path not found: {pointer!r}")
+        return node[token]
+    if isinstance(node, list):
+        return node[_list_index(node, token, pointer)]
+    raise PatchError(f"Path not found: {pointer!r}")
+
+
+def _get(doc, pointer):
+    node = doc
+    for token in parse_pointer(pointer):
+        node = _get_child(node, token, pointer)
+    return node
+
+
+def _insert_key(mapping, position, key, value):
+    """Put a key back at its original position (object order is kept in saves)"""
+    items = list(mapping.items())
+    items.insert(position, (key, value))
+    mapping.clear()
+    mapping.update(items)
+
+
+class _Applier:
+    """Applies operations in place and records how to undo each one"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.undo = []
+
+    def add(self, pointer, value):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise PatchError("Replacing the whole document is not supported")
+        parent = _resolve_parent(self.doc, tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            if token in parent:
+                old = parent[token]
+                self.undo.append(lambda: parent.__setitem__(token, old))
+            else:
+                self.undo.append(lambda: parent.pop(token))
+            parent[token] = value
+        elif isinstance(parent, list):
+            index = _list_index(parent, token, pointer, allow_end=True)
+            parent.insert(index, value)
+            self.undo.append(lambda: parent.pop(index))
+        else:
+            raise PatchError(f"Path not found: {pointer!r}")
+
+    def remove(self, pointer):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise PatchError("Removing the whole document is not supported")
+        parent = _resolve_parent(self.doc, tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise PatchError(f"Path not found: {pointer!r}")
+            position = list(parent).index(token)
+            old = parent.pop(token)
+            self.undo.append(lambda: _insert_key(parent, position, token, old))
+            return old
+        if isinstance(parent, list):
+            index = _list_index(parent, token, pointer)
+            old = parent.pop(index)
+            self.undo.append(lambda: parent.insert(index, old))
+            return old
+        raise PatchError(f"Path not found: {pointer!r}")
+
+    def replace(self, pointer, value):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise PatchError("Replacing the whole document is not supported")
+        parent = _resolve_parent(self.doc, tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise PatchError(f"Path not found: {pointer!r}")
+            key = token
+        elif isinstance(parent, list):
+            key = _list_index(parent, token, pointer)
+        else:
+            raise PatchError(f"Path not found: {pointer!r}")
+        old = parent[key]
+        parent[key] = value
+        self.undo.append(lambda: parent.__setitem__(key, old))
+
+    def apply(self, op):
+        kind = op.get('op')
+        pointer = op.get('path')
+        if not isinstance(pointer, str):
+            raise PatchError(f"Operation without a path: {op!r}")
+        if kind == 'add':
+            self.add(pointer, copy.deepcopy(op['value']))
+        elif kind == 'remove':
+            self.remove(pointer)
+        elif kind == 'replace':
+            self.replace(pointer, copy.deepcopy(op['value']))
+        elif kind == 'move':
+            source = op['from']
+            if pointer.startswith(source + '/'):
+                raise PatchError(f"Cannot move {source!r} into itself")
+            self.add(pointer, self.remove(source))
+        elif kind == 'copy':
+            self.add(pointer, copy.deepcopy(_get(self.doc, op['from'])))
+        elif kind == 'test':
+            if not _json_equal(_get(self.doc, pointer), op.get('value')):
+                raise PatchError(f"Test failed at {pointer!r}")
+        else:
+            raise PatchError(f"Unknown operation: {kind!r}")
+
+    def rollback(self):
+        while self.undo:
+            self.undo.pop()()
+
+
+def apply_patch(doc, patch):
+    """Apply a JSON Patch to doc in place; all-or-nothing
+
+    Returns the number of operations applied. On failure every operation
+    already applied is undone and PatchError is raised.
+    """
+    applier = _Applier(doc)
+    try:
+        for op in patch:
+            applier.apply(op)
+    except PatchError:
+        applier.rollback()
+        raise
+    except (KeyError, TypeError, AttributeError) as e:
+        applier.rollback()
+        raise PatchError(f"Malformed operation: {e}") from e
+    return len(patch)
+
+
+def load_patch(path):
+    """Read a patch file (a JSON array of operations)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        patch = serializer.loads(f.read())
+    if not isinstance(patch, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    return patch
+
+
+def save_patch(patch, path):
+    """Write a patch file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(serializer.dumps_pretty(patch))
+
+
+def summarize(patch, limit=20):
+    """Short human-readable lines for a patch"""
+    lines = []
+    for op in patch[:limit]:
+        line = f"{op['op']:<8}{op['path']}"
+        if 'value' in op and not isinstance(op['value'], (dict, list)):
+            line += f" = {op['value']!r}"
+        elif 'from' in op:
+            line += f" <- {op['from']}"
+        lines.append(line)
+    if len(patch) > limit:
+        lines.append(f"... {len(patch) - limit} more")
+    return lines
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Save file discovery index
+Crawls storage roots with os.scandir for .sav files in the background and
+keeps a persisted index of path, size, mtime and last-opened time. Rescans
+only list directories whose mtime changed since the previous scan.
+
+    python save_index.py [root ...]   # scan and print recent/discovered saves
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from log_utils import IS_ANDROID, get_app_dir, log_message, log_debug
+
+INDEX_FILE_NAME = 'save_index.json'
+INDEX_VERSION = 1
+SAVE_SUFFIX = '.sav'
+
+# Never worth descending into: media, caches and our own output
+PRUNE_DIRS = {
+    'DCIM', 'Pictures', 'Movies', 'Music', 'Podcasts', 'Ringtones', 'Alarms',
+    'Notifications', 'Audiobooks', 'Recordings', 'Screenshots',
+    'node_modules', '__pycache__', 'site-packages', 'cache', 'Cache', 'caches',
+    'backups', 'spill', 'logs', 'proc', 'sys', 'dev',
+}
+MAX_DEPTH = 10
+
+
+def default_roots():
+    """Storage roots to crawl; DAVESAVEED_SCAN_ROOTS (os.pathsep separated) overrides"""
+    override = os.environ.get('DAVESAVEED_SCAN_ROOTS')
+    if override:
+        return [root for root in override.split(os.pathsep) if root]
+    if IS_ANDROID:
+        try:
+            from android.storage import primary_external_storage_path
+            return [primary_external_storage_path()]
+        except ImportError:
+            return ['/sdcard']
+    return [os.path.expanduser('~')]
+
+
+def _prune(name):
+    return name.startswith('.') or name in PRUNE_DIRS
+
+
+class SaveIndex:
+    """Persisted index of discovered saves
+
+    dirs maps each crawled directory to its mtime and subdirectories, so an
+    unchanged directory is not listed again; files maps save paths to size,
+    mtime and last-opened time.
+    """
+
+    def __init__(self, roots=None, index_path=None):
+        self.roots = [os.path.abspath(root) for root in (roots or default_roots())]
+        self.index_path = index_path or get_app_dir(INDEX_FILE_NAME)
+        self.dirs = {}
+        self.files = {}
+        self.last_scan = None
+        self.scanning = False
+        self._lock = threading.Lock()
+        # Serializes save(): the scan thread and mark_opened() both write the index
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self.load()
+
+    # ---- persistence ----
+
+    def load(self):
+        """Read the persisted index (missing or damaged files start empty)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return False
+            with self._lock:
+                self.dirs = data.get('dirs', {})
+                self.files = data.get('files', {})
+                self.last_scan = data.get('last_scan')
+            return True
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def save(self):
+        """Write the index atomically (one writer at a time, so the newest snapshot lands last)"""
+        with self._write_lock:
+            with self._lock:
+                data = {
+                    'version': INDEX_VERSION,
+                    'last_scan': self.last_scan,
+                    'dirs': dict(self.dirs),
+                    'files': {path: dict(info) for path, info in self.files.items()},
+                }
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                tmp_path = self.index_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                log_message(f"Failed to write save index: {e}")
+
+    # ---- scanning ----
+
+    def scan(self):
+        """Crawl all roots; returns (directories listed, directories reused)"""
+        listed = reused = 0
+        seen_dirs = set()
+        # Known saves by directory, so each directory only looks at its own files
+        with self._lock:
+            by_dir = {}
+            for file_path in self.files:
+                by_dir.setdefault(os.path.dirname(file_path), []).append(file_path)
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            stack = [(root, 0)]
+            while stack:
+                path, depth = stack.pop()
+                seen_dirs.add(path)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                known = self.dirs.get(path)
+                if known is not None and known.get('mtime') == mtime:
+                    subdirs = known.get('subdirs', [])
+                    self._refresh_files(by_dir.get(path, ()))
+                    reused += 1
+                else:
+                    subdirs = self._list_directory(path, mtime, by_dir.get(path, ()))
+                    listed += 1
+                if depth < MAX_DEPTH:
+                    stack.extend((os.path.join(path, name), depth + 1) for name in subdirs)
+
+        with self._lock:
+            # Directories that disappeared (or are no longer under a root)
+            for path in [p for p in self.dirs if p not in seen_dirs]:
+                del self.dirs[path]
+            for path in [p for p, info in self.files.items()
+                         if info.get('discovered') and os.path.dirname(p) not in seen_dirs]:
+                self._forget(path)
+            self.last_scan = time.time()
+        return listed, reused
+
+    def _list_directory(self, path, mtime, known=()):
+        """List one directory: record .sav files and subdirectories to descend into
+
+        known lists the saves the index had in this directory before the scan.
+        """
+        subdirs = []
+        found = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not _prune(entry.name):
+                                subdirs.append(entry.name)
+                        elif entry.name.endswith(SAVE_SUFFIX) and entry.is_file():
+                            st = entry.stat()
+                            found[entry.path] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            log_debug(f"Cannot list {path}: {e}")
+            return []
+
+        with self._lock:
+            self.dirs[path] = {'mtime': mtime, 'subdirs': subdirs}
+            for file_path in known:
+                if file_path not in found and self.files.get(file_path, {}).get('discovered'):
+                    self._forget(file_path)
+            for file_path, (size, file_mtime) in found.items():
+                info = self.files.setdefault(file_path, {'last_opened': None})
+                info.update(size=size, mtime=file_mtime, discovered=True)
+        return subdirs
+
+    def _refresh_files(self, paths):
+        """Update size/mtime of known saves in an unchanged directory (contents can still change)"""
+        for file_path in paths:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                with self._lock:
+                    self._forget(file_path)
+                continue
+            with self._lock:
+                info = self.files.get(file_path)
+                if info is not None:
+                    info.update(size=st.st_size, mtime=st.st_mtime_ns)
+
+    def _forget(self, path):
+        info = self.files.get(path)
+        if info is None:
+            return
+        if info.get('last_opened'):
+            # Keep opened saves in the recent list; they may be on removable storage
+            info['discovered'] = False
+        else:
+            del self.files[path]
+
+    def start_background_scan(self, callback=None):
+        """Scan on a worker thread, then save the index and call callback(index)"""
+        if self.scanning:
+            return False
+        self.scanning = True
+
+        def run():
+            start = time.perf_counter()
+            try:
+                listed, reused = self.scan()
+                self.save()
+                log_message(f"Save index: {len(self.files)} saves, {listed} dirs listed, "
+                            f"{reused} unchanged ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            except Exception as e:
+                log_message(f"Save scan failed: {e}")
+            finally:
+                self.scanning = False
+            if callback is not None:
+                callback(self)
+
+        self._thread = threading.Thread(target=run, name='save_index', daemon=True)
+        self._thread.start()
+        return True
+
+    # ---- queries ----
+
+    def mark_opened(self, path):
+        """Record that a save was opened (adds it if it was found some other way)"""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            info = self.files.setdefault(path, {'discovered': False})
+            info.update(size=st.st_size, mtime=st.st_mtime_ns, last_opened=time.time())
+        self.save()
+
+    def recent(self, limit=50):
+        """Saves ordered by last opened, then by modification time (newest first)"""
+        with self._lock:
+            items = [(path, dict(info)) for path, info in self.files.items()]
+        items.sort(key=lambda item: (item[1].get('last_opened') or 0, item[1].get('mtime') or 0), reverse=True)
+        return [dict(info, path=path) for path, info in items[:limit]]
+
+
+def main(argv=None):
+    roots = sys.argv[1:] if argv is None else argv
+    index = SaveIndex(roots or None)
+    start = time.perf_counter()
+    listed, reused = index.scan()
+    index.save()
+    print(f"{listed} directories listed, {reused} unchanged, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    for info in index.recent():
+        opened = time.strftime('%Y-%m-%d %H:%M', time.localtime(info['last_opened'])) if info.get('last_opened') else '-'
+        print(f"{info['size']:>10}  {opened:<16}  {info['path']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
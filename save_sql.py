@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite view of saves and the item catalog
+Ingredients, PlayerInfo and SNSInfo of one or more saves plus the catalog are
+bulk-loaded into indexed tables; changes made with SQL are written back to
+the saves field by field, keeping the original value types
+"""
+
+import json
+import os
+import sqlite3
+
+from log_utils import log_message, log_debug
+from perf_utils import perf
+from ingredient_table import IngredientTable
+
+INGREDIENTS_TABLE = 'ingredients'
+# Object sections stored as one row per save
+SECTION_TABLES = {
+    'PlayerInfo': 'player_info',
+    'SNSInfo': 'sns_info',
+}
+CATALOG_TABLE = 'catalog'
+INDEXED_INGREDIENT_FIELDS = ('ingredientsID', 'count', 'level')
+
+
+
+class WriteBackError(sqlite3.IntegrityError):
+    """A SQL change cannot be written into the save (it has no nullable fields)"""
+
+
+# What a bad statement, a rejected write-back or an unwritable database file raises
+SQL_ERRORS = (sqlite3.Error, OSError)
+
+_MISSING = object()
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 63 - 1
+
+
+def quote(identifier):
+    """SQL identifier for a save field name"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def to_sql(value):
+    """Save value -> SQLite value (objects, arrays and huge ints as JSON text)"""
+    kind = type(value)
+    if kind is bool:
+        return int(value)
+    if kind is int:
+        return value if _INT_MIN <= value <= _INT_MAX else json.dumps(value)
+    if kind is dict or kind is list:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return value
+
+
+def from_sql(value, like=_MISSING, kind=None):
+    """SQLite value -> save value, shaped like the value it replaces (or the column kind)"""
+    if value is None:
+        return None
+    template = type(like) if like is not _MISSING and like is not None else None
+    if template is bool or (template is None and kind == 'bool'):
+        return bool(value) if value in (0, 1) else value
+    if template in (dict, list) or (template is None and kind == 'json'):
+        if isinstance(value, str):
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+    if template is int and isinstance(value, str) and kind == 'json':
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _kind(value):
+    kind = type(value)
+    if kind is bool:
+        return 'bool'
+    if kind is dict or kind is list or (kind is int and not _INT_MIN <= value <= _INT_MAX):
+        return 'json'
+    return 'plain'
+
+
+class SaveDatabase:
+    """Saves and catalog in SQLite
+
+    Tables: saves(save_id, path, name), ingredients(save_id, key, <fields>),
+    player_info / sns_info(save_id, <fields>), catalog(id, name). Field
+    columns are named like the save fields; absent fields are NULL.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.columns = {}
+        self.kinds = {}
+        self._indexed = True
+        self.conn.execute('CREATE TABLE IF NOT EXISTS saves (save_id INTEGER PRIMARY KEY, path TEXT, name TEXT)')
+
+    @classmethod
+    def create_file(cls, path):
+        """Fresh database file; it is a derived copy, so durability is traded for load speed"""
+        if os.path.exists(path):
+            os.remove(path)
+        db = cls(path)
+        db.conn.execute('PRAGMA journal_mode=OFF')
+        db.conn.execute('PRAGMA synchronous=OFF')
+        return db
+
+    # ---- schema ----
+
+    def _ensure_table(self, table, key_columns, fields):
+        """Create table (or add columns) so every field has a column"""
+        columns = self.columns.get(table)
+        if columns is None:
+            keys = ', '.join(key_columns)
+            body = ', '.join([f'{name} {decl}' for name, decl in key_columns.items()] +
+                             [quote(field) for field in fields])
+            self.conn.execute(f'CREATE TABLE {table} ({body}, PRIMARY KEY ({keys}))')
+            self.columns[table] = list(fields)
+            return
+        for field in fields:
+            if field not in columns:
+                self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {quote(field)}')
+                columns.append(field)
+
+    def _note_kinds(self, table, field, values):
+        kinds = self.kinds.setdefault(table, {})
+        for value in values:
+            if value is not None:
+                kinds.setdefault(field, _kind(value))
+                return
+
+    def _ensure_indexes(self):
+        if self._indexed:
+            return
+        with perf.span('sql_index'):
+            with self.conn:
+                for field in INDEXED_INGREDIENT_FIELDS:
+                    if field in self.columns.get(INGREDIENTS_TABLE, ()):
+                        self.conn.execute(f'CREATE INDEX IF NOT EXISTS {INGREDIENTS_TABLE}_{field} '
+                                          f'ON {INGREDIENTS_TABLE} ({quote(field)})')
+                if CATALOG_TABLE in self.columns:
+                    self.conn.execute(f'CREATE INDEX IF NOT EXISTS {CATALOG_TABLE}_name ON {CATALOG_TABLE} (name)')
+        self._indexed = True
+
+    # ---- loading ----
+
+    def add_save(self, editor, name=None):
+        """Load one save's sections (one transaction, executemany per table); returns its save_id"""
+        data = editor.save_data or {}
+        path = os.path.abspath(editor.file_path) if editor.file_path else None
+        with perf.operation('sql_load', file=name or os.path.basename(path or '')):
+            with self.conn:
+                cursor = self.conn.execute('INSERT INTO saves (path, name) VALUES (?, ?)',
+                                           (path, name or (os.path.basename(path) if path else None)))
+                save_id = cursor.lastrowid
+                with perf.span('ingredients'):
+                    self._load_ingredients(save_id, data.get('Ingredients'))
+                for section, table in SECTION_TABLES.items():
+                    if isinstance(data.get(section), dict):
+                        self._load_section(save_id, table, data[section])
+        self._indexed = False
+        return save_id
+
+    def _load_ingredients(self, save_id, ingredients):
+        if not ingredients:
+            return
+        if isinstance(ingredients, IngredientTable):
+            # Column-wise read, no per-row views
+            fields = list(ingredients.columns)
+            rows = list(ingredients.iter_fields(fields))
+        else:
+            fields = {}
+            for record in ingredients.values():
+                for field in record:
+                    fields.setdefault(field)
+            fields = list(fields)
+            rows = [(key,) + tuple(record.get(f) for f in fields) for key, record in ingredients.items()]
+        for index, field in enumerate(fields, 1):
+            self._note_kinds(INGREDIENTS_TABLE, field, (row[index] for row in rows))
+
+        self._ensure_table(INGREDIENTS_TABLE, {'save_id': 'INTEGER', 'key': 'TEXT'}, fields)
+        names = ', '.join(['save_id', 'key'] + [quote(f) for f in fields])
+        marks = ', '.join('?' * (len(fields) + 2))
+        self.conn.executemany(f'INSERT INTO {INGREDIENTS_TABLE} ({names}) VALUES ({marks})',
+                              [(save_id, row[0]) + tuple(map(to_sql, row[1:])) for row in rows])
+
+    def _load_section(self, save_id, table, section):
+        fields = list(section)
+        self._ensure_table(table, {'save_id': 'INTEGER'}, fields)
+        for field in fields:
+            self._note_kinds(table, field, (section[field],))
+        names = ', '.join(['save_id'] + [quote(f) for f in fields])
+        marks = ', '.join('?' * (len(fields) + 1))
+        self.conn.execute(f'INSERT INTO {table} ({names}) VALUES ({marks})',
+                          (save_id,) + tuple(to_sql(section[f]) for f in fields))
+
+    def add_catalog(self, item_db):
+        """Load the item catalog as catalog(id, name)"""
+        if item_db is None or not item_db.items:
+            return 0
+        with perf.operation('sql_catalog', items=len(item_db.items)):
+            with self.conn:
+                if CATALOG_TABLE not in self.columns:
+                    self.conn.execute(f'CREATE TABLE {CATALOG_TABLE} (id INTEGER PRIMARY KEY, name TEXT)')
+                    self.columns[CATALOG_TABLE] = ['name']
+                self.conn.executemany(f'INSERT OR REPLACE INTO {CATALOG_TABLE} (id, name) VALUES (?, ?)',
+                                      ((item_id, str(name)) for item_id, name in item_db.items.items()))
+        self._indexed = False
+        return len(item_db.items)
+
+    # ---- queries ----
+
+    def query(self, sql, params=()):
+        """Run a read-only query; returns (column names, rows)"""
+        self._ensure_indexes()
+        cursor = self.conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        return columns, cursor.fetchall()
+
+    def execute(self, sql, params=()):
+        """Run a modifying statement in its own transaction; returns the affected row count"""
+        self._ensure_indexes()
+        with self.conn:
+            return self.conn.execute(sql, params).rowcount
+
+    def run(self, sql, params=()):
+        """query() for statements that return rows, execute() otherwise
+
+        Returns (columns, rows); modifying statements give ([], rowcount).
+        """
+        self._ensure_indexes()
+        with self.conn:
+            cursor = self.conn.execute(sql, params)
+            if cursor.description:
+                return [d[0] for d in cursor.description], cursor.fetchall()
+            return [], cursor.rowcount
+
+    def save_ids(self):
+        """{path: save_id} for every loaded save"""
+        return {path: save_id for save_id, path in self.conn.execute('SELECT save_id, path FROM saves')}
+
+    # ---- write-back ----
+
+    def write_back(self, editor, save_id):
+        """Copy SQL changes of one save into the editor; returns the number of fields changed
+
+        Ingredient rows inserted or deleted with SQL are added to or removed
+        from the save. Values keep the type of the value they replace, so
+        booleans stay booleans and objects are parsed back from JSON text.
+        Setting a field the save has to NULL raises WriteBackError before
+        anything is changed.
+        """
+        data = editor.save_data
+        if not data:
+            return 0
+        changes = []
+        with perf.operation('sql_write_back'):
+            if INGREDIENTS_TABLE in self.columns and 'Ingredients' in data:
+                changes += self._ingredient_changes(data['Ingredients'], save_id)
+            for section, table in SECTION_TABLES.items():
+                if table in self.columns and isinstance(data.get(section), dict):
+                    changes += self._section_changes(data[section], section, table, save_id)
+            # Collected first, so a rejected row leaves the save untouched
+            changed = 0
+            for container, key, value, weight in changes:
+                if value is _MISSING:
+                    del container[key]
+                else:
+                    container[key] = value
+                changed += weight
+        if changed:
+            editor.note_change()
+            log_message(f"SQL write-back: {changed} fields changed")
+        return changed
+
+    def _row_changes(self, record, table, fields, values, where):
+        """(record, field, new value, 1) for each field of a row that differs from the save"""
+        kinds = self.kinds.get(table, {})
+        changes = []
+        for field, value in zip(fields, values):
+            old = record.get(field, _MISSING)
+            if old is _MISSING:
+                if value is None:
+                    continue
+            elif value is None:
+                raise WriteBackError(f"{where}.{field} cannot be set to NULL")
+            elif to_sql(old) == value and type(to_sql(old)) is type(value):
+                continue
+            changes.append((record, field, from_sql(value, old, kinds.get(field)), 1))
+        return changes
+
+    def _ingredient_changes(self, ingredients, save_id):
+        fields = self.columns[INGREDIENTS_TABLE]
+        names = ', '.join(['key'] + [quote(f) for f in fields])
+        cursor = self.conn.execute(f'SELECT {names} FROM {INGREDIENTS_TABLE} WHERE save_id = ?', (save_id,))
+        changes = []
+        seen = set()
+        for row in cursor:
+            key = str(row[0])
+            seen.add(key)
+            record = ingredients.get(key)
+            if record is None:
+                kinds = self.kinds.get(INGREDIENTS_TABLE, {})
+                record = {f: from_sql(v, kind=kinds.get(f)) for f, v in zip(fields, row[1:]) if v is not None}
+                changes.append((ingredients, key, record, len(record)))
+                continue
+            changes += self._row_changes(record, INGREDIENTS_TABLE, fields, row[1:], f'Ingredients.{key}')
+        changes += [(ingredients, key, _MISSING, 1) for key in ingredients if key not in seen]
+        log_debug(f"Ingredients write-back: {len(changes)} changes")
+        return changes
+
+    def _section_changes(self, section, name, table, save_id):
+        fields = self.columns[table]
+        names = ', '.join(quote(f) for f in fields)
+        row = self.conn.execute(f'SELECT {names} FROM {table} WHERE save_id = ?', (save_id,)).fetchone()
+        if row is None:
+            return []
+        return self._row_changes(section, table, fields, row, name)
+
+    def close(self):
+        self.conn.close()
+
+
+def export_sqlite(editors, path, item_db=None):
+    """Write saves (and the catalog) to a new indexed SQLite file; returns {path: save_id}"""
+    tmp_path = path + '.tmp'
+    db = SaveDatabase.create_file(tmp_path)
+    try:
+        for editor in editors:
+            db.add_save(editor)
+        db.add_catalog(item_db)
+        db._ensure_indexes()
+        save_ids = db.save_ids()
+    finally:
+        db.close()
+    os.replace(tmp_path, path)
+    log_message(f"SQLite export: {path}")
+    return save_ids
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Save change watcher
+Notices when the game or a sync tool rewrites an open save (inotify on Linux
+and Android, mtime/size polling elsewhere) and merges the new file into the
+editor's unsaved state, flagging fields that were changed on both sides
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import struct
+import sys
+
+from log_utils import log_message, log_debug
+from perf_utils import perf
+from json_backend import serializer
+from save_core import BypassTable, decode_sav_to_json, clean_json_string
+from save_diff import build_hash_tree, merge3, resolution_patch
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+# A finished write or an atomic rename over the save; IN_MODIFY fires mid-write
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def file_signature(path):
+    """(mtime_ns, size, inode) of a file, or None if it is missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+# ============ Backends ============
+
+class PollingBackend:
+    """Reports every watched path; the watcher filters them by stat signature"""
+
+    name = 'poll'
+
+    def __init__(self):
+        self.paths = set()
+
+    def add(self, path):
+        self.paths.add(path)
+
+    def remove(self, path):
+        self.paths.discard(path)
+
+    def poll(self):
+        return set(self.paths)
+
+    def close(self):
+        self.paths.clear()
+
+
+class InotifyBackend:
+    """Watches the directories holding the saves (renames replace the file's inode)"""
+
+    name = 'inotify'
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.paths = set()
+        self.dirs = {}
+        self.wds = {}
+
+    def add(self, path):
+        directory = os.path.dirname(path)
+        if directory not in self.dirs:
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+            self.dirs[directory] = wd
+            self.wds[wd] = directory
+        self.paths.add(path)
+
+    def remove(self, path):
+        self.paths.discard(path)
+        directory = os.path.dirname(path)
+        if directory in self.dirs and not any(os.path.dirname(p) == directory for p in self.paths):
+            wd = self.dirs.pop(directory)
+            del self.wds[wd]
+            self._rm_watch(self.fd, wd)
+
+    def poll(self):
+        """Watched paths with events since the last call (never blocks)"""
+        touched = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                directory = self.wds.get(wd)
+                if directory is not None and name:
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in self.paths:
+                        touched.add(path)
+        return touched
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_backend():
+    """inotify where available; DAVESAVEED_WATCH=poll forces polling"""
+    if os.environ.get('DAVESAVEED_WATCH') != 'poll' and sys.platform.startswith('linux'):
+        try:
+            return InotifyBackend()
+        except (OSError, AttributeError) as e:
+            log_debug(f"inotify unavailable, polling instead: {e}")
+    return PollingBackend()
+
+
+# ============ Reconciling ============
+
+class ReloadResult:
+    """Outcome of merging a rewritten file into an open save"""
+
+    __slots__ = ('applied', 'conflicts', 'error', 'clean_hash')
+
+    def __init__(self, applied=0, conflicts=None, error=None, clean_hash=None):
+        self.applied = applied
+        self.conflicts = conflicts or []
+        self.error = error
+        # content_hash() of the file as it is now on disk
+        self.clean_hash = clean_hash
+
+
+class _TrackedSave:
+    __slots__ = ('signature', 'file_digest', 'base_tree')
+
+    def __init__(self, signature, file_digest, base_tree):
+        self.signature = signature
+        self.file_digest = file_digest
+        self.base_tree = base_tree
+
+
+def _file_digest(raw):
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _content_hash(data):
+    """Same digest as DaveSaveEditor.content_hash()"""
+    return hashlib.blake2b(serializer.dumps(data).encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+def _adopt_spans(json_str, source, target):
+    """Rewrite bypass references of source to the equivalent ones in target
+
+    Equal raw spans get the same token, so unchanged troublesome fields hash
+    the same in the open save and in the re-decoded file.
+    """
+    if not len(source):
+        return json_str
+    known = {span: index for index, span in enumerate(target.spans)}
+    tokens = []
+    for span in source.spans:
+        index = known.get(span)
+        tokens.append(target.token(index) if index is not None else target.add(*span))
+    return source.pattern().sub(lambda match: tokens[int(match.group(1))], json_str)
+
+
+class SaveWatcher:
+    """Tracks open saves against their files
+
+    track() records the file's signature and the hash tree of what was
+    loaded or saved (the merge base). changed() lists saves whose file was
+    rewritten since; reconcile() merges such a file into the editor.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self.tracked = {}
+        self.pending = set()
+        log_debug(f"Save watcher: {self.backend.name}")
+
+    def track(self, editor):
+        """Record the editor's file as the merge base (call after loading or saving)"""
+        path = os.path.abspath(editor.file_path)
+        try:
+            with open(path, 'rb') as f:
+                file_digest = _file_digest(f.read())
+        except OSError:
+            file_digest = None
+        self.tracked[path] = _TrackedSave(file_signature(path), file_digest, editor.hash_tree())
+        self.pending.discard(path)
+        try:
+            self.backend.add(path)
+        except OSError as e:
+            log_message(f"Cannot watch {path}: {e}; polling instead")
+            self.backend.close()
+            self.backend = PollingBackend()
+            for tracked_path in self.tracked:
+                self.backend.add(tracked_path)
+
+    def untrack(self, path):
+        path = os.path.abspath(path)
+        self.tracked.pop(path, None)
+        self.pending.discard(path)
+        self.backend.remove(path)
+
+    def changed(self):
+        """Tracked paths whose file differs from the recorded signature (cheap: stat only)"""
+        for path in self.backend.poll():
+            state = self.tracked.get(path)
+            if state is None:
+                continue
+            signature = file_signature(path)
+            if signature is not None and signature != state.signature:
+                self.pending.add(path)
+        return sorted(self.pending)
+
+    def reconcile(self, editor):
+        """Merge the rewritten file into the editor's save data
+
+        Changes on disk to subtrees the user has not touched are applied;
+        subtrees changed on both sides are left as they are in the editor and
+        returned as conflicts. Returns a ReloadResult, or None if the file
+        has not changed.
+        """
+        path = os.path.abspath(editor.file_path)
+        state = self.tracked.get(path)
+        if state is None or not editor.save_data:
+            return None
+        signature = file_signature(path)
+        if signature is None or signature == state.signature:
+            self.pending.discard(path)
+            return None
+
+        # Stays pending (and unsaveable) until the file has been read and merged
+        self.pending.add(path)
+        with perf.operation('reconcile', file=os.path.basename(path)):
+            try:
+                with perf.span('read', signature[1]):
+                    with open(path, 'rb') as f:
+                        raw = f.read()
+            except OSError as e:
+                return ReloadResult(error=f"Cannot read {path}: {e}")
+            file_digest = _file_digest(raw)
+            if file_digest == state.file_digest:
+                # Touched or rewritten with identical bytes
+                state.signature = signature
+                self.pending.discard(path)
+                return None
+
+            try:
+                with perf.span('decode', len(raw)):
+                    table = BypassTable()
+                    json_str = clean_json_string(decode_sav_to_json(raw, table))
+                    json_str = _adopt_spans(json_str, table, editor.bypass_table)
+                with perf.span('parse', len(json_str)):
+                    remote = serializer.loads(json_str)
+                    clean_hash = _content_hash(remote)
+            except ValueError as e:
+                # Most likely caught mid-write; retried on the next check
+                return ReloadResult(error=f"Rewritten save is not readable yet: {e}")
+
+            with perf.span('merge'):
+                remote_tree = build_hash_tree(remote)
+                ops, conflicts = merge3(state.base_tree, editor.document(), remote, remote_tree=remote_tree)
+            if ops and editor.apply_patch(ops) is None:
+                return ReloadResult(error=editor.last_error)
+
+        # The file is the new merge base; conflicting local values stay unsaved edits
+        self.tracked[path] = _TrackedSave(signature, file_digest, remote_tree)
+        self.pending.discard(path)
+        log_message(f"Merged external change to {os.path.basename(path)}: "
+                    f"{len(ops)} updates, {len(conflicts)} conflicts")
+        return ReloadResult(len(ops), conflicts, clean_hash=clean_hash)
+
+    def resolve(self, editor, conflicts, take='remote'):
+        """Settle conflicts from reconcile(): 'remote' takes the file's values, 'local' keeps the editor's"""
+        if take == 'local' or not conflicts:
+            return 0
+        return editor.apply_patch(resolution_patch(conflicts, take))
+
+    def close(self):
+        self.backend.close()
+        self.tracked.clear()
+        self.pending.clear()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+String interning for parsed saves
+Repeated short string values (timestamps, flags, type names) and object keys
+are replaced by one shared instance, in place and without changing the
+serialized output
+"""
+
+import sys
+
+# Longer strings rarely repeat and would only grow the pool
+MAX_INTERN_LENGTH = 64
+STEP_CONTAINERS = 500
+
+
+class StringPool:
+    """Canonical instances of repeated strings, plus savings statistics
+
+    Runs as a separate pass after parsing rather than as an object hook:
+    the stdlib parser already shares key objects within one document, and a
+    per-object Python hook would add ~40% to parse time. compact() can be
+    driven in small steps so the UI never blocks on it.
+    """
+
+    def __init__(self, max_length=MAX_INTERN_LENGTH):
+        self.max_length = max_length
+        self.pool = {}
+        self.values_shared = 0
+        self.keys_shared = 0
+        self.bytes_saved = 0
+
+    def canonical(self, text):
+        return self.pool.setdefault(text, text)
+
+    def _share(self, container, key, value):
+        """Swap container[key] for the pooled copy of the string value"""
+        shared = self.pool.setdefault(value, value)
+        if shared is not value:
+            self.values_shared += 1
+            self.bytes_saved += sys.getsizeof(value)
+            container[key] = shared
+
+    def _rekeyed(self, node):
+        """Copy of node with pooled keys (keys can only be swapped by rebuilding; order is kept)"""
+        pool = self.pool
+        replacement = {}
+        for key, value in node.items():
+            shared = pool.setdefault(key, key)
+            if shared is not key:
+                self.keys_shared += 1
+                self.bytes_saved += sys.getsizeof(key)
+            replacement[shared] = value
+        return replacement
+
+    def _compact_dict(self, node, stack):
+        """Share the keys and short string values of one dict; returns the dict to keep"""
+        pool = self.pool
+        max_length = self.max_length
+        for key in node:
+            if pool.setdefault(key, key) is not key:
+                node = self._rekeyed(node)
+                break
+
+        for key, value in node.items():
+            kind = type(value)
+            if kind is str:
+                if len(value) <= max_length and pool.get(value) is not value:
+                    # Assigning to an existing key does not change the dict's size
+                    self._share(node, key, value)
+            elif kind is dict or kind is list:
+                stack.append((value, node, key))
+        return node
+
+    def _compact_list(self, node, stack):
+        pool = self.pool
+        max_length = self.max_length
+        for index, value in enumerate(node):
+            kind = type(value)
+            if kind is str:
+                if len(value) <= max_length and pool.get(value) is not value:
+                    self._share(node, index, value)
+            elif kind is dict or kind is list:
+                stack.append((value, node, index))
+
+    def compact(self, data, step=STEP_CONTAINERS):
+        """Generator: intern strings in data, yielding after every `step` containers
+
+        Containers are re-checked against their parent before use, so edits
+        made between steps are never overwritten. Other mapping types (e.g. a
+        columnar IngredientTable) are skipped; they manage their own strings.
+        """
+        if type(data) is not dict and type(data) is not list:
+            return
+        stack = [(data, None, None)]
+        done = 0
+        while stack:
+            node, parent, key = stack.pop()
+            if parent is not None:
+                try:
+                    if parent[key] is not node:
+                        continue
+                except (KeyError, IndexError):
+                    continue
+            if type(node) is dict:
+                kept = self._compact_dict(node, stack)
+                if kept is not node:
+                    if parent is None:
+                        # The root cannot be swapped; children already point at kept
+                        node.clear()
+                        node.update(kept)
+                    else:
+                        parent[key] = kept
+            else:
+                self._compact_list(node, stack)
+            done += 1
+            if done % step == 0:
+                yield done
+
+    def run(self, data):
+        """Compact data in one go"""
+        for _ in self.compact(data):
+            pass
+        return self.stats()
+
+    def stats(self):
+        return {
+            'pooled': len(self.pool),
+            'values_shared': self.values_shared,
+            'keys_shared': self.keys_shared,
+            'saved_kb': round(self.bytes_saved / 1024, 1),
+        }
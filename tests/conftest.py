@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Shared fixtures: the app modules live at the repository root, generators in tools/"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'tools')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import json_backend
+from benchmark import generate_save_data
+
+
+@pytest.fixture(params=[backend.name for backend in json_backend.available_backends()])
+def backend(request, monkeypatch):
+    """Every installed JSON backend in turn, installed as the shared serializer"""
+    instance = json_backend.BACKENDS[request.param]()
+    for module in ('json_backend', 'save_core', 'export_io', 'save_diff', 'workspace'):
+        if module in sys.modules and hasattr(sys.modules[module], 'serializer'):
+            monkeypatch.setattr(sys.modules[module], 'serializer', instance)
+    return instance
+
+
+def compact_json(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+@pytest.fixture
+def dump():
+    """Compact stdlib serialization: the reference form of save output"""
+    return compact_json
+
+
+@pytest.fixture
+def save_text():
+    """Compact plaintext of a small synthetic save, with numbers the fast backends format differently"""
+    data = generate_save_data(ingredients=30, seed=7)
+    data['Tuning'] = {'r': 1e-05, 'big': 1e+16, 'tiny': 5e-324, 'neg': -0.0, 'wide': 2 ** 70}
+    text = compact_json(data)
+    # NaN is not valid JSON for json.dumps(allow_nan=False) users, but saves may carry it
+    return text[:-1] + ',"Bad":NaN,"Inf":[Infinity,-Infinity]}'
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Headless CLI: machine-readable output stays machine-readable"""
+
+import json
+import logging
+
+import pytest
+
+import cli
+import log_utils
+from save_core import encode_json_to_sav
+
+
+@pytest.fixture(autouse=True)
+def restore_log_level():
+    level = log_utils._logger.level
+    yield
+    log_utils._logger.setLevel(level)
+
+
+def test_sql_json_output_holds_only_result_rows(tmp_path, capsys, save_text):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    log_utils.set_log_level(logging.DEBUG)
+
+    assert cli.main(['--json', 'sql', str(path), '-q',
+                     'SELECT key, count FROM ingredients ORDER BY key LIMIT 3']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['key'] for line in lines] == ['1010001', '1010002', '1010003']
+
+
+def test_sql_table_output_starts_with_the_header(tmp_path, capsys, save_text):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+
+    assert cli.main(['sql', str(path), '-q', 'SELECT count(*) AS n FROM ingredients']) == 0
+    assert capsys.readouterr().out.splitlines() == ['n', '30']
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Exports re-import to the byte-identical .sav"""
+
+import json
+
+import pytest
+
+import export_io
+from export_io import COMPRESSIONS, export_path, import_json_to_sav, stream_export, validate_export
+from save_core import encode_json_chunk, encode_json_to_sav
+
+
+@pytest.mark.parametrize('compression', sorted(COMPRESSIONS))
+def test_unedited_export_reimports_identically(tmp_path, backend, save_text, compression):
+    data = backend.loads(save_text)
+    out = export_path(str(tmp_path / 'slot.sav'), compression)
+    stream_export(data, out, compression)
+    validate_export(out)
+
+    sav = str(tmp_path / 'back.sav')
+    import_json_to_sav(out, sav, chunk_size=512)
+    with open(sav, 'rb') as f:
+        assert f.read() == encode_json_to_sav(save_text)
+
+
+def test_export_keeps_number_tokens(tmp_path, backend, save_text):
+    out = str(tmp_path / 'slot_exported.json')
+    stream_export(backend.loads(save_text), out)
+    with open(out, encoding='utf-8') as f:
+        text = f.read()
+    for token in ('1e-05', '1e+16', '5e-324', '-0.0', str(2 ** 70), 'NaN', '-Infinity'):
+        assert token in text
+
+
+def test_import_that_does_not_decode_back_is_not_written(tmp_path, save_text, monkeypatch):
+    out = str(tmp_path / 'slot.json')
+    stream_export(json.loads(save_text), out)
+    sav = tmp_path / 'slot.sav'
+    sav.write_bytes(b'previous')
+
+    def corrupt(text, key_idx):
+        encrypted, key_idx = encode_json_chunk(text, key_idx)
+        return encrypted[:-1] + bytes([encrypted[-1] ^ 1]), key_idx
+
+    monkeypatch.setattr(export_io, 'encode_json_chunk', corrupt)
+    with pytest.raises(ValueError):
+        import_json_to_sav(out, str(sav), chunk_size=512)
+    assert sav.read_bytes() == b'previous'
+    assert not (tmp_path / 'slot.sav.tmp').exists()
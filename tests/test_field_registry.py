@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""FieldRegistry: values are clamped to their limits before they reach the save"""
+
+import pytest
+
+from field_registry import Field, FieldRegistry
+from ingredient_table import IngredientTable
+from save_core import (
+    FIELDS, SAVE_MAX_CURRENCY, SAVE_MAX_FLAME, SAVE_MAX_FOLLOWER, DaveSaveEditor, encode_json_to_sav,
+)
+from save_diff import copy_tree
+
+
+def test_apply_clamps_and_creates_missing_parents():
+    registry = FieldRegistry([
+        Field('gold', 'PlayerInfo.m_Gold', max_value=100),
+        Field('bei', 'PlayerInfo.m_Bei', max_value=100),
+        Field('depth', 'Dive.Stats.m_Depth', max_value=None, min_value=-50),
+    ])
+    data = {'PlayerInfo': {'m_Gold': 1}}
+    applied = registry.apply(data, {'gold': 1000, 'PlayerInfo.m_Bei': -5, 'depth': -80, 'Other.m_Free': -7})
+    assert applied == {'gold': 100, 'PlayerInfo.m_Bei': 0, 'depth': -50, 'Other.m_Free': -7}
+    assert data == {'PlayerInfo': {'m_Gold': 100, 'm_Bei': 0},
+                    'Dive': {'Stats': {'m_Depth': -50}}, 'Other': {'m_Free': -7}}
+    assert registry.resolve('depth').get({}) == 0
+
+
+def test_unknown_name_changes_nothing():
+    data = {'PlayerInfo': {'m_Gold': 1}}
+    with pytest.raises(KeyError):
+        FIELDS.apply(data, {'gold': 5, 'diamonds': 1})
+    assert data == {'PlayerInfo': {'m_Gold': 1}}
+
+
+def test_registering_a_path_twice_is_rejected():
+    registry = FieldRegistry([Field('gold', 'PlayerInfo.m_Gold')])
+    with pytest.raises(ValueError):
+        registry.register(Field('money', 'PlayerInfo.m_Gold'))
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_clamped_values_survive_encode_and_decode(tmp_path, backend, save_text, columnar):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    editor = DaveSaveEditor(columnar=columnar)
+    assert editor.load_save_file(str(path))
+    applied = editor.apply_fields({
+        'gold': 10 ** 12,
+        'bei': -1,
+        'flame': SAVE_MAX_FLAME + 1,
+        'SNSInfo.m_Follow_Count': 10 ** 6,
+        'PlayerInfo.m_Level': 12,
+    })
+    assert applied == {'gold': SAVE_MAX_CURRENCY, 'bei': 0, 'flame': SAVE_MAX_FLAME,
+                       'SNSInfo.m_Follow_Count': SAVE_MAX_FOLLOWER, 'PlayerInfo.m_Level': 12}
+    assert editor.apply_fields({'gold': 1, 'nope': 2}) is None
+    assert editor.save_save_file(backup=False)
+
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    assert reloaded.get_current_values() == {
+        'gold': SAVE_MAX_CURRENCY, 'bei': 0, 'flame': SAVE_MAX_FLAME, 'follower': SAVE_MAX_FOLLOWER}
+    assert reloaded.get_field('PlayerInfo.m_Level') == 12
+    assert reloaded.document()['Tuning'] == editor.document()['Tuning']
+
+
+@pytest.mark.parametrize('path', ['X.0.y', 'N.a', 'PlayerInfo.m_Name.x', 'Ingredients.1010002'])
+def test_values_on_the_path_are_never_replaced(path):
+    data = {'PlayerInfo': {'m_Gold': 1, 'm_Name': 'Dave'}, 'X': [{'y': 1}], 'N': None,
+            'Ingredients': {'1010002': {'count': 1}}}
+    before = copy_tree(data)
+    with pytest.raises(ValueError):
+        FIELDS.apply(data, {'gold': 5, path: 2})
+    assert data == before
+
+
+def test_paths_into_columnar_ingredients_edit_the_table(tmp_path, save_text):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    editor = DaveSaveEditor(columnar=True)
+    assert editor.load_save_file(str(path))
+    assert editor.set_field('Ingredients.1010004.count', 7)
+    assert editor.set_field('Ingredients.9.count', 3)
+    assert not editor.set_field('Ingredients.1010005.lastGainTime.x', 1)
+    table = editor.save_data['Ingredients']
+    assert isinstance(table, IngredientTable) and len(table) == 31
+    assert editor.get_field('Ingredients.1010004.count') == 7
+    assert editor.save_save_file(backup=False)
+
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    ingredients = reloaded.document()['Ingredients']
+    assert len(ingredients) == 31
+    assert ingredients['1010004']['count'] == 7
+    assert list(ingredients.items())[-1] == ('9', {'count': 3})
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""IngredientTable: the columnar form serializes exactly like the dict it replaces"""
+
+from ingredient_table import IngredientTable
+from save_core import DaveSaveEditor, encode_json_to_sav
+from save_diff import copy_tree
+
+
+def _irregular():
+    """Rows with different field orders, missing and extra fields, and mixed value types"""
+    return {
+        '1010001': {'ingredientsID': 1010001, 'count': 5, 'isNew': False, 'lastGainTime': '01/02/2023 12:00:00'},
+        '1010002': {'count': 7, 'ingredientsID': 1010002, 'isNew': True},
+        '1010003': {'ingredientsID': 1010003, 'count': 2 ** 70, 'extra': {'a': [1, None]}},
+        'misc': {'note': '潜水员', 'count': 1.5, 'flag': None},
+        '1010004': {},
+    }
+
+
+def test_from_dict_to_dict_is_exact(dump):
+    ingredients = _irregular()
+    table = IngredientTable.from_dict(ingredients)
+    assert list(table) == list(ingredients)
+    assert dump(table.to_dict()) == dump(ingredients)
+
+
+def test_edits_match_the_same_edits_on_a_dict(dump):
+    expected = _irregular()
+    table = IngredientTable.from_dict(copy_tree(expected))
+
+    for target in (table, expected):
+        target['1010001']['count'] = 9.25          # int column widens to hold a float
+        target['1010002']['level'] = 3             # new field goes at the end of that row
+        del target['1010001']['isNew']
+        del target['misc']
+        target['misc'] = {'note': 'back', 'count': 0}   # re-added key moves to the end
+        target['1010003'] = {'count': 1, 'ingredientsID': 1010003}  # replaced record keeps its place
+        target['2000001'] = {'ingredientsID': 2000001, 'count': 4, 'isNew': 'yes'}
+
+    assert table.fill('count', 99, where='ingredientsID') == 4
+    for record in expected.values():
+        if 'ingredientsID' in record:
+            record['count'] = 99
+
+    assert dump(table.to_dict()) == dump(expected)
+    assert table.find('ingredientsID', 2000001) == '2000001'
+    assert table.find('count', 99.0) is None
+
+
+def test_columnar_edits_survive_encode_and_decode(tmp_path, backend, save_text):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    written = []
+    for columnar in (False, True):
+        editor = DaveSaveEditor(columnar=columnar)
+        assert editor.load_save_file(str(path))
+        assert editor.set_all_ingredients(42) == 30
+        assert editor.set_ingredient_count(editor.find_ingredient_key(1010003), 12345)
+        editor.save_data['Ingredients']['2000001'] = {'ingredientsID': 2000001, 'count': 8, 'isNew': True}
+        del editor.save_data['Ingredients']['1010005']
+        out = tmp_path / f'columnar_{columnar}.sav'
+        editor.file_path = str(out)
+        assert editor.save_save_file(backup=False)
+        written.append(out.read_bytes())
+
+    assert written[0] == written[1]
+    reloaded = DaveSaveEditor(columnar=True)
+    assert reloaded.load_save_file(str(tmp_path / 'columnar_True.sav'))
+    ingredients = reloaded.save_data['Ingredients']
+    assert isinstance(ingredients, IngredientTable)
+    assert '1010005' not in ingredients
+    assert list(ingredients)[-1] == '2000001'
+    assert ingredients['1010003']['count'] == 9999
+    assert ingredients['1010004']['count'] == 42
+    assert ingredients['2000001']['count'] == 8
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Fast backends must serialize exactly like the stdlib, falling back where they would not"""
+
+import json
+
+import pytest
+
+import json_backend
+from json_backend import PROBE_DOCUMENT, StdlibBackend, check_backend, select_backend
+
+
+def test_installed_backends_pass_the_probe(backend):
+    assert check_backend(backend) == []
+
+
+@pytest.mark.parametrize('value', [1e-05, 0.00001234, 1e+16, 1.5e300, 5e-324, -0.0, 2 ** 64, -2 ** 70])
+def test_risky_numbers_match_stdlib(backend, value, dump):
+    document = {'v': value, 'list': [value, 'x']}
+    assert backend.dumps(document) == dump(document)
+    assert json.loads(backend.dumps_pretty(document)) == json.loads(dump(document))
+    assert dump(json.loads(backend.dumps_pretty(document))) == dump(document)
+
+
+def test_nonfinite_values_survive_after_parsing_them(backend):
+    text = '{"a":NaN,"b":[Infinity,-Infinity],"c":null}'
+    data = backend.loads(text)
+    assert backend.dumps(data) == text
+    assert 'NaN' in backend.dumps_pretty(data)
+    assert 'null' in backend.dumps_pretty(data)
+
+
+def test_loads_falls_back_for_what_fast_parsers_reject(backend, dump):
+    text = '{"big":%d,"s":"\\ud800"}' % (2 ** 70)
+    assert dump(backend.loads(text)) == dump(json.loads(text))
+
+
+@pytest.mark.parametrize('value', [2 ** 64 - 1, 2 ** 64, -2 ** 63 - 1, 123456789012345678901234567890])
+def test_wide_integers_stay_integers(backend, value):
+    # Nothing else in the document forces a stdlib parse
+    text = '{"id":%d,"n":[1,%d],"s":"x"}' % (value, value)
+    assert backend.dumps(backend.loads(text)) == text
+    assert backend.dumps(backend.loads(text.encode('utf-8'))) == text
+
+
+def test_save_with_wide_integer_is_written_back_identically(tmp_path, backend, dump):
+    from benchmark import generate_save_data
+    from save_core import DaveSaveEditor, encode_json_to_sav
+
+    data = generate_save_data(ingredients=20, seed=11)
+    data['PlayerInfo']['m_Uid'] = 123456789012345678901234567890
+    original = encode_json_to_sav(dump(data))
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(original)
+
+    editor = DaveSaveEditor()
+    assert editor.load_save_file(str(path))
+    assert editor.get_field('PlayerInfo.m_Uid') == 123456789012345678901234567890
+    assert editor.save_save_file(backup=False)
+    assert path.read_bytes() == original
+
+
+def test_unknown_or_missing_backend_selects_stdlib():
+    assert select_backend('no-such-backend').name == 'stdlib'
+
+
+def test_nonconforming_backend_is_rejected(monkeypatch):
+    class Broken(StdlibBackend):
+        name = 'broken'
+
+        def dumps(self, obj):
+            return json.dumps(obj)  # default separators differ
+
+    monkeypatch.setitem(json_backend.BACKENDS, 'broken', Broken)
+    assert check_backend(Broken())
+    assert select_backend('broken').name == 'stdlib'
+
+
+def test_probe_document_round_trips(backend, dump):
+    assert dump(backend.loads(backend.dumps(PROBE_DOCUMENT))) == dump(PROBE_DOCUMENT)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Codec round trips: decode then encode gives back the original .sav bytes"""
+
+import pytest
+
+import save_core
+from benchmark import generate_plaintext, generate_sav
+from save_core import (
+    BYPASS_PREFIX, BYPASS_REF_PREFIX, BypassTable, DaveSaveEditor, _decode_sav_bytes, clean_json_string,
+    decode_sav_to_json, encode_json_to_sav, expected_plaintext,
+)
+
+
+@pytest.mark.parametrize('triggers', [0, 3])
+def test_decode_encode_is_identity(triggers):
+    sav = generate_sav(ingredients=200, triggers=triggers, seed=3)
+    assert encode_json_to_sav(decode_sav_to_json(sav)) == sav
+
+
+@pytest.mark.parametrize('triggers', [0, 3])
+def test_bypass_table_round_trip(triggers):
+    sav = generate_sav(ingredients=200, triggers=triggers, seed=4)
+    table = BypassTable()
+    text = decode_sav_to_json(sav, table)
+    assert len(table) == triggers
+    assert encode_json_to_sav(text, table) == sav
+
+
+def test_every_bypass_reference_is_spliced():
+    sav = generate_sav(ingredients=200, triggers=12, seed=8)
+    table = BypassTable()
+    text = decode_sav_to_json(sav, table)
+    assert len(table) == 12
+
+    # Reference 1 dropped while 10 and 11 remain: no prefix match of ':1'
+    start = text.index(',"Farm1":')
+    dropped = text[:start] + text[text.index('"Slot":1}', start) + len('"Slot":1}'):]
+    assert table.token(1) + '"' not in dropped
+    out = encode_json_to_sav(dropped, table)
+    assert out == encode_json_to_sav(table.inline(dropped))
+    assert _decode_sav_bytes(out) == table.inline(dropped).encode('utf-8')
+
+    # A reference copied elsewhere is written as raw bytes both times
+    copied = text.replace(table.token(5), table.token(0), 1)
+    out = encode_json_to_sav(copied, table)
+    assert out == encode_json_to_sav(table.inline(copied))
+    assert out.count(table.spans[0][0]) == 2
+    assert encode_json_to_sav(BYPASS_REF_PREFIX)[:8] not in out
+
+
+def test_plaintext_without_triggers_decodes_unchanged():
+    plain = generate_plaintext(ingredients=50, seed=5)
+    assert decode_sav_to_json(generate_sav(ingredients=50, seed=5)) == plain.decode('utf-8')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+def test_chunked_decode_matches_one_pass(chunk_size):
+    sav = generate_sav(ingredients=40, triggers=4, seed=6)
+    assert _decode_sav_bytes(sav, chunk_size=chunk_size) == _decode_sav_bytes(sav)
+
+
+def test_clean_json_string_drops_bom_control_chars_and_unclosed_tail():
+    assert clean_json_string('\ufeff{"a":"x\x01y\tz"}') == '{"a":"xy\tz"}'
+    assert clean_json_string('{"a":[1,2]}{"b":[3') == '{"a":[1,2]}'
+    assert clean_json_string('{"a":[1,2]}') == '{"a":[1,2]}'
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_unedited_save_is_written_back_identically(tmp_path, backend, save_text, columnar):
+    path = tmp_path / 'slot.sav'
+    original = encode_json_to_sav(save_text)
+    path.write_bytes(original)
+
+    editor = DaveSaveEditor(columnar=columnar)
+    assert editor.load_save_file(str(path))
+    assert editor.save_save_file(backup=False)
+    assert path.read_bytes() == original
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_field_edit_survives_encode_and_decode(tmp_path, save_text, columnar):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    editor = DaveSaveEditor(columnar=columnar)
+    editor.load_save_file(str(path))
+    assert editor.set_field('gold', 123456)
+    assert editor.save_save_file(backup=False)
+
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    assert reloaded.get_field('gold') == 123456
+    assert reloaded.document()['Tuning'] == editor.document()['Tuning']
+
+
+def test_save_is_refused_when_a_reference_is_not_spliced(tmp_path, save_text, monkeypatch):
+    path = tmp_path / 'slot.sav'
+    original = encode_json_to_sav(save_text)
+    path.write_bytes(original)
+    editor = DaveSaveEditor()
+    assert editor.load_save_file(str(path))
+    editor.bypass_table = BypassTable()
+    editor.save_data['PlayerInfo']['m_Name'] = editor.bypass_table.add(b'\x91\x92', 3)
+
+    # An encoder that misses the reference writes it as literal text, which also decodes cleanly
+    monkeypatch.setattr(save_core, '_find_bypass_spans', lambda json_string, bypass_table: [])
+    assert not editor.save_save_file(backup=False)
+    assert 'does not decode back' in editor.last_error
+    assert path.read_bytes() == original
+    assert not (tmp_path / 'slot.sav.tmp').exists()
+
+
+def test_expected_plaintext_writes_spans_like_the_decoder():
+    table = BypassTable()
+    token = table.add(b'\xab\xcd', 7)
+    assert expected_plaintext(f'"{token}"', table) == f'"{BYPASS_PREFIX}abcd:7"'
+    assert expected_plaintext(f'"{BYPASS_PREFIX}ABCD:07"') == f'"{BYPASS_PREFIX}abcd:7"'
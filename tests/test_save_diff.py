@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""JSON Patch and three-way merge: diffs apply back cleanly, failed patches leave the save untouched"""
+
+import pytest
+
+from save_core import DaveSaveEditor, encode_json_to_sav
+from save_diff import PatchError, apply_patch, build_hash_tree, copy_tree, diff, merge3, resolution_patch
+
+
+def _load(tmp_path, save_text, columnar=False):
+    path = tmp_path / 'slot.sav'
+    path.write_bytes(encode_json_to_sav(save_text))
+    editor = DaveSaveEditor(columnar=columnar)
+    assert editor.load_save_file(str(path))
+    return editor, path
+
+
+def test_diff_applies_back_to_the_new_document():
+    old = {'a': 1, 'b': {'c': [1, 2, 3], 'd': 'x'}, 'e/f': {'~': 0}}
+    new = {'a': 2, 'b': {'c': [1, 3], 'g': None}, 'e/f': {'~': 1}, 'h': [{}]}
+    doc = copy_tree(old)
+    apply_patch(doc, diff(old, new))
+    assert doc == new
+
+
+def test_removed_key_comes_back_in_place_on_rollback():
+    doc = {'a': 1, 'b': 2, 'c': 3}
+    with pytest.raises(PatchError):
+        apply_patch(doc, [{'op': 'remove', 'path': '/b'}, {'op': 'remove', 'path': '/missing'}])
+    assert list(doc.items()) == [('a', 1), ('b', 2), ('c', 3)]
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_patch_edits_survive_encode_and_decode(tmp_path, backend, save_text, columnar, dump):
+    editor, path = _load(tmp_path, save_text, columnar)
+    key = next(iter(editor.document()['Ingredients']))
+    patch = [
+        {'op': 'replace', 'path': '/PlayerInfo/m_Gold', 'value': 4242},
+        {'op': 'replace', 'path': f'/Ingredients/{key}/count', 'value': 77},
+        {'op': 'remove', 'path': f'/Ingredients/{key}/isNew'},
+        {'op': 'add', 'path': '/PlayerInfo/m_Note', 'value': '潜水员'},
+        {'op': 'test', 'path': '/PlayerInfo/m_Name', 'value': 'Dave'},
+    ]
+    expected = copy_tree(editor.document())
+    apply_patch(expected, patch)
+
+    assert editor.apply_patch(patch) == len(patch)
+    assert editor.save_save_file(backup=False)
+
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    assert dump(reloaded.document()) == dump(expected)
+    assert 'isNew' not in reloaded.document()['Ingredients'][key]
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_failed_patch_changes_nothing(tmp_path, save_text, columnar, dump):
+    editor, path = _load(tmp_path, save_text, columnar)
+    original = path.read_bytes()
+    before = dump(editor.document())
+    key = next(iter(editor.document()['Ingredients']))
+    patch = [
+        {'op': 'replace', 'path': '/PlayerInfo/m_Gold', 'value': 1},
+        {'op': 'remove', 'path': f'/Ingredients/{key}'},
+        {'op': 'add', 'path': '/Tuning/added', 'value': [1, 2]},
+        {'op': 'test', 'path': '/PlayerInfo/m_Name', 'value': 'Not Dave'},
+    ]
+
+    assert editor.apply_patch(patch) is None
+    assert 'Test failed' in editor.last_error
+    assert dump(editor.document()) == before
+    assert editor.save_save_file(backup=False)
+    assert path.read_bytes() == original
+
+
+def test_merge3_combines_disjoint_edits(tmp_path, save_text, dump):
+    editor, path = _load(tmp_path, save_text)
+    base = copy_tree(editor.document())
+    keys = list(base['Ingredients'])
+    local = copy_tree(base)
+    local['PlayerInfo']['m_Gold'] = 100
+    del local['Ingredients'][keys[0]]
+    remote = copy_tree(base)
+    remote['PlayerInfo']['m_Bei'] = 200
+    remote['Ingredients'][keys[1]]['count'] = 5
+    remote['Ingredients']['2000001'] = {'ingredientsID': 2000001, 'count': 1}
+
+    ops, conflicts = merge3(build_hash_tree(base), local, remote)
+    assert conflicts == []
+    apply_patch(local, ops)
+    assert local['PlayerInfo']['m_Gold'] == 100
+    assert local['PlayerInfo']['m_Bei'] == 200
+    assert keys[0] not in local['Ingredients']
+    assert local['Ingredients'][keys[1]]['count'] == 5
+
+    assert editor.apply_patch(diff(editor.document(), local)) is not None
+    assert editor.save_save_file(backup=False)
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    assert dump(reloaded.document()) == dump(local)
+
+
+def test_merge3_reports_conflicts_and_resolves_either_way():
+    base = {'p': {'gold': 1, 'bei': 1}, 'items': {'a': {'count': 1}, 'b': {'count': 1}}}
+    local = copy_tree(base)
+    local['p']['gold'] = 2
+    local['items']['a']['count'] = 2
+    del local['items']['b']
+    remote = copy_tree(base)
+    remote['p']['gold'] = 3
+    remote['items']['b']['count'] = 3
+    del remote['items']['a']
+
+    ops, conflicts = merge3(build_hash_tree(base), local, remote)
+    assert ops == []
+    by_path = {entry['path']: entry for entry in conflicts}
+    assert by_path['/p/gold'] == {'path': '/p/gold', 'local': 2, 'remote': 3}
+    assert 'local' not in by_path['/items/b'] and 'remote' not in by_path['/items/a']
+
+    theirs = copy_tree(local)
+    apply_patch(theirs, resolution_patch(conflicts, take='remote'))
+    assert theirs == remote
+    # Keeping the local side means patching the file's version
+    ours = copy_tree(remote)
+    apply_patch(ours, resolution_patch(conflicts, take='local'))
+    assert ours == local
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""String interning shares objects without changing what gets written"""
+
+from save_core import DaveSaveEditor, encode_json_to_sav
+from string_pool import StringPool
+
+
+def test_compact_shares_values_and_keys_in_place(dump):
+    # Built at runtime so the parser-like copies are distinct objects
+    stamp = ''.join(['10/03/2022', ' 08:30:52'])
+    data = {'a': {'t': stamp, ''.join(['k', 'ey']): 1},
+            'b': [{'t': ''.join(['10/03/2022', ' 08:30:52']), ''.join(['ke', 'y']): 2}]}
+    before = dump(data)
+
+    stats = StringPool().run(data)
+    assert dump(data) == before
+    assert data['a']['t'] is data['b'][0]['t']
+    assert next(iter(data['b'][0].keys() - {'t'})) is next(iter(data['a'].keys() - {'t'}))
+    assert stats['values_shared'] == 1 and stats['keys_shared'] == 1
+
+
+def test_compacting_in_steps_keeps_edits_made_between_steps():
+    data = {str(i): {'name': ''.join(['x', str(i % 3)]), 'list': [str(i % 2)]} for i in range(50)}
+    steps = StringPool().compact(data, step=5)
+    next(steps)
+    data['49'] = {'name': 'edited'}
+    data['0']['list'].append('new')
+    for _ in steps:
+        pass
+    assert data['49'] == {'name': 'edited'}
+    assert data['0']['list'][-1] == 'new'
+
+
+def test_interned_save_is_written_back_identically(tmp_path, backend, save_text, dump):
+    path = tmp_path / 'slot.sav'
+    original = encode_json_to_sav(save_text)
+    path.write_bytes(original)
+    editor = DaveSaveEditor()
+    assert editor.load_save_file(str(path))
+    assert editor.compact_strings()['pooled'] > 0
+    assert editor.save_save_file(backup=False)
+    assert path.read_bytes() == original
+
+    assert editor.set_field('gold', 5)
+    editor.save_data['Ingredients']['1010001']['lastGainTime'] = '12/31/2023 23:59:59'
+    assert editor.save_save_file(backup=False)
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(str(path))
+    assert dump(reloaded.document()) == dump(editor.document())
+    assert reloaded.save_data['Ingredients']['1010002']['lastGainGameTime'] == '10/03/2022 08:30:52'
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""SaveWorkspace: unsaved edits of evicted saves come back from the spill file"""
+
+import pytest
+
+from save_core import DaveSaveEditor, encode_json_to_sav
+from workspace import SaveWorkspace
+
+
+def _write_saves(tmp_path, save_text, count=2):
+    original = encode_json_to_sav(save_text)
+    paths = []
+    for index in range(count):
+        path = tmp_path / f'slot{index}.sav'
+        path.write_bytes(original)
+        paths.append(str(path))
+    return paths, original
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_spilled_edits_are_restored_and_saved(tmp_path, backend, save_text, columnar, dump):
+    (first, second), original = _write_saves(tmp_path, save_text)
+    # No budget: every save but the active one is evicted
+    workspace = SaveWorkspace(memory_budget_mb=0, spill_dir=str(tmp_path / 'spill'), columnar=columnar)
+    editor = workspace.open(first)
+    assert editor.set_field('gold', 31337)
+    assert editor.set_ingredient_count('1010002', 6)
+    expected = dump(editor.document())
+
+    workspace.open(second)
+    assert not workspace.is_resident(first)
+    assert workspace.is_dirty(first)
+    assert (tmp_path / 'slot0.sav').read_bytes() == original
+
+    restored = workspace.open(first)
+    assert dump(restored.document()) == expected
+    assert workspace.is_dirty(first)
+    assert workspace.save(first, backup=False)
+    assert not workspace.is_dirty(first)
+    assert not list((tmp_path / 'spill').iterdir())
+
+    reloaded = DaveSaveEditor()
+    assert reloaded.load_save_file(first)
+    assert dump(reloaded.document()) == expected
+    assert reloaded.get_field('gold') == 31337
+
+
+def test_clean_save_is_reloaded_from_its_file(tmp_path, save_text):
+    (first, second), original = _write_saves(tmp_path, save_text)
+    workspace = SaveWorkspace(memory_budget_mb=0, spill_dir=str(tmp_path / 'spill'))
+    workspace.open(first)
+    workspace.open(second)
+    assert not workspace.is_resident(first) and not workspace.is_dirty(first)
+    assert not (tmp_path / 'spill').exists()
+
+    editor = workspace.open(first)
+    assert editor.save_save_file(backup=False)
+    assert (tmp_path / 'slot0.sav').read_bytes() == original
+
+
+def test_discarding_a_spilled_save_leaves_the_file_alone(tmp_path, save_text):
+    (first, second), original = _write_saves(tmp_path, save_text)
+    workspace = SaveWorkspace(memory_budget_mb=0, spill_dir=str(tmp_path / 'spill'))
+    workspace.open(first).set_field('bei', 1)
+    workspace.open(second)
+    assert not workspace.close(first)
+    assert workspace.close(first, discard=True)
+    assert first not in workspace.paths()
+    assert not list((tmp_path / 'spill').iterdir())
+    assert (tmp_path / 'slot0.sav').read_bytes() == original
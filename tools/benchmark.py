@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite (no Kivy required)
+
+Generates synthetic .sav files and times the codec, JSON cleaning, item search
+and a full load/save round trip. Results are reported as throughput and
+percentiles and can be compared against a stored baseline.
+
+    python tools/benchmark.py
+    python tools/benchmark.py --ingredients 20000 --size-kb 4096 --triggers 8
+    python tools/benchmark.py --save-baseline
+    python tools/benchmark.py --compare
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from log_utils import set_log_level
+from save_core import (
+    XOR_KEY, TROUBLESOME_TRIGGERS, END_MARKER,
+    xor_bytes, decode_sav_to_json, encode_json_to_sav, clean_json_string,
+    BypassTable, ItemDatabase, DaveSaveEditor,
+)
+from ingredient_table import IngredientTable
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+REGRESSION_TOLERANCE = 0.25
+
+CJK_CHARS = '鱼虾蟹贝藻海蓝红黄白黑大小金银铜龙虎鲨鲸鳗鲑鲷鲈鲭鳕鲽鲇鲶鲤鲫章乌墨角菜饭汤面'
+
+
+# ============ Synthetic data ============
+
+def generate_save_data(ingredients=2000, size_kb=0, seed=1):
+    """Build a save-like document with the given number of ingredients"""
+    rng = random.Random(seed)
+    data = {
+        "PlayerInfo": {
+            "m_Gold": rng.randint(0, 10 ** 6),
+            "m_Bei": rng.randint(0, 10 ** 5),
+            "m_ChefFlame": rng.randint(0, 10 ** 4),
+            "m_Name": "Dave",
+        },
+        "SNSInfo": {"m_Follow_Count": rng.randint(0, 10 ** 4)},
+        "Ingredients": {},
+    }
+    for i in range(ingredients):
+        item_id = 1010001 + i
+        data["Ingredients"][str(item_id)] = {
+            "ingredientsID": item_id,
+            "parentID": item_id,
+            "count": rng.randint(0, 999),
+            "level": rng.randint(1, 5),
+            "branchCount": rng.randint(0, 3),
+            "isNew": rng.random() < 0.1,
+            "placeTagMask": 1,
+            "lastGainTime": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2023 12:00:00",
+            "lastGainGameTime": "10/03/2022 08:30:52",
+        }
+
+    # Pad with filler records until the serialized document reaches size_kb
+    filler = []
+    data["Filler"] = filler
+    target = size_kb * 1024
+    size = len(json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    while size < target:
+        record = {"id": len(filler), "tag": rng.choice(CJK_CHARS) * 4, "v": rng.random()}
+        filler.append(record)
+        size += len(json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')) + 1
+    return data
+
+
+def _broken_field(rng, length=48):
+    """Plaintext bytes that are not valid UTF-8 and never contain END_MARKER"""
+    return bytes(rng.randint(0x80, 0xBF) for _ in range(length))
+
+
+def generate_plaintext(ingredients=2000, size_kb=0, triggers=0, seed=1):
+    """Serialized save bytes, with `triggers` opaque FarmAnimal name spans spliced in"""
+    rng = random.Random(seed)
+    body = json.dumps(generate_save_data(ingredients, size_kb, seed),
+                      separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if not triggers:
+        return body
+
+    # Codec-level fixture: the span hides the closing brace, so the result is not parseable JSON
+    parts = [body[:-1]]
+    for i in range(triggers):
+        trigger = TROUBLESOME_TRIGGERS[i % len(TROUBLESOME_TRIGGERS)]
+        parts.append(b',"Farm%d":{' % i + trigger + _broken_field(rng) + END_MARKER + b'"Slot":%d}' % i)
+    parts.append(b'}')
+    return b''.join(parts)
+
+
+def generate_sav(ingredients=2000, size_kb=0, triggers=0, seed=1):
+    """Encrypted .sav bytes"""
+    return xor_bytes(generate_plaintext(ingredients, size_kb, triggers, seed), XOR_KEY)
+
+
+def generate_catalog(items=5000, seed=1):
+    """Synthetic item catalog {id: name}"""
+    rng = random.Random(seed)
+    return {1010001 + i: ''.join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 6)))
+            for i in range(items)}
+
+
+# ============ Timing ============
+
+def percentile(sorted_values, pct):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def bench(name, func, nbytes=0, repeat=7, warmup=1):
+    """Run func repeatedly and return a result row"""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    p50 = percentile(times, 50)
+    return {
+        'name': name,
+        'runs': repeat,
+        'bytes': nbytes,
+        'p50_ms': round(p50 * 1000, 3),
+        'p90_ms': round(percentile(times, 90) * 1000, 3),
+        'p99_ms': round(percentile(times, 99) * 1000, 3),
+        'min_ms': round(times[0] * 1000, 3),
+        'stdev_ms': round(statistics.pstdev(times) * 1000, 3),
+        'mb_per_s': round(nbytes / p50 / 1e6, 2) if nbytes and p50 > 0 else None,
+    }
+
+
+# ============ Suite ============
+
+def run_suite(ingredients=2000, size_kb=0, triggers=2, catalog_items=5000, repeat=7):
+    """Run all benchmarks and return result rows"""
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='davesave_bench_')
+    try:
+        sav = generate_sav(ingredients, size_kb, triggers)
+        bypass_table = BypassTable()
+        decoded = decode_sav_to_json(sav, bypass_table)
+        if encode_json_to_sav(decoded, bypass_table) != sav:
+            raise RuntimeError("Codec round trip is not byte-identical")
+        if encode_json_to_sav(decode_sav_to_json(sav)) != sav:
+            raise RuntimeError("Inline BYPASSED_HEX round trip is not byte-identical")
+
+        # JSON-level stages need a parseable document, i.e. no opaque spans
+        clean_sav = generate_sav(ingredients, size_kb, 0)
+        clean_json = decode_sav_to_json(clean_sav)
+
+        results.append(bench('xor_bytes', lambda: xor_bytes(sav, XOR_KEY), len(sav), repeat))
+        results.append(bench('decode_sav_to_json', lambda: decode_sav_to_json(sav, BypassTable()),
+                             len(sav), repeat))
+        results.append(bench('encode_json_to_sav', lambda: encode_json_to_sav(decoded, bypass_table),
+                             len(sav), repeat))
+        results.append(bench('clean_json_string', lambda: clean_json_string(clean_json),
+                             len(clean_json.encode('utf-8')), repeat))
+
+        ingredients = generate_save_data(ingredients, size_kb)["Ingredients"]
+        table = IngredientTable.from_dict(ingredients)
+
+        def set_all_dict():
+            for item in ingredients.values():
+                if "ingredientsID" in item:
+                    item["count"] = 99
+
+        results.append(bench('set_all_ingredients[dict]', set_all_dict, 0, repeat))
+        results.append(bench('set_all_ingredients[columnar]',
+                             lambda: table.fill("count", 99, where="ingredientsID"), 0, repeat))
+        results.append(bench('IngredientTable.from_dict', lambda: IngredientTable.from_dict(ingredients), 0, repeat))
+        results.append(bench('IngredientTable.to_dict', table.to_dict, 0, repeat))
+
+        catalog_path = os.path.join(work_dir, 'items_id_map.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump({str(k): v for k, v in generate_catalog(catalog_items).items()}, f, ensure_ascii=False)
+        item_db = ItemDatabase(catalog_path)
+        for label, keyword in (('cjk1', CJK_CHARS[0]), ('cjk2', CJK_CHARS[1:3]),
+                               ('id', '1010042'), ('miss', 'zzz')):
+            results.append(bench(f'ItemDatabase.search[{label}]', lambda k=keyword: item_db.search(k),
+                                 0, repeat * 5))
+
+        save_path = os.path.join(work_dir, 'bench.sav')
+        with open(save_path, 'wb') as f:
+            f.write(clean_sav)
+
+        def round_trip():
+            editor = DaveSaveEditor()
+            if not editor.load_save_file(save_path):
+                raise RuntimeError(editor.last_error)
+            if not editor.save_save_file():
+                raise RuntimeError("save failed")
+            shutil.rmtree(os.path.join(work_dir, 'backups'), ignore_errors=True)
+
+        results.append(bench('load_save_round_trip', round_trip, len(clean_sav), repeat))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Return rows that are slower than the baseline by more than tolerance"""
+    regressions = []
+    for row in results:
+        base = baseline.get('results', {}).get(row['name'])
+        if not base:
+            continue
+        ratio = row['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0
+        row['vs_baseline'] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(row)
+    return regressions
+
+
+def print_results(results):
+    print(f"{'benchmark':<32}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'MB/s':>10}{'vs base':>10}")
+    for row in results:
+        mbps = row['mb_per_s'] if row['mb_per_s'] is not None else '-'
+        ratio = row.get('vs_baseline', '-')
+        print(f"{row['name']:<32}{row['p50_ms']:>10}{row['p90_ms']:>10}{row['p99_ms']:>10}{mbps:>10}{ratio:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DaveSaveEd offline benchmarks')
+    parser.add_argument('--ingredients', type=int, default=2000)
+    parser.add_argument('--size-kb', type=int, default=0, help='pad the save to at least this size')
+    parser.add_argument('--triggers', type=int, default=2, help='number of opaque FarmAnimal spans')
+    parser.add_argument('--catalog-items', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true', help='exit 1 on regression against the baseline')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    set_log_level('WARNING')
+    params = {
+        'ingredients': args.ingredients,
+        'size_kb': args.size_kb,
+        'triggers': args.triggers,
+        'catalog_items': args.catalog_items,
+    }
+    results = run_suite(repeat=args.repeat, **params)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') == params:
+            regressions = compare(results, baseline)
+        else:
+            print("Baseline parameters differ, skipping comparison", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'params': params, 'python': sys.version.split()[0],
+                       'results': {row['name']: row for row in results}}, f, indent=2)
+        print(f"Baseline written: {args.baseline}")
+
+    if regressions:
+        for row in regressions:
+            print(f"REGRESSION {row['name']}: {row['vs_baseline']}x baseline", file=sys.stderr)
+        if args.compare:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless UI performance harness (needs Kivy)
+
+Runs MainScreen on Linux without a display: Kivy's mock GL backend under
+SDL's offscreen video driver, and stand-in android.storage / android.permissions
+modules so the Android code paths run against a temporary "sdcard". Synthetic
+saves and a catalog are generated, then a scripted session (open, tab build,
+refresh, filter, sort, scroll, search, edit, switch, save) is replayed. Each
+step records its latency up to the first rendered frame, the frame times
+while it settles and the widget count, and can be compared against a stored
+baseline.
+
+    python tools/ui_harness.py
+    python tools/ui_harness.py --ingredients 5000 --catalog-items 20000
+    python tools/ui_harness.py --save-baseline
+    python tools/ui_harness.py --compare
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TOOLS_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+BASELINE_PATH = os.path.join(TOOLS_DIR, 'ui_baseline.json')
+REGRESSION_TOLERANCE = 0.25
+
+# Frames pumped after each interaction, and for the scroll steps
+SETTLE_FRAMES = 5
+SCROLL_FRAMES = 30
+WINDOW_SIZE = (720, 1280)
+
+
+# ============ Environment ============
+
+def prepare_environment(work_dir):
+    """Headless Kivy settings and a private home; must run before Kivy is imported"""
+    home = os.path.join(work_dir, 'home')
+    os.makedirs(home, exist_ok=True)
+    os.environ['HOME'] = home
+    os.environ['KIVY_HOME'] = os.path.join(home, '.kivy')
+    os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    # offscreen (EGL) rather than dummy: the dummy driver cannot create the GL context
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ['KIVY_NO_ARGS'] = '1'
+    os.environ['KIVY_NO_CONSOLELOG'] = '1'
+    os.environ['KIVY_NO_FILELOG'] = '1'
+    os.environ['DAVESAVEED_WATCH'] = 'poll'
+
+    from kivy.config import Config
+    Config.set('graphics', 'width', str(WINDOW_SIZE[0]))
+    Config.set('graphics', 'height', str(WINDOW_SIZE[1]))
+    # Frames as fast as they render instead of sleeping to 60 fps
+    Config.set('graphics', 'maxfps', '0')
+    Config.set('kivy', 'exit_on_escape', '0')
+
+
+def install_fake_android(storage_root):
+    """Register android, android.storage and android.permissions modules
+
+    Storage calls return storage_root; permission requests are granted and
+    recorded in android.permissions.requested.
+    """
+    android = types.ModuleType('android')
+    storage = types.ModuleType('android.storage')
+    permissions = types.ModuleType('android.permissions')
+
+    storage.primary_external_storage_path = lambda: storage_root
+    storage.secondary_external_storage_path = lambda: None
+    storage.app_storage_path = lambda: os.path.join(storage_root, 'Android', 'data', 'DaveSaveEd')
+
+    class Permission:
+        READ_EXTERNAL_STORAGE = 'android.permission.READ_EXTERNAL_STORAGE'
+        WRITE_EXTERNAL_STORAGE = 'android.permission.WRITE_EXTERNAL_STORAGE'
+        MANAGE_EXTERNAL_STORAGE = 'android.permission.MANAGE_EXTERNAL_STORAGE'
+
+    def request_permissions(requested, callback=None):
+        permissions.requested.extend(requested)
+        if callback is not None:
+            callback(list(requested), [True] * len(requested))
+
+    permissions.Permission = Permission
+    permissions.requested = []
+    permissions.request_permissions = request_permissions
+    permissions.check_permission = lambda permission: True
+
+    android.storage = storage
+    android.permissions = permissions
+    sys.modules.update({
+        'android': android,
+        'android.storage': storage,
+        'android.permissions': permissions,
+    })
+    return android
+
+
+def prepare_storage(storage_root, saves, ingredients, catalog_items):
+    """Write the catalog to Download/ and synthetic saves next to it; returns the save paths"""
+    from benchmark import generate_sav, generate_catalog
+
+    download = os.path.join(storage_root, 'Download')
+    os.makedirs(download, exist_ok=True)
+    with open(os.path.join(download, 'items_id_map.json'), 'w', encoding='utf-8') as f:
+        json.dump({str(k): v for k, v in generate_catalog(catalog_items).items()}, f, ensure_ascii=False)
+
+    paths = []
+    for seed in range(1, saves + 1):
+        path = os.path.join(download, f'GameSave_{seed:02d}_GD.sav')
+        with open(path, 'wb') as f:
+            f.write(generate_sav(ingredients, seed=seed))
+        paths.append(path)
+    return paths
+
+
+# ============ Session ============
+
+class Session:
+    """One MainScreen on the headless window, driven frame by frame"""
+
+    def __init__(self, main):
+        from kivy.base import EventLoop
+
+        self.main = main
+        self.event_loop = EventLoop
+        EventLoop.ensure_window()
+        self.window = EventLoop.window
+        self.screen = None
+        self.steps = []
+
+    def frame(self):
+        """Render one frame; returns its duration in seconds"""
+        start = time.perf_counter()
+        self.event_loop.idle()
+        return time.perf_counter() - start
+
+    def widget_count(self):
+        """Widgets in the tree of every window child (screen and open popups)"""
+        return sum(1 for child in self.window.children for _ in child.walk())
+
+    def popup(self, cls):
+        """Topmost open popup of a class"""
+        for child in self.window.children:
+            if isinstance(child, cls):
+                return child
+        raise RuntimeError(f'No {cls.__name__} is open')
+
+    def step(self, name, action, frames=SETTLE_FRAMES, per_frame=None):
+        """Run action, then render frames; per_frame(i) runs before each frame (scrolling)
+
+        latency: action plus the first frame, i.e. until the result is on screen.
+        """
+        start = time.perf_counter()
+        action()
+        frame_times = []
+        for i in range(frames):
+            if per_frame is not None:
+                per_frame(i)
+            frame_times.append(self.frame())
+            if i == 0:
+                latency = time.perf_counter() - start
+        frame_times.sort()
+        self.steps.append({
+            'name': name,
+            'latency_ms': round(latency * 1000, 3),
+            'frame_p50_ms': round(statistics.median(frame_times) * 1000, 3),
+            'frame_max_ms': round(frame_times[-1] * 1000, 3),
+            'widgets': self.widget_count(),
+        })
+
+    def switch_tab(self, text):
+        """Tap a tab header, then check the panel shows that tab's (non-empty) content"""
+        tabs = self.screen.tabs
+        for header in tabs.tab_list:
+            if header.text == text:
+                header.dispatch('on_release')
+                content = header.content
+                if content is None or not content.children or content.parent is not tabs.content:
+                    raise RuntimeError(f'Tab {text} shows no content')
+                return
+        raise RuntimeError(f'No tab {text}')
+
+    def confirm_number(self, value):
+        """Type value into the open NumberInputPopup and press OK"""
+        from popups import NumberInputPopup
+        popup = self.popup(NumberInputPopup)
+        popup.text_input.text = str(value)
+        popup.on_confirm(None)
+
+    def dismiss_popups(self):
+        from kivy.uix.modalview import ModalView
+        for child in list(self.window.children):
+            if isinstance(child, ModalView):
+                child.dismiss(animation=False)
+
+    def scroll(self, view, start=1.0, end=0.0):
+        """per_frame callback moving view.scroll_y from start to end over SCROLL_FRAMES"""
+        def move(i):
+            view.scroll_y = start + (end - start) * (i + 1) / SCROLL_FRAMES
+        return move
+
+    def run(self, save_paths, search_keyword):
+        """Replay the scripted session; returns the step rows"""
+        main = self.main
+        self.steps = []
+
+        def start():
+            self.screen = main.MainScreen()
+            self.window.add_widget(self.screen)
+
+        self.step('startup', start)
+        screen = self.screen
+        self.step('load_catalog', screen.load_item_database)
+        self.step('open_save', lambda: screen.load_save(save_paths[0]))
+        self.step('build_ingredients_tab', lambda: self.switch_tab('Ingredients'))
+        self.step('refresh_ingredients', screen.reload_ingredients)
+        self.step('filter_ingredients', lambda: setattr(screen.ingredient_filter_input, 'text', '1010'))
+        self.step('clear_filter', lambda: setattr(screen.ingredient_filter_input, 'text', ''))
+        self.step('sort_by_name', lambda: screen.set_ingredient_sort(main.SORT_NAME))
+        self.step('scroll_ingredients', lambda: None, SCROLL_FRAMES,
+                  self.scroll(screen.ingredients_layout.parent))
+
+        row = screen.ingredient_view.view(screen.ingredient_sort, '', limit=1)[0]
+        self.step('open_ingredient_editor', lambda: screen.modify_ingredient(row['key'], row['name']))
+        self.step('edit_ingredient', lambda: self.confirm_number(123))
+
+        self.step('build_currency_tab', lambda: self.switch_tab(next(iter(main.FIELDS.tabs()))))
+        gold = main.FIELDS.resolve('gold')
+        self.step('open_field_editor', lambda: screen.modify_field(gold))
+        self.step('edit_field', lambda: self.confirm_number(4242))
+
+        self.step('build_items_tab', lambda: self.switch_tab('Items'))
+        self.step('open_search', lambda: screen.show_search_popup(None))
+        from popups import SearchPopup
+        search = self.popup(SearchPopup)
+
+        def do_search():
+            search.search_input.text = search_keyword
+            search.do_search(None)
+
+        self.step('search', do_search)
+        self.step('scroll_search_results', lambda: None, SCROLL_FRAMES, self.scroll(search.results_view))
+        self.step('select_search_result', lambda: search.on_select(0))
+        self.step('edit_search_result', lambda: self.confirm_number(7))
+
+        self.step('build_save_tab', lambda: self.switch_tab('Save'))
+        if len(save_paths) > 1:
+            self.step('open_second_save', lambda: screen.load_save(save_paths[1]))
+            self.step('switch_to_resident_save', lambda: screen.load_save(save_paths[0]))
+        self.step('save', lambda: screen.save_file(None))
+        self.dismiss_popups()
+
+        self.window.remove_widget(screen)
+        screen.workspace.close_all(discard=True)
+        screen.workspace.watcher.close()
+        self.screen = None
+        self.frame()
+        return self.steps
+
+
+def run_harness(ingredients=3000, catalog_items=10000, saves=2, repeat=3, search_keyword=None):
+    """Replay the session repeat times on fresh copies of the saves; returns per-step rows
+
+    Latency and frame times are the median over runs, widget counts those of
+    the last run.
+    """
+    work_dir = tempfile.mkdtemp(prefix='davesave_ui_')
+    try:
+        prepare_environment(work_dir)
+        storage_root = os.path.join(work_dir, 'sdcard')
+        install_fake_android(storage_root)
+        save_paths = prepare_storage(storage_root, saves, ingredients, catalog_items)
+        pristine = {path: path + '.orig' for path in save_paths}
+        for path, copy in pristine.items():
+            shutil.copyfile(path, copy)
+
+        from log_utils import set_log_level
+        set_log_level('WARNING')
+        import main
+        import popups
+        # Take the Android branches (storage paths) against the stand-in modules
+        main.platform = popups.platform = 'android'
+
+        from benchmark import CJK_CHARS
+        keyword = search_keyword or CJK_CHARS[0]
+        session = Session(main)
+        runs = []
+        for _ in range(repeat):
+            for path, copy in pristine.items():
+                shutil.copyfile(copy, path)
+            runs.append(session.run(save_paths, keyword))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = []
+    for index, last in enumerate(runs[-1]):
+        rows = [run[index] for run in runs]
+        results.append({
+            'name': last['name'],
+            'runs': len(rows),
+            'latency_ms': round(statistics.median(r['latency_ms'] for r in rows), 3),
+            'frame_p50_ms': round(statistics.median(r['frame_p50_ms'] for r in rows), 3),
+            'frame_max_ms': round(statistics.median(r['frame_max_ms'] for r in rows), 3),
+            'widgets': last['widgets'],
+        })
+    return results
+
+
+# ============ Reporting ============
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Return rows whose latency or widget count exceeds the baseline by more than tolerance"""
+    regressions = []
+    for row in results:
+        base = baseline.get('results', {}).get(row['name'])
+        if not base:
+            continue
+        ratio = row['latency_ms'] / base['latency_ms'] if base['latency_ms'] else 1.0
+        row['vs_baseline'] = round(ratio, 3)
+        row['widgets_baseline'] = base['widgets']
+        if ratio > 1 + tolerance or row['widgets'] > base['widgets'] * (1 + tolerance):
+            regressions.append(row)
+    return regressions
+
+
+def print_results(results):
+    print(f"{'step':<28}{'latency ms':>12}{'frame p50':>11}{'frame max':>11}{'widgets':>9}{'vs base':>9}")
+    for row in results:
+        ratio = row.get('vs_baseline', '-')
+        print(f"{row['name']:<28}{row['latency_ms']:>12}{row['frame_p50_ms']:>11}"
+              f"{row['frame_max_ms']:>11}{row['widgets']:>9}{ratio:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DaveSaveEd headless UI performance harness')
+    parser.add_argument('--ingredients', type=int, default=3000)
+    parser.add_argument('--catalog-items', type=int, default=10000)
+    parser.add_argument('--saves', type=int, default=2, help='synthetic saves (the second is used for switching)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--search', default=None, help='search keyword (default: a common catalog character)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true', help='exit 1 on regression against the baseline')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    params = {
+        'ingredients': args.ingredients,
+        'catalog_items': args.catalog_items,
+        'saves': args.saves,
+        'search': args.search,
+        'window': list(WINDOW_SIZE),
+    }
+    results = run_harness(args.ingredients, args.catalog_items, args.saves, args.repeat, args.search)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') == params:
+            regressions = compare(results, baseline)
+        else:
+            print("Baseline parameters differ, skipping comparison", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'params': params, 'python': sys.version.split()[0],
+                       'results': {row['name']: row for row in results}}, f, indent=2)
+        print(f"Baseline written: {args.baseline}")
+
+    if regressions:
+        for row in regressions:
+            print(f"REGRESSION {row['name']}: {row['vs_baseline']}x latency, "
+                  f"{row['widgets']} widgets (baseline {row['widgets_baseline']})", file=sys.stderr)
+        if args.compare:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
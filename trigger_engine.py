@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Troublesome field triggers
+Data-driven trigger list matched with a single Aho-Corasick automaton pass
+"""
+
+import json
+import os
+import re
+
+from log_utils import get_app_dir, log_message, log_debug
+
+DEFAULT_END_MARKER = b'"],'
+TRIGGERS_FILE_NAME = 'triggers.json'
+# Bytes of each trigger the root-state skip looks for
+SKIP_PREFIX_LEN = 8
+
+# Searched in order: a copy in the app data directory replaces the bundled list
+TRIGGER_FILE_PATHS = [
+    get_app_dir(TRIGGERS_FILE_NAME),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), TRIGGERS_FILE_NAME),
+]
+
+# Used when no trigger file can be read
+BUILTIN_TRIGGERS = [
+    {
+        "name": "FarmAnimal name",
+        "trigger": '"FarmAnimal":[{"FarmAnimalID":11090001,"Name":"',
+        "end_marker": '"],',
+    },
+]
+
+
+class Trigger:
+    """A decrypted byte sequence after which a field with broken encoding starts"""
+
+    __slots__ = ('name', 'pattern', 'end_marker')
+
+    def __init__(self, name, pattern, end_marker=DEFAULT_END_MARKER):
+        self.name = name
+        self.pattern = pattern
+        self.end_marker = end_marker
+
+    def __repr__(self):
+        return f'Trigger({self.name!r})'
+
+
+class TriggerAutomaton:
+    """Aho-Corasick automaton over all trigger patterns
+
+    Cost per input byte does not depend on the number of triggers. From the
+    root state the scan jumps straight to the next occurrence of a trigger
+    prefix, so most of the document is skipped at C speed.
+    """
+
+    def __init__(self, triggers):
+        self.triggers = list(triggers)
+        goto = [{}]
+        out = [-1]
+
+        for index, trigger in enumerate(self.triggers):
+            state = 0
+            for byte in trigger.pattern:
+                nxt = goto[state].get(byte)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(-1)
+                    goto[state][byte] = nxt
+                state = nxt
+            # Earlier triggers win when several end at the same byte
+            if out[state] == -1 or index < out[state]:
+                out[state] = index
+
+        # Breadth-first failure links, folded into a DFA that only stores
+        # transitions to non-root states
+        fail = [0] * len(goto)
+        delta = [dict(transitions) for transitions in goto]
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            fallback = fail[state]
+            if out[fallback] != -1 and (out[state] == -1 or out[fallback] < out[state]):
+                out[state] = out[fallback]
+            for byte, target in delta[fallback].items():
+                delta[state].setdefault(byte, target)
+            for byte, nxt in goto[state].items():
+                fail[nxt] = delta[fallback].get(byte, 0) if state else 0
+                if fail[nxt] == nxt:
+                    fail[nxt] = 0
+                queue.append(nxt)
+
+        self.delta = delta
+        self.out = out
+        # A trigger can only start where one of the trigger prefixes occurs;
+        # matching a few bytes instead of one stops the jump far less often
+        prefixes = sorted({trigger.pattern[:SKIP_PREFIX_LEN] for trigger in self.triggers if trigger.pattern})
+        self._skip = re.compile(b'(?=' + b'|'.join(re.escape(prefix) for prefix in prefixes) + b')') \
+            if prefixes else None
+        # A prefix cut off by the end of the data is invisible to the skip;
+        # that many trailing bytes go through the DFA one by one
+        self._tail = max((len(prefix) for prefix in prefixes), default=1) - 1
+
+    def search(self, data, start=0, state=0):
+        """Find the next trigger end in data
+
+        Returns (end_offset, trigger, state) or None; pass the returned state
+        back in to continue scanning after a match.
+        """
+        hit = self.scan(data, start, state)
+        return hit if hit[1] is not None else None
+
+    def scan(self, data, start=0, state=0):
+        """search() that also reports a scan running out of data
+
+        Returns (end_offset, trigger, state); trigger is None when data ended
+        without a match, and state then carries a partial match over into
+        the next piece of the same stream.
+        """
+        n = len(data)
+        if self._skip is None:
+            return n, None, 0
+        delta = self.delta
+        out = self.out
+        skip = self._skip.search
+        tail = n - self._tail
+        i = start
+        while i < n:
+            if state == 0 and i < tail:
+                m = skip(data, i)
+                i = m.start() if m is not None and m.start() < tail else tail
+                if i >= n:
+                    break
+            state = delta[state].get(data[i], 0)
+            i += 1
+            if out[state] != -1:
+                return i, self.triggers[out[state]], state
+        return n, None, state
+
+
+def parse_triggers(entries):
+    """Build Trigger objects from a list of {name, trigger, end_marker} dicts"""
+    triggers = []
+    for entry in entries:
+        pattern = entry.get('trigger')
+        if not pattern:
+            continue
+        end_marker = entry.get('end_marker') or DEFAULT_END_MARKER.decode('utf-8')
+        triggers.append(Trigger(entry.get('name', pattern),
+                                pattern.encode('utf-8'),
+                                end_marker.encode('utf-8')))
+    return triggers
+
+
+def load_triggers(paths=None):
+    """Load the trigger list from the first readable trigger file"""
+    for path in paths or TRIGGER_FILE_PATHS:
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            triggers = parse_triggers(data.get('triggers', []) if isinstance(data, dict) else data)
+            log_debug(f"Loaded {len(triggers)} triggers from {path}")
+            return triggers
+        except (OSError, ValueError, AttributeError) as e:
+            log_message(f"Failed to load triggers from {path}: {e}")
+    return parse_triggers(BUILTIN_TRIGGERS)
+
+
+TRIGGERS = load_triggers()
+TRIGGER_AUTOMATON = TriggerAutomaton(TRIGGERS)
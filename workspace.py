@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-save workspace
+Several saves open at once with one shared ItemDatabase. Parsed documents are
+evicted least-recently-used under a memory budget; unsaved ones are spilled
+to a compressed file and restored on the next switch.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from log_utils import get_app_dir, log_message, log_debug
+from perf_utils import perf
+from json_backend import serializer
+from save_core import DaveSaveEditor, BypassTable, ItemDatabase
+
+DEFAULT_MEMORY_BUDGET_MB = 64
+
+# Parsed size relative to the .sav size (measured on synthetic saves after interning)
+MEMORY_FACTOR = 2.5
+COLUMNAR_MEMORY_FACTOR = 1.2
+
+SPILL_SUFFIX = '.spill.gz'
+
+
+class WorkspaceEntry:
+    """One open save: resident editor, or a spill file, or neither (clean and evicted)"""
+
+    __slots__ = ('path', 'editor', 'clean_hash', 'spill_path', 'estimate')
+
+    def __init__(self, path):
+        self.path = path
+        self.editor = None
+        self.clean_hash = None
+        self.spill_path = None
+        self.estimate = 0
+
+    @property
+    def resident(self):
+        return self.editor is not None
+
+    @property
+    def spilled(self):
+        return self.spill_path is not None
+
+
+class SaveWorkspace:
+    """Open saves by path; the most recently opened one is active"""
+
+    def __init__(self, item_db=None, memory_budget_mb=None, spill_dir=None, columnar=None, compact_strings=True,
+                 watcher=None, autosave=None):
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.environ.get('DAVESAVEED_WORKSPACE_MB', DEFAULT_MEMORY_BUDGET_MB))
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.item_db = item_db
+        self.columnar = columnar
+        # Callers that intern strings themselves (the UI does it in idle time) turn this off
+        self.compact_strings = compact_strings
+        self.spill_dir = spill_dir
+        # Optional SaveWatcher: files rewritten by the game are merged into open saves
+        self.watcher = watcher
+        # AutosavePolicy settings for every open save, or None for manual saving only
+        self.autosave_settings = autosave
+        # Merge conflicts waiting for a decision; autosave leaves those saves alone
+        self.conflicts = {}
+        self.entries = OrderedDict()
+        self.active_path = None
+        self.last_error = None
+
+    # ---- shared state ----
+
+    def load_item_database(self, json_path):
+        """Load the catalog once and hand it to every open editor"""
+        item_db = ItemDatabase(json_path)
+        if not item_db.items:
+            return False
+        self.set_item_db(item_db)
+        return True
+
+    def set_item_db(self, item_db):
+        """Share an ItemDatabase (or layered ItemCatalog) with every open editor"""
+        self.item_db = item_db
+        for entry in self.entries.values():
+            if entry.editor is not None:
+                entry.editor.item_db = item_db
+
+    @property
+    def editor(self):
+        """Editor of the active save (None when nothing is open)"""
+        if self.active_path is None:
+            return None
+        return self.open(self.active_path)
+
+    def paths(self):
+        """Open saves, most recently used first"""
+        return list(reversed(self.entries))
+
+    def memory_used(self):
+        return sum(entry.estimate for entry in self.entries.values() if entry.resident)
+
+    # ---- open / switch ----
+
+    def open(self, path):
+        """Return the editor for path, loading or restoring it if needed
+
+        Returns None if the save cannot be loaded; the reason is in the
+        editor's last_error, which is also kept in self.last_error.
+        """
+        path = os.path.abspath(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry.resident:
+            self.entries.move_to_end(path)
+            self.active_path = path
+            return entry.editor
+
+        with perf.operation('workspace_open', file=os.path.basename(path)):
+            editor = self._new_editor()
+            restoring = entry is not None and entry.spilled
+            if restoring:
+                with perf.span('restore'):
+                    ok = self._restore(entry, editor)
+            else:
+                ok = editor.load_save_file(path)
+            if not ok:
+                self.last_error = editor.last_error
+                return None
+
+            if entry is None:
+                entry = WorkspaceEntry(path)
+                self.entries[path] = entry
+            if not restoring:
+                with perf.span('hash'):
+                    entry.clean_hash = editor.content_hash()
+                editor.saved_hash = entry.clean_hash
+                if self.watcher is not None:
+                    with perf.span('watch'):
+                        self.watcher.track(editor)
+            if self.compact_strings:
+                editor.compact_strings()
+            factor = COLUMNAR_MEMORY_FACTOR if editor.columnar else MEMORY_FACTOR
+            entry.estimate = int(os.path.getsize(path) * factor)
+            entry.editor = editor
+            self.entries.move_to_end(path)
+            self.active_path = path
+            self._enforce_budget()
+        return editor
+
+    def _new_editor(self):
+        editor = DaveSaveEditor(columnar=self.columnar)
+        editor.item_db = self.item_db
+        if self.autosave_settings is not None:
+            editor.enable_autosave(**self.autosave_settings)
+        return editor
+
+    def set_autosave(self, settings):
+        """Turn autosave on (a dict of AutosavePolicy settings, possibly empty) or off (None)"""
+        self.autosave_settings = settings
+        for entry in self.entries.values():
+            if entry.resident:
+                if settings is None:
+                    entry.editor.disable_autosave()
+                else:
+                    entry.editor.enable_autosave(**settings)
+                    # Unsaved edits from before are written too; unchanged data is skipped by hash
+                    entry.editor.note_change()
+
+    def is_resident(self, path):
+        entry = self.entries.get(os.path.abspath(path))
+        return entry is not None and entry.resident
+
+    def is_dirty(self, path):
+        """True if the save has changes that are not written to its file"""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None:
+            return False
+        if entry.spilled:
+            return True
+        if not entry.resident:
+            return False
+        return entry.editor.content_hash() != entry.clean_hash
+
+    # ---- eviction ----
+
+    def _enforce_budget(self):
+        """Evict least recently used saves (never the active one) until within budget"""
+        for path in list(self.entries):
+            if self.memory_used() <= self.memory_budget:
+                break
+            if path == self.active_path:
+                continue
+            entry = self.entries[path]
+            if entry.resident:
+                self.evict(path)
+
+    def evict(self, path):
+        """Drop a save from memory, spilling it first if it has unsaved changes"""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or not entry.resident:
+            return
+        editor = entry.editor
+        if editor.content_hash() != entry.clean_hash:
+            with perf.operation('workspace_spill', file=os.path.basename(entry.path)):
+                with perf.span('spill'):
+                    self._spill(entry, editor)
+            log_message(f"Spilled unsaved save: {entry.path}")
+        else:
+            log_debug(f"Evicted clean save: {entry.path}")
+            if self.watcher is not None:
+                # Reloaded from the file on the next open, so there is nothing to merge
+                self.watcher.untrack(entry.path)
+        entry.editor = None
+
+    def _spill_directory(self):
+        try:
+            self.spill_dir = self.spill_dir or get_app_dir('spill')
+            os.makedirs(self.spill_dir, exist_ok=True)
+        except OSError:
+            self.spill_dir = tempfile.mkdtemp(prefix='davesave_spill_')
+        return self.spill_dir
+
+    def _spill(self, entry, editor):
+        """Write the document as gzip'd compact JSON, after a one-line header with the bypass spans"""
+        spill_dir = self._spill_directory()
+        digest = hashlib.blake2b(entry.path.encode('utf-8'), digest_size=6).hexdigest()
+        name = f'{digest}_{os.path.basename(entry.path)}{SPILL_SUFFIX}'
+        spill_path = os.path.join(spill_dir, name)
+        table = editor.bypass_table
+        header = {
+            'path': entry.path,
+            'clean_hash': entry.clean_hash,
+            'nonce': table.nonce if table is not None else None,
+            'spans': [[raw.hex(), key_idx] for raw, key_idx in table.spans] if table is not None else [],
+        }
+        tmp_path = spill_path + '.tmp'
+        # Level 1: spilling happens while the user is switching saves
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+            f.write(json.dumps(header) + '\n')
+            f.write(serializer.dumps(editor.document()))
+        os.replace(tmp_path, spill_path)
+        entry.spill_path = spill_path
+
+    def _restore(self, entry, editor):
+        try:
+            with gzip.open(entry.spill_path, 'rt', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                data = serializer.loads(f.read())
+        except (OSError, ValueError) as e:
+            editor.last_error = f"Spill file unreadable: {e}"
+            log_message(editor.last_error)
+            return False
+        table = BypassTable()
+        if header.get('nonce'):
+            table.nonce = header['nonce']
+            table.spans = [(bytes.fromhex(raw), key_idx) for raw, key_idx in header['spans']]
+        if editor.columnar:
+            editor._to_columnar(data)
+        editor.save_data = data
+        editor.bypass_table = table
+        editor.file_path = entry.path
+        # Still unsaved: keep the hash of the file contents, not of the restored data
+        entry.clean_hash = header.get('clean_hash')
+        editor.saved_hash = entry.clean_hash
+        editor.note_change()
+        self._drop_spill(entry)
+        return True
+
+    def _drop_spill(self, entry):
+        if entry.spill_path is not None:
+            try:
+                os.remove(entry.spill_path)
+            except OSError:
+                pass
+            entry.spill_path = None
+
+    # ---- external changes ----
+
+    def sync_path(self, path):
+        """Merge a rewritten file into its resident save; returns a ReloadResult or None"""
+        entry = self.entries.get(os.path.abspath(path))
+        if self.watcher is None or entry is None or not entry.resident:
+            return None
+        result = self.watcher.reconcile(entry.editor)
+        if result is not None and result.error is None:
+            entry.clean_hash = entry.editor.saved_hash = result.clean_hash
+            if result.conflicts:
+                self.conflicts[entry.path] = result.conflicts
+        return result
+
+    def resolve_conflicts(self, path, conflicts, take='remote'):
+        """Settle conflicts from a merge: 'remote' takes the file's values, 'local' keeps the edits"""
+        entry = self.entries.get(os.path.abspath(path))
+        if self.watcher is None or entry is None or not entry.resident:
+            return False
+        self.conflicts.pop(entry.path, None)
+        return self.watcher.resolve(entry.editor, conflicts, take) is not None
+
+    def sync_external(self):
+        """Check open saves for external rewrites; returns {path: ReloadResult}
+
+        Spilled saves stay pending until they are restored by the next open.
+        """
+        if self.watcher is None:
+            return {}
+        results = {}
+        for path in self.watcher.changed():
+            result = self.sync_path(path)
+            if result is not None:
+                results[path] = result
+        return results
+
+    # ---- save / close ----
+
+    def save(self, path=None, backup=True, only_if_changed=False):
+        """Write a save (the active one by default) and mark it clean"""
+        path = os.path.abspath(path) if path else self.active_path
+        if path is None:
+            return False
+        self.last_error = None
+        active = self.active_path
+        entry = self.entries.get(path)
+        # A resident save is written without reordering the LRU list
+        editor = entry.editor if entry is not None and entry.resident else self.open(path)
+        if editor is None:
+            return False
+        ok = self._merged_for_save(path) and editor.save_save_file(backup=backup, only_if_changed=only_if_changed)
+        if ok and not editor.last_save_skipped:
+            self.entries[path].clean_hash = editor.saved_hash
+            if self.watcher is not None:
+                self.watcher.track(editor)
+        if active is not None and active != path:
+            self.active_path = active
+        return ok
+
+    def _merged_for_save(self, path):
+        """Merge a rewritten file before writing; False while it cannot be merged or has unsettled conflicts"""
+        if self.watcher is None:
+            return True
+        # Never overwrite a newer file without merging it first
+        result = self.sync_path(path)
+        if path in self.watcher.pending:
+            # Rewritten but not readable yet (the game may still be writing it)
+            self.last_error = f"{os.path.basename(path)} changed on disk and cannot be merged yet" + \
+                (f": {result.error}" if result is not None and result.error else '')
+            log_message(self.last_error)
+            return False
+        if path in self.conflicts:
+            self.last_error = f"{os.path.basename(path)}: {len(self.conflicts[path])} merge conflicts to settle before saving"
+            log_message(self.last_error)
+            return False
+        return True
+
+    def autosave(self, now=None, flush=False):
+        """Write due autosaves (all pending ones with flush) of resident saves; returns the paths written"""
+        written = []
+        for path, entry in list(self.entries.items()):
+            if not entry.resident or entry.editor.autosave is None or path in self.conflicts:
+                continue
+
+            def save(backup, only_if_changed, path=path):
+                # save() merges first and refuses if that merge just found conflicts
+                return self.save(path, backup, only_if_changed)
+
+            if entry.editor.autosave_tick(now, save, flush) == 'saved':
+                written.append(path)
+        return written
+
+    def close(self, path, discard=False):
+        """Close a save; refuses (returns False) if it is dirty unless discard is set"""
+        path = os.path.abspath(path)
+        entry = self.entries.get(path)
+        if entry is None:
+            return True
+        if not discard and self.is_dirty(path):
+            return False
+        self._drop_spill(entry)
+        self.conflicts.pop(path, None)
+        del self.entries[path]
+        if self.watcher is not None:
+            self.watcher.untrack(path)
+        if self.active_path == path:
+            self.active_path = next(reversed(self.entries), None)
+        return True
+
+    def close_all(self, discard=False):
+        """Close every save; returns the paths left open because they are dirty"""
+        for path in list(self.entries):
+            self.close(path, discard)
+        return list(self.entries)